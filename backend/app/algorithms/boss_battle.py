@@ -1,150 +1,480 @@
+import bisect
 import heapq
 import math
 import json
+import logging
+import time
+from array import array
 
-class State:
+logger = logging.getLogger(__name__)
+
+class CooldownPacker:
     """
-    Represents a state in the search space of the boss rush problem.
-    A state is defined by the current boss, their HP, skill cooldowns, and time elapsed.
+    Packs the cooldowns of all skills into one int, one fixed-width field per skill.
+    Each field has a spare guard bit on top so that every cooldown can be decremented
+    (saturating at 0) with a handful of big-int operations instead of a Python loop.
     """
-    def __init__(self, boss_index, boss_hp, skill_cooldowns, time_elapsed, path):
-        self.boss_index = boss_index
-        self.boss_hp = boss_hp
-        self.skill_cooldowns = tuple(skill_cooldowns)  # Use tuple to make it hashable
-        self.time_elapsed = time_elapsed
-        self.path = path # List of (time, skill_name) tuples
+    def __init__(self, skills_list):
+        self.num_skills = len(skills_list)
+        max_cooldown = max((cooldown for _, cooldown in skills_list), default=0)
+        value_bits = max(max_cooldown.bit_length(), 1)
+        self.value_bits = value_bits
+        self.width = value_bits + 1
+        self.value_mask = (1 << value_bits) - 1
+
+        self.ones = 0    # Lowest bit of every field
+        self.guards = 0  # Guard bit of every field
+        for i in range(self.num_skills):
+            self.ones |= 1 << (i * self.width)
+            self.guards |= 1 << (i * self.width + value_bits)
+
+    def pack(self, cooldowns):
+        packed = 0
+        for i, cd in enumerate(cooldowns):
+            packed |= cd << (i * self.width)
+        return packed
+
+    def unpack(self, packed):
+        return [(packed >> (i * self.width)) & self.value_mask for i in range(self.num_skills)]
+
+    def tick(self, packed):
+        """
+        Advances all cooldowns by one time unit.
+        Returns (ticked, ready) where `ready` has the lowest field bit set for every skill
+        whose cooldown was already 0 before the tick.
+        """
+        # Setting the guard bit and subtracting 1 per field borrows from the guard only
+        # when the field was 0, so the surviving guards mark the non-zero fields.
+        borrowed = (packed | self.guards) - self.ones
+        nonzero = (borrowed & self.guards) >> self.value_bits
+        ticked = borrowed & (nonzero * self.value_mask)
+        ready = nonzero ^ self.ones
+        return ticked, ready
+
+    def advance(self, packed, wait):
+        """Advances all cooldowns by `wait` time units."""
+        return self.pack([max(0, cd - wait) for cd in self.unpack(packed)])
 
-    # The __lt__ method is needed for the object to be orderable by the priority queue (heapq)
-    # when two priorities are the same. This is a fallback comparison.
-    def __lt__(self, other):
-        return self.time_elapsed < other.time_elapsed
-    
-def calculate_lower_bound(state, bosses, skills, max_potential_dps):
+    def ready_indices(self, ready):
+        """Converts a `ready` bit field from tick() into a list of skill indices."""
+        indices = []
+        while ready:
+            low = ready & -ready
+            indices.append((low.bit_length() - 1) // self.width)
+            ready ^= low
+        return indices
+
+class SearchTree:
     """
-    Calculates a lower bound on the total time to complete the boss rush from the current state.
-    This is the core of the "bound" part of the algorithm.
+    Growable struct-of-arrays storing every expanded state as a node.
+    A node keeps its parent pointer, the skill used to reach it (-1 for waiting), the time
+    at which the state is reached and a packed (boss_index, boss_hp, skill_cooldowns) key.
+    The winning path is rebuilt once at the end by following parent pointers.
     """
-    if max_potential_dps == 0:
-        return float('inf')
+    def __init__(self, bosses_list, packer, boss_bits=None):
+        self.hp_bits = max(max(bosses_list).bit_length(), 1)
+        self.boss_bits = boss_bits or max(len(bosses_list).bit_length(), 1)
+        self.hp_mask = (1 << self.hp_bits) - 1
+        self.boss_mask = (1 << self.boss_bits) - 1
+
+        self.parents = array('q')
+        self.skills = array('h')
+        self.times = array('q')
+        # Keys fit in a machine word for every fight the generator produces; fall back to a
+        # plain list of ints for unusually large skill sets.
+        key_bits = packer.width * packer.num_skills + self.boss_bits + self.hp_bits
+        self.keys = array('Q') if key_bits <= 64 else []
+
+    def __len__(self):
+        return len(self.parents)
 
-    # Calculate total remaining HP from the current boss onwards
-    remaining_hp = state.boss_hp
-    for i in range(state.boss_index + 1, len(bosses)):
-        remaining_hp += bosses[i]
+    def key(self, boss_index, boss_hp, cooldowns):
+        """Packs the state fields that identify a state regardless of time and path."""
+        return (((cooldowns << self.boss_bits) | boss_index) << self.hp_bits) | boss_hp
 
-    # Estimate time to deal remaining damage with maximum possible DPS
-    estimated_time_to_finish = remaining_hp / max_potential_dps
+    def unpack_key(self, key):
+        """Returns (boss_index, boss_hp, cooldowns) for a packed key."""
+        boss_hp = key & self.hp_mask
+        key >>= self.hp_bits
+        return key & self.boss_mask, boss_hp, key >> self.boss_bits
 
-    # The lower bound is the time already elapsed plus the optimistic estimate to finish
-    return state.time_elapsed + estimated_time_to_finish
+    def add(self, parent, skill_idx, time, key):
+        self.parents.append(parent)
+        self.skills.append(skill_idx)
+        self.times.append(time)
+        self.keys.append(key)
+        return len(self.parents) - 1
 
-def solve_boss_battle(bosses_list, skills_list, turn_limit=20):
+    def path(self, node):
+        """Returns the list of (time, skill_idx) tuples leading to node."""
+        path = []
+        while node != -1:
+            parent = self.parents[node]
+            if self.skills[node] != -1:
+                path.append((self.times[parent], self.skills[node]))
+            node = parent
+        path.reverse()
+        return path
+
+class DominanceIndex:
     """
-    Solves the boss rush problem using a Branch and Bound algorithm.
+    Open-addressing hash index that groups expanded tree nodes by (boss_index, skill_cooldowns).
+    Nodes of the same group are chained through an array of next pointers, so a new state can be
+    checked against every expanded state with the same cooldowns: if one of them has no more HP
+    left and no more elapsed time, the new state can never finish earlier and is pruned.
+    Lower cooldowns alone do not dominate: a skill is used whenever one is ready, so a state with
+    more skills ready cannot simply copy the waits of another. Slots and chains are 8-byte
+    machine ints, not boxed Python ints.
 
-    Args:
-        bosses_list (list): A list of integers for each boss's health.
-        skills_list (list): A list of lists, where each inner list is [harm, cooldown, name].
+    With `dominance=False` only exact duplicates (same HP) are pruned, like a plain visited set.
+    """
+    EMPTY = -1
+    HASH_MULTIPLIER = 0x9E3779B97F4A7C15  # Fibonacci hashing
 
-    Returns:
-        A tuple containing:
-        - The minimum time to defeat all bosses.
-        - The optimal sequence of skill uses (path).
+    def __init__(self, tree, dominance=True, capacity_bits=10):
+        self.tree = tree
+        self.dominance = dominance
+        self.chain = array('q')
+        self._resize(capacity_bits)
+
+    def _resize(self, capacity_bits):
+        old_slots = getattr(self, 'slots', ())
+        self.capacity_bits = capacity_bits
+        self.mask = (1 << capacity_bits) - 1
+        self.shift = 64 - capacity_bits
+        self.slots = array('q', [self.EMPTY]) * (1 << capacity_bits)
+        self.size = 0
+        for head in old_slots:
+            if head != self.EMPTY:
+                self.slots[self._find_slot(self.tree.keys[head] >> self.tree.hp_bits)] = head
+                self.size += 1
+
+    def _find_slot(self, group):
+        """Returns the slot holding the chain of `group`, or the empty slot where it belongs."""
+        slots, keys, mask, hp_bits = self.slots, self.tree.keys, self.mask, self.tree.hp_bits
+        i = (((group + 1) * self.HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> self.shift
+        while True:
+            head = slots[i]
+            if head == self.EMPTY or keys[head] >> hp_bits == group:
+                return i
+            i = (i + 1) & mask
+
+    def _dominated_in(self, group, boss_hp, time_elapsed):
+        keys, times, chain, hp_mask = self.tree.keys, self.tree.times, self.chain, self.tree.hp_mask
+        node = self.slots[self._find_slot(group)]
+        while node != self.EMPTY:
+            other_hp = keys[node] & hp_mask
+            if times[node] <= time_elapsed and (other_hp <= boss_hp if self.dominance else other_hp == boss_hp):
+                return True
+            node = chain[node]
+        return False
+
+    def is_dominated(self, key, time_elapsed):
+        """Returns True if an expanded state makes the state (key, time_elapsed) redundant."""
+        return self._dominated_in(key >> self.tree.hp_bits, key & self.tree.hp_mask, time_elapsed)
+
+    def add(self, key, node):
+        """Registers the tree node `node` (already holding `key`) as expanded."""
+        if self.size * 2 >= len(self.slots):
+            self._resize(self.capacity_bits + 1)
+        i = self._find_slot(key >> self.tree.hp_bits)
+        head = self.slots[i]
+        if head == self.EMPTY:
+            self.size += 1
+        self.chain.append(head)
+        self.slots[i] = node
+
+# Heap entries are single ints ordered by (lower_bound, time, skill, parent): the bound lives
+# in the high bits as a fixed-point number, followed by the elapsed time, the skill used
+# (offset by one so that waiting is 0) and the parent node in the low bits. Children are only
+# materialized as tree nodes when popped, and comparing ints never falls back to objects.
+NODE_BITS = 40
+SKILL_BITS = 16
+TIME_BITS = 24
+BOUND_FRACTION_BITS = 20
+NODE_MASK = (1 << NODE_BITS) - 1
+SKILL_MASK = (1 << SKILL_BITS) - 1
+TIME_MASK = (1 << TIME_BITS) - 1
+SKILL_SHIFT = NODE_BITS
+TIME_SHIFT = SKILL_SHIFT + SKILL_BITS
+BOUND_SHIFT = TIME_SHIFT + TIME_BITS + BOUND_FRACTION_BITS
+
+def _heap_entry(lower_bound, time_elapsed, skill_idx, parent):
+    # Truncating the scaled bound keeps `entry >> BOUND_SHIFT >= t` equivalent to `lower_bound >= t`
+    # for every integer completion time t.
+    scaled_bound = int(lower_bound * (1 << BOUND_FRACTION_BITS))
+    return (((((scaled_bound << TIME_BITS) | time_elapsed) << SKILL_BITS) | (skill_idx + 1)) << NODE_BITS) | parent
+
+class BossBattleSearch:
     """
-    num_bosses = len(bosses_list)
-    num_skills = len(skills_list)
+    Best-first Branch and Bound over boss rush states.
 
-    # --- Pre-calculation for the Lower Bound ---
-    # Calculate a theoretical maximum DPS to use in the bounding function.
-    # We add 1 to cooldown to account for the time step of using the skill.
-    max_potential_dps = sum(harm / (cooldown + 1) for harm, cooldown in skills_list if (cooldown + 1) > 0)
-    if max_potential_dps == 0 and sum(bosses_list) > 0:
-        print("No skills with positive damage. Cannot defeat bosses.")
-        return float('inf'), []
+    The default bound is admissible and combines two relaxations of the remaining fight:
+    - Overkill accounting: damage never carries over to the next boss, so every boss needs
+      turns of its own, at least as many as it takes to deal its HP with every skill ready.
+    - Damage capacity: from the current cooldowns, skill i can fire at most
+      1 + (k - 1 - cooldown_i) // (cd_i + 1) times in the next k turns, and only one skill
+      fires per turn. Filling the k turns with the hardest-hitting skills first gives the
+      most damage any schedule can deal, and the bound is the smallest k that covers the
+      remaining HP.
+    `bound='dps'` selects the legacy average-DPS estimate, kept for comparison only: it is not
+    admissible, since skills that start ready can burst above their average rate early on.
+    """
+    def __init__(self, bosses_list, skills_list, turn_limit=None, bound='schedule', dominance=True):
+        if bound not in ('schedule', 'dps'):
+            raise ValueError(f"Unknown bound: {bound}")
+        self.bosses = list(bosses_list)
+        self.skills = [(harm, cooldown) for harm, cooldown, *_ in skills_list]
+        self.num_bosses = len(self.bosses)
+        self.turn_limit = turn_limit
+        self.bound = bound
 
-    # --- Initialization ---
-    initial_state = State(
-        boss_index=0,
-        boss_hp=bosses_list[0],
-        skill_cooldowns=[0] * num_skills,
-        time_elapsed=0,
-        path=[]
-    )
-
-    min_completion_time = float('inf')
-    best_path = []
-
-    # The priority queue will store tuples of (lower_bound, state)
-    priority_queue = []
-    initial_lower_bound = calculate_lower_bound(initial_state, bosses_list, skills_list, max_potential_dps)
-    heapq.heappush(priority_queue, (initial_lower_bound, initial_state))
-
-    # Visited set to store (boss_index, boss_hp, skill_cooldowns) tuples to avoid cycles
-    # and redundant computations.
-    visited = set()
-
-    # --- Main Algorithm Loop ---
-    while priority_queue:
-        current_lower_bound, current_state = heapq.heappop(priority_queue)
-
-        # --- Pruning Step 1 ---
-        # If the current best possible time is already worse than the best solution found, prune.
-        if current_lower_bound >= min_completion_time:
-            continue
-
-        # Create a hashable representation of the core state properties
-        visited_key = (current_state.boss_index, current_state.boss_hp, current_state.skill_cooldowns)
-        if visited_key in visited:
-            continue
-        visited.add(visited_key)
-
-        # --- Branching Step ---
-        # Find skills that are ready to use (cooldown is 0)
-        ready_skills_indices = [i for i, cd in enumerate(current_state.skill_cooldowns) if cd == 0]
-
-        if not ready_skills_indices:
-            # If no skills are ready, we must wait.
-            # Advance time to the moment the next skill becomes available.
-            min_wait_time = min(cd for cd in current_state.skill_cooldowns if cd > 0)
-            
-            new_time = current_state.time_elapsed + min_wait_time
-            new_cooldowns = [max(0, cd - min_wait_time) for cd in current_state.skill_cooldowns]
-            
-            next_state = State(
-                boss_index=current_state.boss_index,
-                boss_hp=current_state.boss_hp,
-                skill_cooldowns=new_cooldowns,
-                time_elapsed=new_time,
-                path=current_state.path
-            )
-
-            # --- Pruning Step 2 (for the waiting state) ---
-            next_lower_bound = calculate_lower_bound(next_state, bosses_list, skills_list, max_potential_dps)
-            if next_lower_bound < min_completion_time:
-                heapq.heappush(priority_queue, (next_lower_bound, next_state))
-
-        else:
-            # Explore using each ready skill
-            for skill_idx in ready_skills_indices:
-                harm, cooldown = skills_list[skill_idx]
+        self.max_harm = max((harm for harm, _ in self.skills), default=0)
+        self.max_potential_dps = sum(harm / (cooldown + 1) for harm, cooldown in self.skills if (cooldown + 1) > 0)
+
+        self.packer = CooldownPacker(self.skills)
+        self.tree = SearchTree(self.bosses, self.packer)
+        self.index = DominanceIndex(self.tree, dominance=dominance)
+
+        # Skills sorted by damage (hardest first) as (harm, period, field shift) for the capacity bound.
+        self.capacity_order = sorted(
+            ((harm, cooldown + 1, i * self.packer.width) for i, (harm, cooldown) in enumerate(self.skills) if harm > 0),
+            reverse=True,
+        )
+
+        # Most damage dealt in k turns with every skill ready, extended on demand by fresh_turns.
+        self.fresh_capacities = [0]
+        # Remaining HP and minimum turns of all bosses after index i, so bounds are cheap per state.
+        self.hp_after = [0] * self.num_bosses
+        self.hits_after = [0] * self.num_bosses
+        for i in range(self.num_bosses - 2, -1, -1):
+            self.hp_after[i] = self.hp_after[i + 1] + self.bosses[i + 1]
+            if self.max_harm > 0:
+                self.hits_after[i] = self.hits_after[i + 1] + self.fresh_turns(self.bosses[i + 1])
+
+        self.min_completion_time = float('inf')
+        self.best_parent, self.best_skill = -1, -1
+        self.seed_path = []
+        self.priority_queue = []
+        self.stats = {'expanded': 0, 'pushed': 0, 'pruned_bound': 0, 'pruned_dominated': 0}
+        # Smallest bound among open states, i.e. a lower bound on the optimum while searching.
+        self.global_lower_bound = 0
+        self.finished = False
+
+    def _damage_capacity(self, turns, ready_in):
+        """Upper bound on the damage any schedule can deal in the next `turns` turns."""
+        damage = 0
+        slots = turns
+        for (harm, period, _), first in zip(self.capacity_order, ready_in):
+            if first >= turns:
+                continue
+            uses = (turns - 1 - first) // period + 1
+            if uses >= slots:
+                return damage + harm * slots
+            damage += harm * uses
+            slots -= uses
+        return damage
+
+    def fresh_turns(self, boss_hp):
+        """
+        Lower bound on the turns any boss with `boss_hp` left takes on its own: even with every
+        skill ready, the turns spent on it must deal that much damage. Bosses are fought one
+        after another, so these turns add up over the current boss and the ones still to engage.
+        """
+        capacities = self.fresh_capacities
+        while capacities[-1] < boss_hp:
+            capacities.append(self._damage_capacity(len(capacities), [0] * len(self.capacity_order)))
+        return bisect.bisect_left(capacities, boss_hp)
+
+    def remaining_turns_bound(self, boss_index, boss_hp, cooldowns, at_least=0):
+        """
+        Admissible lower bound on the turns needed to defeat every remaining boss.
+        `at_least` is a bound already known to hold, e.g. the parent's bound minus the turns
+        spent since: a schedule for the child extends to one for the parent, so the search for
+        the smallest sufficient k can start there and usually needs one or two capacity checks.
+        """
+        remaining_hp = boss_hp + self.hp_after[boss_index]
+        turns = max(self.hits_after[boss_index] + self.fresh_turns(boss_hp), at_least)
+
+        value_mask = self.packer.value_mask
+        ready_in = [(cooldowns >> shift) & value_mask for _, _, shift in self.capacity_order]
+        if self._damage_capacity(turns, ready_in) >= remaining_hp:
+            return turns
+
+        # Capacity grows with the number of turns: step, then double and bisect for the smallest k.
+        turns += 1
+        if self._damage_capacity(turns, ready_in) >= remaining_hp:
+            return turns
+        low, high = turns, turns * 2
+        while self._damage_capacity(high, ready_in) < remaining_hp:
+            low, high = high, high * 2
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self._damage_capacity(middle, ready_in) >= remaining_hp:
+                high = middle
+            else:
+                low = middle
+        return high
+
+    def lower_bound(self, time_elapsed, boss_index, boss_hp, cooldowns, at_least=0):
+        """Lower bound on the total time to complete the boss rush from a state."""
+        if self.bound == 'dps':
+            return time_elapsed + (boss_hp + self.hp_after[boss_index]) / self.max_potential_dps
+        return time_elapsed + self.remaining_turns_bound(boss_index, boss_hp, cooldowns, at_least)
+
+    def best_path(self):
+        """Returns the (time, skill_idx) path of the best schedule found so far."""
+        if self.best_parent == -1:
+            return list(self.seed_path)
+        return self.tree.path(self.best_parent) + [(self.tree.times[self.best_parent], self.best_skill)]
+
+    def seed_incumbent(self, completion_time, path):
+        """
+        Starts the search from a known schedule, e.g. the greedy one, so that everything
+        that cannot beat it is pruned from the first expansion on.
+        Must be called before iterate().
+        """
+        if completion_time < self.min_completion_time:
+            self.min_completion_time = completion_time
+            self.best_parent, self.best_skill = -1, -1
+            self.seed_path = list(path)
+
+    def progress(self):
+        """
+        Returns a snapshot of the search: the incumbent (turns is None if there is none yet),
+        the global lower bound, the optimality gap and whether the incumbent is proven optimal.
+        """
+        has_incumbent = self.min_completion_time != float('inf')
+        turns = self.min_completion_time if has_incumbent else None
+        lower_bound = math.ceil(self.global_lower_bound)
+        if has_incumbent:
+            lower_bound = min(lower_bound, turns)
+        if self.finished and has_incumbent:
+            lower_bound = turns
+        return {
+            'turns': turns,
+            'path': self.best_path(),
+            'lower_bound': lower_bound,
+            'gap': turns - lower_bound if has_incumbent else None,
+            'optimal': self.finished and has_incumbent,
+            'stats': dict(self.stats),
+        }
 
-                # --- Create a new state by using the skill ---
-                # Assume using a skill takes 1 time unit
-                time_step = 1
-                new_time = current_state.time_elapsed + time_step
+    def run(self):
+        """
+        Runs the search to completion.
+        Returns (min_completion_time, path), or (inf, []) if no schedule finishes in time.
+        """
+        for _ in self.iterate():
+            pass
+        return self.min_completion_time, self.best_path()
+
+    def iterate(self, deadline=None, check_every=1024):
+        """
+        Generator running the search. It yields after every improvement of the incumbent and
+        stops early once time.perf_counter() passes `deadline`; `finished` tells whether the
+        search space was exhausted, i.e. whether the incumbent is proven optimal.
+        """
+        bosses_list, skills_list, num_bosses = self.bosses, self.skills, self.num_bosses
+        packer, tree, index, stats = self.packer, self.tree, self.index, self.stats
+        priority_queue = self.priority_queue
+        lower_bound = self.lower_bound
+
+        # Anything that cannot finish within turn_limit is cut off like a known incumbent.
+        cutoff = float('inf') if self.turn_limit is None else self.turn_limit + 1
+        limit = min(self.min_completion_time, cutoff)
+
+        initial_key = tree.key(0, bosses_list[0], 0)
+        # The root is expanded directly; every other node is materialized when popped.
+        to_expand = [tree.add(-1, -1, 0, initial_key)]
+        index.add(initial_key, 0)
+        # Bound on the turns still needed from the node being expanded, used as a search hint.
+        node_remaining = 0
+        self.global_lower_bound = lower_bound(0, 0, bosses_list[0], 0)
+        until_check = check_every
+
+        # --- Main Algorithm Loop ---
+        while to_expand or priority_queue:
+            if deadline is not None:
+                until_check -= 1
+                if until_check == 0:
+                    if time.perf_counter() >= deadline:
+                        return
+                    until_check = check_every
+
+            if to_expand:
+                node = to_expand.pop()
+            else:
+                entry = heapq.heappop(priority_queue)
+
+                # --- Pruning Step 1 ---
+                # If the current best possible time is already worse than the best solution found,
+                # so is every state left in the queue: they are ordered by bound.
+                if entry >> BOUND_SHIFT >= limit:
+                    stats['pruned_bound'] += 1 + len(priority_queue)
+                    priority_queue.clear()
+                    break
+                self.global_lower_bound = (entry >> (BOUND_SHIFT - BOUND_FRACTION_BITS)) / (1 << BOUND_FRACTION_BITS)
+
+                # Materialize the child state from its parent and the skill used.
+                parent = entry & NODE_MASK
+                skill_idx = ((entry >> SKILL_SHIFT) & SKILL_MASK) - 1
+                time_elapsed = (entry >> TIME_SHIFT) & TIME_MASK
+                node_remaining = (entry >> BOUND_SHIFT) - time_elapsed
+                boss_index, boss_hp, cooldowns = tree.unpack_key(tree.keys[parent])
+                if skill_idx == -1:
+                    cooldowns = packer.advance(cooldowns, time_elapsed - tree.times[parent])
+                else:
+                    cooldowns, _ = packer.tick(cooldowns)
+                    cooldowns |= skills_list[skill_idx][1] << (skill_idx * packer.width)
+                    boss_hp -= skills_list[skill_idx][0]
+                    if boss_hp <= 0:
+                        boss_index += 1
+                        boss_hp = bosses_list[boss_index]
+
+                # --- Pruning Step 2 ---
+                # Skip states that an already expanded state dominates.
+                key = tree.key(boss_index, boss_hp, cooldowns)
+                if index.is_dominated(key, time_elapsed):
+                    stats['pruned_dominated'] += 1
+                    continue
+                node = tree.add(parent, skill_idx, time_elapsed, key)
+                index.add(key, node)
+
+            stats['expanded'] += 1
+            boss_index, boss_hp, cooldowns = tree.unpack_key(tree.keys[node])
+            time_elapsed = tree.times[node]
+
+            # --- Branching Step ---
+            # Find skills that are ready to use (cooldown is 0)
+            ticked_cooldowns, ready = packer.tick(cooldowns)
+
+            if not ready:
+                # If no skills are ready, we must wait.
+                # Advance time to the moment the next skill becomes available.
+                min_wait_time = min(cd for cd in packer.unpack(cooldowns) if cd > 0)
+                new_time = time_elapsed + min_wait_time
+                new_cooldowns = packer.advance(cooldowns, min_wait_time)
+
+                # --- Pruning Step 3 (for the waiting state) ---
+                next_lower_bound = lower_bound(new_time, boss_index, boss_hp, new_cooldowns, node_remaining - min_wait_time)
+                if next_lower_bound < limit:
+                    heapq.heappush(priority_queue, _heap_entry(next_lower_bound, new_time, -1, node))
+                    stats['pushed'] += 1
+                else:
+                    stats['pruned_bound'] += 1
+                continue
+
+            # Explore using each ready skill. Using a skill takes 1 time unit.
+            new_time = time_elapsed + 1
+            child_at_least = node_remaining - 1
+            for skill_idx in packer.ready_indices(ready):
+                harm, cooldown = skills_list[skill_idx]
 
-                # Reduce cooldowns for all skills by the time step
-                new_cooldowns = list(current_state.skill_cooldowns)
-                for i in range(num_skills):
-                    new_cooldowns[i] = max(0, new_cooldowns[i] - time_step)
-                
                 # Apply skill damage and set its cooldown
-                new_boss_hp = current_state.boss_hp - harm
-                new_cooldowns[skill_idx] = cooldown
-                new_path = current_state.path + [(current_state.time_elapsed, skill_idx)]
-                
-                new_boss_index = current_state.boss_index
-                
+                new_boss_hp = boss_hp - harm
+                new_boss_index = boss_index
+
                 # --- Check for Boss Defeat ---
                 if new_boss_hp <= 0:
                     # Move to the next boss
@@ -153,20 +483,118 @@ def solve_boss_battle(bosses_list, skills_list, turn_limit=20):
                         new_boss_hp = bosses_list[new_boss_index]
                     else:
                         # --- Goal Reached: All bosses defeated ---
-                        if new_time < min_completion_time:
-                            min_completion_time = new_time
-                            best_path = new_path
+                        if new_time < limit:
+                            self.min_completion_time = limit = new_time
+                            self.best_parent, self.best_skill = node, skill_idx
+                            yield
                         continue # This branch is complete, no need to add to queue
 
-                # --- Create and push the new state to the queue ---
-                next_state = State(new_boss_index, new_boss_hp, new_cooldowns, new_time, new_path)
+                # --- Pruning Step 3 (for the skill-use state) ---
+                new_cooldowns = ticked_cooldowns | (cooldown << (skill_idx * packer.width))
+                next_lower_bound = lower_bound(new_time, new_boss_index, new_boss_hp, new_cooldowns, child_at_least)
+                if next_lower_bound < limit:
+                    heapq.heappush(priority_queue, _heap_entry(next_lower_bound, new_time, skill_idx, node))
+                    stats['pushed'] += 1
+                else:
+                    stats['pruned_bound'] += 1
+
+        self.finished = True
+
+def greedy_schedule(bosses_list, skills_list, finish_weakest=False):
+    """
+    Builds a schedule by always using the hardest-hitting ready skill, waiting only when no
+    skill is ready. It is fast and usually close to optimal, which makes it a good first
+    incumbent for the Branch and Bound search. With `finish_weakest`, a boss that some ready
+    skill can finish is finished with the weakest such skill, saving the hard hitters.
+
+    Returns (completion_time, path) with path as (time, skill_idx) tuples, or (inf, []) if
+    no skill deals damage.
+    """
+    if not any(skill[0] > 0 for skill in skills_list):
+        return float('inf'), []
+
+    cooldowns = [0] * len(skills_list)
+    path = []
+    time_elapsed = 0
+    for boss_hp in bosses_list:
+        while boss_hp > 0:
+            ready = [i for i, cd in enumerate(cooldowns) if cd == 0]
+            if not ready:
+                wait = min(cooldowns)
+                cooldowns = [cd - wait for cd in cooldowns]
+                time_elapsed += wait
+                continue
+            finishers = [i for i in ready if skills_list[i][0] >= boss_hp] if finish_weakest else []
+            if finishers:
+                skill_idx = min(finishers, key=lambda i: skills_list[i][0])
+            else:
+                skill_idx = max(ready, key=lambda i: skills_list[i][0])
+            path.append((time_elapsed, skill_idx))
+            boss_hp -= skills_list[skill_idx][0]
+            cooldowns = [max(0, cd - 1) for cd in cooldowns]
+            cooldowns[skill_idx] = skills_list[skill_idx][1]
+            time_elapsed += 1
+    return time_elapsed, path
+
+def solve_boss_battle(bosses_list, skills_list, turn_limit=None, bound='schedule', dominance=True, stats=None):
+    """
+    Solves the boss rush problem using a Branch and Bound algorithm.
+
+    Args:
+        bosses_list (list): A list of integers for each boss's health.
+        skills_list (list): A list of lists, where each inner list is [harm, cooldown, name].
+        turn_limit (int, optional): Fights that need more turns are reported as unsolvable.
+        bound (str): 'schedule' for the admissible capacity bound, 'dps' for the legacy estimate.
+        dominance (bool): Prune states dominated by an expanded state, not just exact repeats.
+        stats (dict, optional): Filled with node expansion and pruning counters.
+
+    Returns:
+        A tuple containing:
+        - The minimum time to defeat all bosses (inf if none within turn_limit).
+        - The optimal sequence of skill uses (path).
+    """
+    if not bosses_list:
+        return 0, []
+
+    search = BossBattleSearch(bosses_list, skills_list, turn_limit=turn_limit, bound=bound, dominance=dominance)
+    if search.max_harm <= 0:
+        logger.warning("No skills with positive damage. Cannot defeat bosses.")
+        return float('inf'), []
+
+    result = search.run()
+    if stats is not None:
+        stats.update(search.stats)
+    return result
+
+def solve_boss_battle_anytime(bosses_list, skills_list, time_budget=1.0, turn_limit=None):
+    """
+    Anytime variant of solve_boss_battle.
+
+    Starts from the greedy schedule and then runs the Branch and Bound search until it proves
+    optimality or `time_budget` seconds have passed. This is a generator that yields a progress
+    dict (see BossBattleSearch.progress) for the greedy schedule, for every improved incumbent
+    and once more at the end with `done` set to True.
+    """
+    started = time.perf_counter()
+    if not bosses_list:
+        yield {'turns': 0, 'path': [], 'lower_bound': 0, 'gap': 0, 'optimal': True, 'done': True}
+        return
+
+    search = BossBattleSearch(bosses_list, skills_list, turn_limit=turn_limit)
+    if search.max_harm <= 0:
+        yield {'turns': None, 'path': [], 'lower_bound': None, 'gap': None, 'optimal': False, 'done': True}
+        return
 
-                # --- Pruning Step 2 (for the skill-use state) ---
-                next_lower_bound = calculate_lower_bound(next_state, bosses_list, skills_list, max_potential_dps)
-                if next_lower_bound < min_completion_time:
-                    heapq.heappush(priority_queue, (next_lower_bound, next_state))
+    greedy_time, greedy_path = greedy_schedule(search.bosses, search.skills)
+    if turn_limit is None or greedy_time <= turn_limit:
+        search.seed_incumbent(greedy_time, greedy_path)
+    search.global_lower_bound = search.lower_bound(0, 0, search.bosses[0], 0)
+    if search.seed_path:
+        yield dict(search.progress(), done=False, elapsed=time.perf_counter() - started)
 
-    return min_completion_time, best_path
+    for _ in search.iterate(deadline=started + time_budget):
+        yield dict(search.progress(), done=False, elapsed=time.perf_counter() - started)
+    yield dict(search.progress(), done=True, elapsed=time.perf_counter() - started)
 
 def json_loader(json_file):
     """
@@ -0,0 +1,282 @@
+import heapq
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+
+from app.algorithms.boss_battle import CooldownPacker
+
+logger = logging.getLogger(__name__)
+
+# Number of solved fights kept by solve_boss_battle_dp, keyed by their canonical form.
+RESULT_CACHE_SIZE = 1024
+# Number of skill sets whose DP tables are kept, so fights sharing skills and later bosses reuse them.
+TABLE_CACHE_SIZE = 4
+
+def canonicalize_skills(skills_list):
+    """
+    Reduces a skill list to the skills that can matter for an optimal schedule.
+
+    - Skills without damage are kept as wait actions: a ready skill must be used, so they are
+      the only way to let a longer cooldown run out instead of using a weaker skill meanwhile.
+    - Skills dominated by a zero-cooldown skill with at least as much damage are dropped: that
+      skill is always ready and hits as hard, so it can replace every use of them.
+    - Identical [damage, cooldown] skills form one group. The copies stay separate charges,
+      but which copy fires is irrelevant, so the search branches once per group.
+
+    Returns (canonical, members): canonical is a tuple of (damage, cooldown, copies) sorted
+    by damage, hardest first, and members[i] lists the original indices of group i.
+    """
+    best_instant = max((harm for harm, cooldown, *_ in skills_list if cooldown == 0), default=None)
+    groups = {}
+    for i, (harm, cooldown, *_) in enumerate(skills_list):
+        if harm < 0:
+            continue
+        if best_instant is not None:
+            if cooldown == 0:
+                if harm < best_instant:
+                    continue
+            elif harm <= best_instant:
+                continue
+        groups.setdefault((harm, cooldown), []).append(i)
+
+    ordered = sorted(groups, key=lambda skill: (-skill[0], skill[1]))
+    # Copies of a zero-cooldown skill are never needed at once.
+    canonical = tuple((harm, cooldown, 1 if cooldown == 0 else len(groups[(harm, cooldown)]))
+                      for harm, cooldown in ordered)
+    members = [groups[skill] for skill in ordered]
+    return canonical, members
+
+class BossBattleDP:
+    """
+    Exact memoized DP over (boss, remaining HP, packed cooldowns) for one canonical skill set.
+
+    Every copy of a skill group gets its own cooldown field, and the fields of a group are
+    kept sorted in ascending order. Ticking preserves that order, so a group is ready when its
+    lowest field is 0, and using it drops that field and puts the full cooldown on top.
+
+    Turns that deal no damage (waiting with no skill ready, or a skill without damage) only
+    change the cooldowns and can form cycles, so a move is a run of them followed by one hit.
+    The runs from given cooldowns are found once by a shortest-path search and then shared by
+    every boss and HP, which keeps the DP itself acyclic.
+
+    Memo tables are keyed by the tuple of bosses still to fight, so fights with the same skills
+    and the same last bosses share their tables.
+    """
+    def __init__(self, canonical_skills):
+        self.skills = canonical_skills
+        self.packer = CooldownPacker([(harm, cooldown) for harm, cooldown, copies in canonical_skills
+                                      for _ in range(copies)])
+        width = self.packer.width
+
+        # Per group: (damage, cooldown, shift of its lowest field, mask of its fields, shift of its top field).
+        self.groups = []
+        field = 0
+        for harm, cooldown, copies in canonical_skills:
+            mask = ((1 << (copies * width)) - 1) << (field * width)
+            self.groups.append((harm, cooldown, field * width, mask, (copies - 1) * width))
+            field += copies
+        self.has_waits = any(harm == 0 for harm, _, _ in canonical_skills)
+        # Cooldowns -> {cooldowns reachable without damage: (turns, previous cooldowns, group_idx)}
+        self.waits = {}
+        self.tables = {}
+
+    def _table(self, bosses):
+        table = self.tables.get(bosses)
+        if table is None:
+            table = self.tables[bosses] = {}
+        return table
+
+    def _use(self, ticked, group):
+        """Cooldowns after using a ready group, given the cooldowns already ticked."""
+        _, cooldown, shift, mask, top = group
+        fields = (ticked & mask) >> shift
+        return (ticked & ~mask) | (((fields >> self.packer.width) | (cooldown << top)) << shift)
+
+    def _waits(self, cooldowns):
+        """
+        Returns the cooldowns reachable from `cooldowns` by turns that deal no damage, as a dict
+        of {cooldowns: (turns, previous cooldowns, group_idx)} with the fewest turns to each and
+        group_idx -1 for waiting. The start maps to (0, None, -1).
+        """
+        packer = self.packer
+        if not self.has_waits:
+            # Without skills that deal no damage the only such turns are forced waits.
+            reached = {cooldowns: (0, None, -1)}
+            if not packer.tick(cooldowns)[1]:
+                wait = min(cd for cd in packer.unpack(cooldowns) if cd > 0)
+                reached[packer.advance(cooldowns, wait)] = (wait, cooldowns, -1)
+            return reached
+
+        reached = self.waits.get(cooldowns)
+        if reached is not None:
+            return reached
+        reached = {cooldowns: (0, None, -1)}
+        queue = [(0, cooldowns)]
+        while queue:
+            turns, state = heapq.heappop(queue)
+            if reached[state][0] < turns:
+                continue
+            ticked, ready = packer.tick(state)
+            if ready:
+                steps = [(1, self._use(ticked, group), group_idx) for group_idx, group in enumerate(self.groups)
+                         if group[0] == 0 and (ready >> group[2]) & 1]
+            else:
+                wait = min(cd for cd in packer.unpack(state) if cd > 0)
+                steps = [(wait, packer.advance(state, wait), -1)]
+            for cost, next_state, group_idx in steps:
+                if next_state not in reached or turns + cost < reached[next_state][0]:
+                    reached[next_state] = (turns + cost, state, group_idx)
+                    heapq.heappush(queue, (turns + cost, next_state))
+        self.waits[cooldowns] = reached
+        return reached
+
+    def _moves(self, bosses, boss_hp, cooldowns):
+        """
+        Lists the moves from a state as (turns, group_idx, bosses, boss_hp, cooldowns, via): the
+        turns without damage that lead to the cooldowns `via`, then a hit with group_idx.
+        `bosses` is None once every boss is defeated.
+        """
+        packer = self.packer
+        if self.has_waits:
+            starts = [(via, wait) for via, (wait, _, _) in self._waits(cooldowns).items()]
+        elif packer.tick(cooldowns)[1]:
+            starts = ((cooldowns, 0),)
+        else:
+            wait = min(cd for cd in packer.unpack(cooldowns) if cd > 0)
+            starts = ((packer.advance(cooldowns, wait), wait),)
+        moves = []
+        for via, wait in starts:
+            ticked, ready = packer.tick(via)
+            for group_idx, (harm, cooldown, shift, mask, top) in enumerate(self.groups):
+                if not harm or not (ready >> shift) & 1:
+                    continue
+                group = (ticked & mask) >> shift
+                new_cooldowns = (ticked & ~mask) | (((group >> packer.width) | (cooldown << top)) << shift)
+                new_hp = boss_hp - harm
+                if new_hp > 0:
+                    moves.append((wait + 1, group_idx, bosses, new_hp, new_cooldowns, via))
+                elif len(bosses) > 1:
+                    moves.append((wait + 1, group_idx, bosses[1:], bosses[1], new_cooldowns, via))
+                else:
+                    moves.append((wait + 1, group_idx, None, 0, new_cooldowns, via))
+        return moves
+
+    def remaining_turns(self, bosses, boss_hp, cooldowns):
+        """
+        Returns the minimum number of turns to defeat `bosses` (a tuple whose first boss has
+        `boss_hp` left) from the given packed cooldowns.
+        The DP runs on an explicit stack, as fights can be far deeper than the recursion limit.
+        """
+        bosses = tuple(bosses)
+        table = self._table(bosses)
+        if cooldowns in table.get(boss_hp, ()):
+            return table[boss_hp][cooldowns]
+
+        stack = [(bosses, boss_hp, cooldowns, None)]
+        while stack:
+            state_bosses, state_hp, state_cooldowns, moves = stack[-1]
+            if moves is None:
+                moves = self._moves(state_bosses, state_hp, state_cooldowns)
+                stack[-1] = (state_bosses, state_hp, state_cooldowns, moves)
+                for _, _, next_bosses, next_hp, next_cooldowns, _ in moves:
+                    if next_bosses is not None and next_cooldowns not in self._table(next_bosses).get(next_hp, ()):
+                        stack.append((next_bosses, next_hp, next_cooldowns, None))
+                if stack[-1][3] is None:
+                    continue
+
+            stack.pop()
+            best = float('inf')
+            for turns, _, next_bosses, next_hp, next_cooldowns, _ in moves:
+                if next_bosses is not None:
+                    turns += self.tables[next_bosses][next_hp][next_cooldowns]
+                if turns < best:
+                    best = turns
+            self._table(state_bosses).setdefault(state_hp, {})[state_cooldowns] = best
+        return table[boss_hp][cooldowns]
+
+    def solve(self, bosses):
+        """Returns (min_completion_time, path) with path as (time, group_idx) tuples."""
+        bosses = tuple(bosses)
+        boss_hp, cooldowns = bosses[0], 0
+        total = self.remaining_turns(bosses, boss_hp, cooldowns)
+
+        # Walk forward along moves that keep the optimal value.
+        path = []
+        time_elapsed, remaining = 0, total
+        while bosses is not None:
+            for turns, group_idx, next_bosses, next_hp, next_cooldowns, via in self._moves(bosses, boss_hp, cooldowns):
+                rest = 0 if next_bosses is None else self.remaining_turns(next_bosses, next_hp, next_cooldowns)
+                if turns + rest == remaining:
+                    break
+            # Skills without damage used on the way to `via`, found backwards from it.
+            waits = self._waits(cooldowns)
+            uses = []
+            state = via
+            while state != cooldowns:
+                _, previous, wait_group = waits[state]
+                if wait_group != -1:
+                    uses.append((time_elapsed + waits[previous][0], wait_group))
+                state = previous
+            path.extend(reversed(uses))
+            path.append((time_elapsed + turns - 1, group_idx))
+            time_elapsed += turns
+            remaining = rest
+            bosses, boss_hp, cooldowns = next_bosses, next_hp, next_cooldowns
+        return total, path
+
+# DP solvers by canonical skill set, least recently used first.
+_solvers = OrderedDict()
+
+def _solver(canonical_skills):
+    solver = _solvers.pop(canonical_skills, None)
+    if solver is None:
+        solver = BossBattleDP(canonical_skills)
+    _solvers[canonical_skills] = solver
+    while len(_solvers) > TABLE_CACHE_SIZE:
+        _solvers.popitem(last=False)
+    return solver
+
+@lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _solve_canonical(bosses, canonical_skills):
+    min_time, path = _solver(canonical_skills).solve(bosses)
+    return min_time, tuple(path)
+
+def _assign_copies(path, members, skills_list):
+    """
+    Maps a (time, group_idx) path back to original skill indices, firing the first ready copy
+    of each group.
+    """
+    ready_at = [0] * len(skills_list)
+    original_path = []
+    for use_time, group_idx in path:
+        skill_idx = next(i for i in members[group_idx] if ready_at[i] <= use_time)
+        ready_at[skill_idx] = use_time + skills_list[skill_idx][1] + 1
+        original_path.append((use_time, skill_idx))
+    return original_path
+
+def solve_boss_battle_dp(bosses_list, skills_list):
+    """
+    Exact alternative to solve_boss_battle using memoized DP on the canonical skill set.
+
+    Results are cached by (bosses, canonical skills), so a fight that repeats, or differs only
+    in skill order, duplicate skills or dominated skills, costs a cache lookup. The DP tables
+    of recent skill sets are kept too, so fights sharing their last bosses reuse them.
+
+    Returns the same (min_completion_time, path) as solve_boss_battle, with path as
+    (time, skill_idx) tuples into the original skills_list.
+    """
+    if not bosses_list:
+        return 0, []
+
+    canonical, members = canonicalize_skills(skills_list)
+    if not canonical or canonical[0][0] <= 0:
+        logger.warning("No skills with positive damage. Cannot defeat bosses.")
+        return float('inf'), []
+
+    min_time, path = _solve_canonical(tuple(bosses_list), canonical)
+    return min_time, _assign_copies(path, members, skills_list)
+
+def clear_cache():
+    """Drops every cached result and DP table."""
+    _solve_canonical.cache_clear()
+    _solvers.clear()
@@ -0,0 +1,331 @@
+import heapq
+import logging
+import time
+
+from app.algorithms.boss_battle import (
+    BossBattleSearch, SearchTree, DominanceIndex, greedy_schedule,
+    NODE_MASK, SKILL_MASK, TIME_MASK, SKILL_SHIFT, TIME_SHIFT, BOUND_SHIFT, BOUND_FRACTION_BITS,
+    _heap_entry,
+)
+
+logger = logging.getLogger(__name__)
+
+# Any-order fights keep one bit per boss in the state, so the state space grows as 2^n.
+MAX_ANY_ORDER_BOSSES = 16
+
+class BossOrderSearch(BossBattleSearch):
+    """
+    Branch and Bound for boss rushes where the player picks which boss to fight next.
+
+    A state is (engaged, boss_hp, skill_cooldowns): `engaged` is a bitmask of the bosses
+    already defeated plus the one being fought, which has `boss_hp` left. Which of the engaged
+    bosses is still alive does not matter for the rest of the fight, so it is not part of the
+    state, and equivalent states reached through different orders meet in the dominance index.
+    The mask takes the place of the boss index of BossBattleSearch: remaining HP and hits only
+    depend on the set of bosses left, so the admissible bound is reused as is.
+
+    Bosses are sorted by HP and bosses with equal HP are interchangeable; only the first
+    unengaged boss of each HP value is ever chosen next.
+    """
+    def __init__(self, bosses_list, skills_list, turn_limit=None, dominance=True):
+        if len(bosses_list) > MAX_ANY_ORDER_BOSSES:
+            raise ValueError(f"Any-order fights support at most {MAX_ANY_ORDER_BOSSES} bosses")
+        # Sorted order keeps equal bosses adjacent; original indices are kept to report the order.
+        self.boss_ids = sorted(range(len(bosses_list)), key=lambda i: bosses_list[i])
+        super().__init__([bosses_list[i] for i in self.boss_ids], skills_list,
+                         turn_limit=turn_limit, dominance=dominance)
+        num_bosses = self.num_bosses
+        self.full_mask = (1 << num_bosses) - 1
+        self.seed_order = []
+        self._stronger = {}
+
+        # hp_after/hits_after are indexed by the engaged mask instead of a boss index.
+        self.hp_after = [0] * (1 << num_bosses)
+        self.hits_after = [0] * (1 << num_bosses)
+        fresh_turns = [self.fresh_turns(hp) for hp in self.bosses]
+        for mask in range(self.full_mask - 1, -1, -1):
+            boss = (~mask & (mask + 1)).bit_length() - 1  # Lowest boss not engaged yet
+            rest = mask | (1 << boss)
+            self.hp_after[mask] = self.hp_after[rest] + self.bosses[boss]
+            self.hits_after[mask] = self.hits_after[rest] + fresh_turns[boss]
+
+        self.tree = SearchTree(self.bosses, self.packer, boss_bits=max(num_bosses, 1))
+        self.index = DominanceIndex(self.tree, dominance=dominance)
+
+    def choices(self, engaged):
+        """Bosses that can be fought next: the first unengaged boss of every HP value."""
+        bosses = self.bosses
+        return [j for j in range(self.num_bosses)
+                if not (engaged >> j) & 1 and (j == 0 or bosses[j - 1] != bosses[j] or (engaged >> (j - 1)) & 1)]
+
+    def stronger_masks(self, engaged):
+        """
+        Engaged masks whose remaining bosses are a pointwise smaller sub-multiset of those left
+        by `engaged`: one more boss engaged, or an engaged boss swapped for a stronger one.
+        A state with such a mask, the same cooldowns, no more HP on the current boss and no
+        more elapsed time can fight the remaining bosses in matching order and never finishes
+        later.
+        """
+        masks = self._stronger.get(engaged)
+        if masks is None:
+            bosses = self.bosses
+            masks = []
+            for y in range(self.num_bosses):
+                if (engaged >> y) & 1:
+                    continue
+                masks.append(engaged | (1 << y))
+                for x in range(y):
+                    if (engaged >> x) & 1 and bosses[x] < bosses[y]:
+                        masks.append(engaged ^ (1 << x) | (1 << y))
+            # Keep only canonical masks: equal bosses are engaged first to last.
+            masks = [mask for mask in masks if all(
+                not (mask >> j) & 1 or (mask >> (j - 1)) & 1 or bosses[j - 1] != bosses[j]
+                for j in range(1, self.num_bosses))]
+            self._stronger[engaged] = masks
+        return masks
+
+    def is_dominated(self, engaged, boss_hp, cooldowns, time_elapsed):
+        """Returns True if an expanded state makes this one redundant, also across masks."""
+        tree, index = self.tree, self.index
+        if index.is_dominated(tree.key(engaged, boss_hp, cooldowns), time_elapsed):
+            return True
+        if not index.dominance:
+            return False
+        return any(index.is_dominated(tree.key(mask, boss_hp, cooldowns), time_elapsed)
+                   for mask in self.stronger_masks(engaged))
+
+    def _greedy(self, order):
+        """Best greedy schedule for a fixed boss order, as (completion_time, path)."""
+        bosses = [self.bosses[j] for j in order]
+        return min(greedy_schedule(bosses, self.skills), greedy_schedule(bosses, self.skills, finish_weakest=True),
+                   key=lambda result: result[0])
+
+    def seed_with_greedy(self):
+        """
+        Seeds the incumbent with a greedy schedule, improving the boss order by swapping pairs
+        of bosses for as long as that shortens the greedy fight.
+        """
+        order = list(range(self.num_bosses - 1, -1, -1))
+        best_time, best_path = self._greedy(order)
+        improved = True
+        while improved:
+            improved = False
+            for a in range(self.num_bosses):
+                for b in range(a + 1, self.num_bosses):
+                    if self.bosses[order[a]] == self.bosses[order[b]]:
+                        continue
+                    order[a], order[b] = order[b], order[a]
+                    completion_time, path = self._greedy(order)
+                    if completion_time < best_time:
+                        best_time, best_path, improved = completion_time, path, True
+                    else:
+                        order[a], order[b] = order[b], order[a]
+        if self.turn_limit is None or best_time <= self.turn_limit:
+            self.seed_incumbent(best_time, best_path)
+            self.seed_order = order
+
+    def refine_seed(self, deadline=None):
+        """
+        Improves the seeded schedule by solving its boss order exactly with the fixed-order
+        search. Best-first search over all orders rarely reaches a goal before it has
+        proven one, so this is where a better schedule comes from early on.
+        """
+        ordered = BossBattleSearch([self.bosses[j] for j in self.seed_order], self.skills, turn_limit=self.turn_limit)
+        ordered.seed_incumbent(self.min_completion_time, self.seed_path)
+        for _ in ordered.iterate(deadline=deadline):
+            pass
+        if ordered.min_completion_time < self.min_completion_time:
+            self.seed_incumbent(ordered.min_completion_time, ordered.best_path())
+
+    def best_path(self):
+        """Returns the (time, skill_idx) path of the best schedule found so far."""
+        return self.best_order_and_path()[1]
+
+    def best_order_and_path(self):
+        """
+        Returns (order, path) of the best schedule found: order lists the original boss
+        indices in fight order and path holds (time, skill_idx) tuples.
+        """
+        if self.best_parent == -1:
+            if not self.seed_path:
+                return [], []
+            return [self.boss_ids[j] for j in self.seed_order], list(self.seed_path)
+
+        tree, num_skills = self.tree, len(self.skills)
+        codes = tree.path(self.best_parent) + [(tree.times[self.best_parent], self.best_skill)]
+        root = self.best_parent
+        while tree.parents[root] != -1:
+            root = tree.parents[root]
+        engaged, _, _ = tree.unpack_key(tree.keys[root])
+
+        order = [engaged.bit_length() - 1]
+        path = []
+        for use_time, code in codes:
+            path.append((use_time, code % num_skills))
+            if code >= num_skills:
+                order.append(code // num_skills - 1)
+        return [self.boss_ids[j] for j in order], path
+
+    def iterate(self, deadline=None, check_every=1024):
+        """
+        Runs the search like BossBattleSearch.iterate. A heap entry stores its move as
+        skill_idx + num_skills * (next boss + 1), with 0 as next boss part when the current
+        boss survives, and tree nodes keep that code in place of the skill index.
+        """
+        bosses_list, skills_list, full_mask = self.bosses, self.skills, self.full_mask
+        num_skills = len(skills_list)
+        packer, tree, index, stats = self.packer, self.tree, self.index, self.stats
+        priority_queue = self.priority_queue
+        lower_bound, is_dominated = self.lower_bound, self.is_dominated
+
+        cutoff = float('inf') if self.turn_limit is None else self.turn_limit + 1
+        limit = min(self.min_completion_time, cutoff)
+
+        # One root per choice of the first boss.
+        to_expand = []
+        for j in reversed(self.choices(0)):
+            key = tree.key(1 << j, bosses_list[j], 0)
+            root = tree.add(-1, -1, 0, key)
+            index.add(key, root)
+            to_expand.append(root)
+        node_remaining = 0
+        self.global_lower_bound = lower_bound(0, 0, 0, 0)
+        until_check = check_every
+
+        while to_expand or priority_queue:
+            if deadline is not None:
+                until_check -= 1
+                if until_check == 0:
+                    if time.perf_counter() >= deadline:
+                        return
+                    until_check = check_every
+
+            if to_expand:
+                node = to_expand.pop()
+            else:
+                entry = heapq.heappop(priority_queue)
+                if entry >> BOUND_SHIFT >= limit:
+                    stats['pruned_bound'] += 1 + len(priority_queue)
+                    priority_queue.clear()
+                    break
+                self.global_lower_bound = (entry >> (BOUND_SHIFT - BOUND_FRACTION_BITS)) / (1 << BOUND_FRACTION_BITS)
+
+                parent = entry & NODE_MASK
+                code = ((entry >> SKILL_SHIFT) & SKILL_MASK) - 1
+                time_elapsed = (entry >> TIME_SHIFT) & TIME_MASK
+                node_remaining = (entry >> BOUND_SHIFT) - time_elapsed
+                engaged, boss_hp, cooldowns = tree.unpack_key(tree.keys[parent])
+                if code == -1:
+                    cooldowns = packer.advance(cooldowns, time_elapsed - tree.times[parent])
+                else:
+                    skill_idx, next_boss = code % num_skills, code // num_skills - 1
+                    cooldowns, _ = packer.tick(cooldowns)
+                    cooldowns |= skills_list[skill_idx][1] << (skill_idx * packer.width)
+                    boss_hp -= skills_list[skill_idx][0]
+                    if next_boss != -1:
+                        engaged |= 1 << next_boss
+                        boss_hp = bosses_list[next_boss]
+
+                if is_dominated(engaged, boss_hp, cooldowns, time_elapsed):
+                    stats['pruned_dominated'] += 1
+                    continue
+                key = tree.key(engaged, boss_hp, cooldowns)
+                node = tree.add(parent, code, time_elapsed, key)
+                index.add(key, node)
+
+            stats['expanded'] += 1
+            engaged, boss_hp, cooldowns = tree.unpack_key(tree.keys[node])
+            time_elapsed = tree.times[node]
+
+            ticked_cooldowns, ready = packer.tick(cooldowns)
+            if not ready:
+                min_wait_time = min(cd for cd in packer.unpack(cooldowns) if cd > 0)
+                new_time = time_elapsed + min_wait_time
+                new_cooldowns = packer.advance(cooldowns, min_wait_time)
+                next_lower_bound = lower_bound(new_time, engaged, boss_hp, new_cooldowns, node_remaining - min_wait_time)
+                if next_lower_bound < limit:
+                    heapq.heappush(priority_queue, _heap_entry(next_lower_bound, new_time, -1, node))
+                    stats['pushed'] += 1
+                else:
+                    stats['pruned_bound'] += 1
+                continue
+
+            new_time = time_elapsed + 1
+            child_at_least = node_remaining - 1
+            choices = None
+            for skill_idx in packer.ready_indices(ready):
+                harm, cooldown = skills_list[skill_idx]
+                new_cooldowns = ticked_cooldowns | (cooldown << (skill_idx * packer.width))
+                new_boss_hp = boss_hp - harm
+
+                if new_boss_hp > 0:
+                    children = ((skill_idx, engaged, new_boss_hp),)
+                elif engaged == full_mask:
+                    if new_time < limit:
+                        self.min_completion_time = limit = new_time
+                        self.best_parent, self.best_skill = node, skill_idx
+                        yield
+                    continue
+                else:
+                    # The boss falls: branch on the boss to fight next.
+                    if choices is None:
+                        choices = self.choices(engaged)
+                    children = [(skill_idx + num_skills * (j + 1), engaged | (1 << j), bosses_list[j]) for j in choices]
+
+                # Every choice leaves the same bosses to fight, so they share one bound.
+                _, new_engaged, new_hp = children[0]
+                next_lower_bound = lower_bound(new_time, new_engaged, new_hp, new_cooldowns, child_at_least)
+                if next_lower_bound < limit:
+                    for code, _, _ in children:
+                        heapq.heappush(priority_queue, _heap_entry(next_lower_bound, new_time, code, node))
+                    stats['pushed'] += len(children)
+                else:
+                    stats['pruned_bound'] += len(children)
+
+        self.finished = True
+
+def solve_boss_battle_any_order(bosses_list, skills_list, turn_limit=None, time_budget=None, stats=None):
+    """
+    Solves the boss rush when the player may fight the bosses in any order.
+
+    The search starts from a greedy schedule over a hill-climbed boss order, which is often
+    already optimal, so most of the search goes into proving it. With `time_budget` the search
+    stops after that many seconds and returns the best schedule found; stats['optimal'] then
+    tells whether it is proven optimal and stats['lower_bound'] how short a fight could be.
+
+    Args:
+        bosses_list (list): A list of integers for each boss's health.
+        skills_list (list): A list of lists, where each inner list is [harm, cooldown, name].
+        turn_limit (int, optional): Fights that need more turns are reported as unsolvable.
+        time_budget (float, optional): Wall-clock seconds before returning the best schedule.
+        stats (dict, optional): Filled with node expansion and pruning counters, 'optimal'
+            and 'lower_bound'.
+
+    Returns:
+        A tuple containing:
+        - The minimum time to defeat all bosses (inf if none within turn_limit).
+        - The order in which to fight the bosses, as indices into bosses_list.
+        - The optimal sequence of skill uses as (time, skill_idx) tuples.
+    """
+    if not bosses_list:
+        return 0, [], []
+
+    search = BossOrderSearch(bosses_list, skills_list, turn_limit=turn_limit)
+    if search.max_harm <= 0:
+        logger.warning("No skills with positive damage. Cannot defeat bosses.")
+        return float('inf'), [], []
+
+    started = time.perf_counter()
+    deadline = None if time_budget is None else started + time_budget
+    search.seed_with_greedy()
+    if search.seed_order:
+        search.refine_seed(deadline=None if time_budget is None else started + time_budget / 4)
+    for _ in search.iterate(deadline=deadline):
+        pass
+    if stats is not None:
+        progress = search.progress()
+        stats.update(search.stats, optimal=progress['optimal'], lower_bound=progress['lower_bound'])
+    if search.min_completion_time == float('inf'):
+        return float('inf'), [], []
+    order, path = search.best_order_and_path()
+    return search.min_completion_time, order, path
@@ -2,6 +2,10 @@ import random
 import time
 import hashlib
 import json
+from array import array
+from itertools import chain, compress
+
+from app.algorithms.maze_index import MazeIndex
 
 class PasswordLock:
     def __init__(self):
@@ -24,6 +28,94 @@ class PasswordLock:
         # 比较计算出的哈希值与存储的哈希值
         return calculated_hash == stored_hash
 
+# --- Candidate Counting ---
+# Every 3-digit password is encoded as the bit 100 * d1 + 10 * d2 + d3 of a Python int.
+# A constraint is then a bitset of the passwords it allows, and the candidates left by a
+# set of clues is the popcount of their AND. Bitsets are built once at import time.
+PASSWORD_SPACE = 1000
+ALL_CANDIDATES = (1 << PASSWORD_SPACE) - 1
+
+# Default difficulty window: how many passwords the chosen clues may leave open.
+DEFAULT_CANDIDATE_RANGE = (10, 150)
+MAX_CLUE_RESAMPLES = 32
+
+
+def _password_index(password):
+    """Maps a 3-digit password (list of ints) to its bit position."""
+    return password[0] * 100 + password[1] * 10 + password[2]
+
+
+def _build_constraint_bitsets():
+    """
+    Precomputes the bitset of every constraint the generator can emit.
+    Keys are tuples of the constraint lists, e.g. (1, 0) for "first digit is even".
+    """
+    primes = {2, 3, 5, 7}
+    bitsets = {}
+    prime_unique = 0
+    unique = 0
+    for value in range(PASSWORD_SPACE):
+        digits = (value // 100, value // 10 % 10, value % 10)
+        bit = 1 << value
+        if len(set(digits)) == 3:
+            unique |= bit
+            if all(d in primes for d in digits):
+                prime_unique |= bit
+        for pos, d in enumerate(digits):
+            # Parity tips, e.g. [position, 0] for even. Position is 1-based.
+            parity_key = (pos + 1, d % 2)
+            bitsets[parity_key] = bitsets.get(parity_key, 0) | bit
+            # Digit reveal masks, e.g. [-1, 5, -1]
+            mask = [-1, -1, -1]
+            mask[pos] = d
+            mask_key = tuple(mask)
+            bitsets[mask_key] = bitsets.get(mask_key, 0) | bit
+    bitsets[(-1, -1)] = prime_unique
+    bitsets[(-2, -2)] = unique
+    return bitsets
+
+
+CONSTRAINT_BITSETS = _build_constraint_bitsets()
+
+
+def candidate_bitset(constraints):
+    """
+    Returns the bitset of passwords consistent with all constraints.
+    Unknown constraints do not narrow the candidate set, matching the solver.
+    """
+    candidates = ALL_CANDIDATES
+    for constraint in constraints:
+        candidates &= CONSTRAINT_BITSETS.get(tuple(constraint), ALL_CANDIDATES)
+    return candidates
+
+
+def count_candidates(constraints):
+    """Returns the exact number of passwords left open by the constraints."""
+    return candidate_bitset(constraints).bit_count()
+
+
+def count_tries(constraints, password):
+    """
+    Returns the number of tries `solve_puzzle` needs to reach the password:
+    the backtracking enumerates candidates in ascending order, so this is the
+    number of candidates up to and including the password.
+    """
+    below = (1 << (_password_index(password) + 1)) - 1
+    return (candidate_bitset(constraints) & below).bit_count()
+
+
+def _range_distance(value, value_range):
+    """Returns how far value lies outside the inclusive (low, high) range, 0 if inside or no range."""
+    if value_range is None:
+        return 0
+    low, high = value_range
+    if value < low:
+        return low - value
+    if value > high:
+        return value - high
+    return 0
+
+
 class Clues:
     def __init__(self, clue):
         self.clues = []
@@ -31,25 +123,31 @@ class Clues:
 
     def _add_clue(self, clues):
         """
-        Adds a clue to the list of clues.
+        Adds 1-3 distinct clues picked from the tips.
         """
-        length = len(clues)
-        num_clue = random.randint(1, 3)
-        for _ in range(num_clue):
-            try:
-                # Clues = [[], [], []]
-                clue = clues[random.randint(0, length - 1)]
-            except IndexError:
-                # If the list is empty, skip adding a clue
-                return
-            # Append the clue to the list
-            self.clues.append(clue)
+        if not clues:
+            # If the list is empty, skip adding a clue
+            return
+        num_clue = min(random.randint(1, 3), len(clues))
+        # Clues = [[], [], []]
+        self.clues.extend(random.sample(clues, num_clue))
+
+    def resample(self, clues):
+        """
+        Replaces the current clues with a fresh random pick.
+        """
+        self.clues = []
+        self._add_clue(clues)
+
+    def count_candidates(self):
+        """Returns how many passwords the current clues leave open."""
+        return count_candidates(self.clues)
 
     def get_clues(self):
         return self.clues
 
 class Locker:
-    def __init__(self, locker_id, is_locked=True):
+    def __init__(self, locker_id, is_locked=True, candidate_range=DEFAULT_CANDIDATE_RANGE, tries_range=None):
         self.password_lock = PasswordLock()
         self.locker_id = locker_id
         self.tips = []
@@ -57,9 +155,33 @@ class Locker:
         self.password_hash = self.password_lock.hash_password(''.join(map(str, self.password)))
         # The locker can be locked or unlocked
         self.clue = Clues(self.tips)
+        self.candidates, self.tries = self._balance_clues(candidate_range, tries_range)
         self.is_locked = is_locked
         self.reward = self._get_reward(locker_id)
 
+    def _balance_clues(self, candidate_range, tries_range):
+        """
+        Resamples the clues until the number of remaining candidates (and, if given,
+        the number of solver tries) falls inside the requested ranges.
+        If no sample qualifies within MAX_CLUE_RESAMPLES, the closest one is kept.
+        Returns (candidates, tries) for the chosen clues.
+        """
+        best = None
+        for _ in range(MAX_CLUE_RESAMPLES):
+            count = self.clue.count_candidates()
+            tries = count_tries(self.clue.get_clues(), self.password)
+
+            distance = _range_distance(count, candidate_range) + _range_distance(tries, tries_range)
+            if best is None or distance < best[0]:
+                best = (distance, list(self.clue.get_clues()), count, tries)
+            if distance == 0:
+                break
+            self.clue.resample(self.tips)
+
+        _, clues, count, tries = best
+        self.clue.clues = clues
+        return count, tries
+
     def _get_reward(self, locker_id):
         """
         Determines the reward for unlocking the locker.
@@ -107,7 +229,8 @@ class Locker:
             mask[revealed_idx] = password[revealed_idx]
             self.tips.append(mask)
 
-        if prime_flag:
+        # The solver reads [-1, -1] as "all digits are prime and unique".
+        if prime_flag and unique_flag:
             self.tips.append([-1,-1])
         
         if unique_flag:
@@ -154,11 +277,92 @@ class BossGroup:
             blood = random.randint(1, 100)
             self.bosses.append(blood)
 
+# Maps '.' to 1 and every other cell character to 0, for bytes.translate.
+_OPEN_CELL_MASK = bytes(b == ord('.') for b in range(256))
+_NON_WALL_MASK = bytes(b != ord('#') for b in range(256))
+
+class PlacementPolicy:
+    """
+    Restricts where Maze.place_elements puts Gold ('G'), Traps ('T') and Levers ('L').
+    Cells are flat indices r * width + c. `allowed` filters the candidates of a kind once,
+    `accept` may veto a single pick given what was placed so far, and `placed` is told about
+    every pick. Each should cost O(1) per cell, so placement stays O(cells).
+    """
+    def start(self, maze_obj):
+        """Called before a maze is populated; resets any per-maze state."""
+
+    def allowed(self, maze_obj, kind, cells):
+        return cells
+
+    def accept(self, maze_obj, kind, cell):
+        return True
+
+    def placed(self, maze_obj, kind, cell):
+        """Called after `cell` received an item of `kind`."""
+
+class TrapsOffMainPath(PlacementPolicy):
+    """Keeps traps off the unique path, so avoiding them never costs a detour."""
+    def allowed(self, maze_obj, kind, cells):
+        if kind != 'T':
+            return cells
+        width = maze_obj.width
+        on_path = {r * width + c for r, c in maze_obj.unique_path}
+        return [cell for cell in cells if cell not in on_path]
+
+class MinSpacing(PlacementPolicy):
+    """Keeps items of the given kinds at least `distance` steps (Manhattan) apart."""
+    def __init__(self, distance, kinds='GTL'):
+        self.distance = distance
+        self.kinds = kinds
+        # Offsets within the distance, computed once
+        self._offsets = [(dr, dc) for dr in range(-distance + 1, distance)
+                         for dc in range(-distance + 1, distance) if 0 < abs(dr) + abs(dc) < distance]
+
+    def accept(self, maze_obj, kind, cell):
+        if kind not in self.kinds:
+            return True
+        maze, height, width = maze_obj.maze, maze_obj.height, maze_obj.width
+        r, c = divmod(cell, width)
+        for dr, dc in self._offsets:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < height and 0 <= nc < width and maze[nr][nc] in self.kinds:
+                return False
+        return True
+
+    def placed(self, maze_obj, kind, cell):
+        # Write the item right away so later picks see it
+        r, c = divmod(cell, maze_obj.width)
+        maze_obj.maze[r][c] = kind
+
+class RegionDensity(PlacementPolicy):
+    """Allows at most `max_items` items of the given kinds per `region_size` square region."""
+    def __init__(self, region_size, max_items, kinds='GT'):
+        self.region_size = region_size
+        self.max_items = max_items
+        self.kinds = kinds
+        self._counts = {}
+
+    def start(self, maze_obj):
+        self._counts = {}
+
+    def _region(self, maze_obj, cell):
+        r, c = divmod(cell, maze_obj.width)
+        return r // self.region_size, c // self.region_size
+
+    def accept(self, maze_obj, kind, cell):
+        return kind not in self.kinds or self._counts.get(self._region(maze_obj, cell), 0) < self.max_items
+
+    def placed(self, maze_obj, kind, cell):
+        if kind in self.kinds:
+            region = self._region(maze_obj, cell)
+            self._counts[region] = self._counts.get(region, 0) + 1
+
 class Maze:
-    def __init__(self, width, height):
+    def __init__(self, width, height, placement_policies=()):
         """ Initializes a maze with given width and height.
         The maze is represented as a grid of characters.
         '.' represents a path, '#' represents a wall.
+        placement_policies: PlacementPolicy instances that restrict where items are placed.
         """
         if width < 7 or height < 7:
             raise ValueError("Maze dimensions must be at least 7x7.")
@@ -177,6 +381,7 @@ class Maze:
         self.unique = False
         self.start_pos = None
         self.end_pos = None
+        self.placement_policies = list(placement_policies)
         self.player_skills = self._set_player_skills()
 
     def _set_player_skills(self):
@@ -287,69 +492,78 @@ class Maze:
         self.maze[self.end_pos[0]][self.end_pos[1]] = 'E'
 
     def place_elements(self):
-        """Randomly places Gold, Traps, etc. on path cells."""
-        path_cells = []
-        for r in range(self.height):
-            for c in range(self.width):
-                # Exclude start and end positions from item placement
-                if self.maze[r][c] == '.':
-                    path_cells.append((r, c))
-        
-        random.shuffle(path_cells)
-
-        # Define proportions based on available path cells
-        num_gold = int(len(path_cells) * 0.1)
-        num_traps = int(len(path_cells) * 0.05)
+        """
+        Randomly places the boss, Gold, Traps and Levers on path cells.
+        Without placement policies all items are drawn with a single random.sample call
+        over the open cells; with them, every kind is drawn from the cells its policies allow
+        and each pick must be accepted by all of them. Both stay O(cells).
+        """
+        width = self.width
 
-        num_bosses = 1
-        if self.width <= 10:
-            num_levers = 2
-        else:
-            num_levers = 3
-        
-        # Set the boss in final position
-        if num_bosses > 0 and self.unique_path:
-            # Find the empty cell around the end point
+        # Set the boss in final position, next to the end point
+        boss_cell_was_open = False
+        if self.unique_path:
             r, c = self.unique_path[-2]  # Get the second last cell in the unique path
-            if (r, c) in path_cells:
-                path_cells.remove((r, c))  # Remove it from path cells
+            boss_cell_was_open = self.maze[r][c] == '.'
             self.maze[r][c] = 'B'
             self.bosses_group = BossGroup()
             self.bosses[(r, c)] = self.bosses_group
 
-        # Place Gold, Traps, Levers
-        # Set gold
-        for _ in range(num_gold):
-            if not path_cells: break
-            r, c = path_cells.pop()
-            self.maze[r][c] = 'G'
+        # Open cells as flat indices r * width + c; S, E and the boss are not '.'
+        mask = "".join(chain.from_iterable(self.maze)).encode().translate(_OPEN_CELL_MASK)
+        path_cells = list(compress(range(len(mask)), mask))
+
+        # Define proportions based on available path cells, the boss cell included
+        open_cells = len(path_cells) + boss_cell_was_open
+        counts = {
+            'G': int(open_cells * 0.1),
+            'T': int(open_cells * 0.05),
+            'L': 2 if self.width <= 10 else 3,
+        }
+
+        if not self.placement_policies:
+            picks = random.sample(path_cells, min(sum(counts.values()), len(path_cells)))
+            placed = {}
+            for kind, count in counts.items():
+                placed[kind], picks = picks[:count], picks[count:]
+        else:
+            placed = self._place_with_policies(path_cells, counts)
 
-        # Set traps
-        for _ in range(num_traps):
-            if not path_cells: break
-            r, c = path_cells.pop()
-            self.maze[r][c] = 'T'
+        maze = self.maze
+        for kind in ('G', 'T'):
+            for cell in placed[kind]:
+                maze[cell // width][cell % width] = kind
 
         # Set levers
-        for _ in range(num_levers):
-            if not path_cells: break
-            r, c = path_cells.pop()
-            self.maze[r][c] = 'L'
-            if not self.locker_id:
-                locker_id = 1
-            else:
-                locker_id = max(self.locker_id) + 1
+        locker_id = max(self.locker_id, default=0)
+        for cell in placed['L']:
+            r, c = divmod(cell, width)
+            maze[r][c] = 'L'
+            locker_id += 1
             self.locker_id.add(locker_id)
-            locker = Locker(locker_id)
-            self.lockers[(r, c)] = locker
-
-    def _get_adjacent_path_cell(self, r, c):
-        """Given a coordinate (r, c) on a wall, find the adjacent path cell."""
-        for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            nr, nc = r + dr, c + dc
-            if 0 <= nr < self.height and 0 <= nc < self.width and self.maze[nr][nc] != '#':
-                return (nr, nc)
-        return None
+            self.lockers[(r, c)] = Locker(locker_id)
+
+    def _place_with_policies(self, path_cells, counts):
+        """Picks the cells of each kind in turn, from those its policies allow, in random order."""
+        policies = self.placement_policies
+        for policy in policies:
+            policy.start(self)
+        taken = set()
+        placed = {}
+        for kind, count in counts.items():
+            candidates = [cell for cell in path_cells if cell not in taken]
+            for policy in policies:
+                candidates = policy.allowed(self, kind, candidates)
+            chosen = placed[kind] = []
+            for cell in random.sample(candidates, len(candidates)):
+                if len(chosen) == count:
+                    break
+                if all(policy.accept(self, kind, cell) for policy in policies):
+                    chosen.append(cell)
+                    taken.add(cell)
+                    for policy in policies:
+                        policy.placed(self, kind, cell)
+        return placed
 
     def _find_char(self, char):
         """
@@ -362,10 +576,14 @@ class Maze:
                     return (r, c)
         return None
 
-    def unique_path_checker(self):
+    def unique_path_checker(self, cancelled=None):
         """
-        Check if the maze has a unique path from start to end using DFS.
+        Check if the maze has a unique path from start to end.
         If a unique path is found, it is stored in self.unique_path.
+        One iterative DFS from S finds a path to E and the low-link of every cell: the path is
+        unique exactly when none of its steps lies on a cycle, i.e. every step is a bridge.
+        This is O(cells). `cancelled`, if given, is polled during the search; once it returns
+        True the check stops and returns False.
         """
         self.unique_path = []
         s_pos = self._find_char('S')
@@ -373,42 +591,63 @@ class Maze:
 
         if not s_pos or not e_pos: return False
 
-        start_node = self._get_adjacent_path_cell(s_pos[0], s_pos[1])
-        end_node = self._get_adjacent_path_cell(e_pos[0], e_pos[1])
-
-        if not start_node or not end_node: return False
-
-        stack = [(start_node, [start_node])]
-        paths_found = []
-
+        # Flat grid with an extra ring of walls, so neighbors need no bounds checks
+        padded_width = self.width + 2
+        rows = ["#" * padded_width]
+        rows.extend("#" + "".join(row) + "#" for row in self.maze)
+        rows.append("#" * padded_width)
+        is_open = "".join(rows).encode().translate(_NON_WALL_MASK)
+        start = (s_pos[0] + 1) * padded_width + s_pos[1] + 1
+        end = (e_pos[0] + 1) * padded_width + e_pos[1] + 1
+
+        steps = (-padded_width, padded_width, -1, 1)
+        size = len(is_open)
+        disc = array('i', bytes(4 * size))  # Discovery time, 0 while unvisited
+        low = array('i', bytes(4 * size))
+        parent = array('i', bytes(4 * size))
+        next_step = bytearray(size)
+        disc[start] = low[start] = timer = 1
+        parent[start] = -1
+        stack = [start]
+        iterations = 0
         while stack:
-            current, path = stack.pop()
-
-            if current == end_node:
-                full_path = [s_pos] + path + [e_pos]
-                paths_found.append(full_path)
-                if len(paths_found) > 1:
-                    self.unique_path = []
-                    return False
-                continue
-
-            r, c = current
-            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nr, nc = r + dr, c + dc
-                neighbor = (nr, nc)
-
-                # A valid move is within bounds, not a wall, and not creating a cycle.
-                if 0 <= nr < self.height and 0 <= nc < self.width and \
-                   self.maze[nr][nc] != '#' and neighbor not in path:
-                    new_path = list(path)
-                    new_path.append(neighbor)
-                    stack.append((neighbor, new_path))
-
-        if len(paths_found) == 1:
-            self.unique_path = paths_found[0]
-            return True
-
-        return False
+            iterations += 1
+            if cancelled is not None and not iterations & 0xFFFF and cancelled():
+                return False
+            node = stack[-1]
+            step = next_step[node]
+            if step < 4:
+                next_step[node] = step + 1
+                neighbor = node + steps[step]
+                if not is_open[neighbor]:
+                    continue
+                if not disc[neighbor]:
+                    timer += 1
+                    disc[neighbor] = low[neighbor] = timer
+                    parent[neighbor] = node
+                    stack.append(neighbor)
+                elif neighbor != parent[node] and disc[neighbor] < low[node]:
+                    low[node] = disc[neighbor]
+            else:
+                stack.pop()
+                up = parent[node]
+                if up >= 0 and low[node] < low[up]:
+                    low[up] = low[node]
+
+        if not disc[end]:
+            return False
+        path = []
+        node = end
+        while node != start:
+            up = parent[node]
+            if low[node] <= disc[up]:  # This step lies on a cycle, so there is a detour around it
+                return False
+            path.append(node)
+            node = up
+        path.append(start)
+        path.reverse()
+        self.unique_path = [(node // padded_width - 1, node % padded_width - 1) for node in path]
+        return True
 
 def json_saver(maze_obj):
     """
@@ -435,20 +674,26 @@ def json_saver(maze_obj):
         json.dump(maze_data, f, indent=4)
     print(f"Maze data saved to {path_file}")
 
-def generate_maze(width, height):
+def generate_maze(width, height, placement_policies=(), stats=None, cancelled=None):
     """
     A standalone generator function that creates a maze, ensures it has a
     unique path, places elements, and yields the maze state at key steps.
     This function is intended to be imported and used by the API endpoint.
+    placement_policies are passed on to Maze (see PlacementPolicy).
+    Mazes rebuilt for lack of a unique path are counted in stats['generation_retries'] if
+    `stats` is given. `cancelled` is polled by the unique-path check, and the generator
+    ends without a final payload once it returns True.
+    The final payload carries the MazeIndex of the finished maze under 'index'; it is not JSON
+    data, so callers that send the payload on replace it (see MazeIndex.to_dict).
     """
     while True:
-        maze_obj = Maze(width, height)
+        maze_obj = Maze(width, height, placement_policies)
         # The generate_maze method is now a generator itself.
         # We iterate through it to yield each step of the wall generation.
         for maze_state in maze_obj.generate_maze():
             yield {'maze': maze_state}
         
-        if maze_obj.unique_path_checker():
+        if maze_obj.unique_path_checker(cancelled):
             # Yield the maze with a guaranteed unique path
             maze_obj.place_elements()
             
@@ -462,7 +707,8 @@ def generate_maze(width, height):
                     'position': pos,
                     'id': locker.locker_id,
                     'constraints': locker.clue.get_clues(), # Use the randomly selected clues as the definitive constraints
-                    'password_hash': locker.password_hash
+                    'password_hash': locker.password_hash,
+                    'candidates': locker.candidates,
                 })
 
             # Yield the final maze with all elements placed and boss data
@@ -472,8 +718,13 @@ def generate_maze(width, height):
                 'lockers': lockers_data,
                 'player_skills': maze_obj.player_skills,
                 'unique_path': maze_obj.unique_path,
+                'index': MazeIndex(maze_obj.maze),
             }
             break # Exit the loop once a valid maze is created
+        if cancelled is not None and cancelled():
+            return
+        if stats is not None:
+            stats['generation_retries'] = stats.get('generation_retries', 0) + 1
 
 if __name__ == "__main__":
     width, height = 15, 15  # Example dimensions
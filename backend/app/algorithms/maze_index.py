@@ -0,0 +1,205 @@
+from array import array
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Neighbor order of pathfinder_dp._build_graph, so BFS visits (and the main path) match it.
+_DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+class MazeIndex:
+    """
+    Facts about one maze computed in a single scan and one BFS, for every solver to share.
+
+    Open cells are numbered row by row; `cells[i]` is the flat position r * width + c of node i.
+    Adjacency is in CSR form: the neighbors of node i are targets[offsets[i]:offsets[i + 1]].
+    The BFS from S gives a spanning tree (the maze itself for a perfect maze) with `parent` and
+    `depth` per node, the S to E `main_path` (the shortest one, as find_main_path returns it)
+    and the gold and trap counts of every subtree. Nodes S cannot reach have parent -1 and
+    depth -1. Per-node data is kept in compact `array('i')` columns rather than lists, so large
+    mazes stay affordable in the maze store. The binary lifting table for lowest common
+    ancestor queries is only built by the first lca() call, and is never serialized.
+
+    to_dict() and from_dict() convert the index to plain JSON data and back without touching
+    the maze again.
+    """
+    # Per-node columns, stored as arrays and serialized as lists
+    _ARRAYS = ('cells', 'offsets', 'targets', 'parent', 'depth', 'subtree_gold', 'subtree_traps')
+    # Lookup tables built on first use (ancestors(), items())
+    _CACHES = ('_up', '_items')
+
+    def __init__(self, maze: List[str]):
+        height, width = len(maze), len(maze[0]) if maze else 0
+        self.height, self.width = height, width
+
+        self.cells = array('i')
+        node_of = array('i', [-1]) * (height * width)
+        self.gold: List[int] = []
+        self.traps: List[int] = []
+        self.bosses: List[int] = []
+        self.levers: List[int] = []
+        self.start = self.end = -1
+        for r, row in enumerate(maze):
+            for c, cell in enumerate(row):
+                if cell == '#':
+                    continue
+                node = len(self.cells)
+                node_of[r * width + c] = node
+                self.cells.append(r * width + c)
+                if cell == 'G':
+                    self.gold.append(node)
+                elif cell == 'T':
+                    self.traps.append(node)
+                elif cell == 'B':
+                    self.bosses.append(node)
+                elif cell == 'L':
+                    self.levers.append(node)
+                elif cell == 'S' and self.start < 0:
+                    self.start = node
+                elif cell == 'E' and self.end < 0:
+                    self.end = node
+
+        self.offsets = array('i', [0])
+        self.targets = array('i')
+        for pos in self.cells:
+            r, c = divmod(pos, width)
+            for dr, dc in _DIRECTIONS:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < height and 0 <= nc < width:
+                    neighbor = node_of[nr * width + nc]
+                    if neighbor >= 0:
+                        self.targets.append(neighbor)
+            self.offsets.append(len(self.targets))
+
+        self._build_tree()
+        self._node_of = node_of
+
+    def _build_tree(self):
+        count = len(self.cells)
+        self.parent = array('i', [-1]) * count
+        self.depth = array('i', [-1]) * count
+        order = []
+        if self.start >= 0:
+            self.depth[self.start] = 0
+            queue = deque([self.start])
+            offsets, targets, parent, depth = self.offsets, self.targets, self.parent, self.depth
+            while queue:
+                node = queue.popleft()
+                order.append(node)
+                for neighbor in targets[offsets[node]:offsets[node + 1]]:
+                    if depth[neighbor] < 0:
+                        depth[neighbor] = depth[node] + 1
+                        parent[neighbor] = node
+                        queue.append(neighbor)
+
+        self.main_path: List[int] = []
+        if self.end >= 0 and self.depth[self.end] >= 0:
+            node = self.end
+            while node >= 0:
+                self.main_path.append(node)
+                node = self.parent[node]
+            self.main_path.reverse()
+
+        self.subtree_gold = array('i', bytes(4 * count))
+        self.subtree_traps = array('i', bytes(4 * count))
+        for node in self.gold:
+            self.subtree_gold[node] = 1
+        for node in self.traps:
+            self.subtree_traps[node] = 1
+        for node in reversed(order):
+            p = self.parent[node]
+            if p >= 0:
+                self.subtree_gold[p] += self.subtree_gold[node]
+                self.subtree_traps[p] += self.subtree_traps[node]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MazeIndex":
+        index = cls.__new__(cls)
+        for key, value in data.items():
+            setattr(index, key, array('i', value) if key in cls._ARRAYS else value)
+        node_of = array('i', [-1]) * (index.height * index.width)
+        for node, pos in enumerate(index.cells):
+            node_of[pos] = node
+        index._node_of = node_of
+        return index
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Tables built on first use are left out, so an index sent to a pool worker stays compact
+        return {key: value for key, value in vars(self).items() if key not in self._CACHES}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: value.tolist() if key in self._ARRAYS else value
+                for key, value in vars(self).items() if not key.startswith('_')}
+
+    def node(self, r: int, c: int) -> int:
+        """Returns the node id of an open cell, or -1 for a wall or a cell outside the maze."""
+        if not (0 <= r < self.height and 0 <= c < self.width):
+            return -1
+        return self._node_of[r * self.width + c]
+
+    def ancestors(self) -> List[array]:
+        """The binary lifting table: [k][v] is the 2^k-th ancestor of v, or -1. Built on first use."""
+        if getattr(self, '_up', None) is None:
+            levels = max(1, max(self.depth, default=0).bit_length())
+            up = [self.parent]
+            for _ in range(1, levels):
+                previous = up[-1]
+                up.append(array('i', [previous[p] if p >= 0 else -1 for p in previous]))
+            self._up = up
+        return self._up
+
+    def position(self, node: int) -> Tuple[int, int]:
+        return divmod(self.cells[node], self.width)
+
+    def neighbors(self, node: int) -> Sequence[int]:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def graph(self) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+        """
+        The adjacency dict of pathfinder_dp.build_graph, built from the index without the maze.
+        It is built anew on every call and not kept, as a dict of tuples is many times the size
+        of the CSR columns the stored index holds.
+        """
+        positions = [divmod(pos, self.width) for pos in self.cells]
+        return {positions[node]: [positions[n] for n in self.neighbors(node)] for node in range(len(positions))}
+
+    def items(self) -> Dict[int, str]:
+        """The item on each node that holds one ('G', 'T', 'B', 'L' or 'E'), for O(1) lookups."""
+        if getattr(self, '_items', None) is None:
+            items = {node: kind for kind, nodes in (('G', self.gold), ('T', self.traps), ('B', self.bosses), ('L', self.levers))
+                     for node in nodes}
+            if self.end >= 0:
+                items[self.end] = 'E'
+            self._items = items
+        return self._items
+
+    def main_path_cells(self) -> Optional[List[Tuple[int, int]]]:
+        """The S to E main path as (r, c) tuples, or None if E is unreachable."""
+        return [self.position(node) for node in self.main_path] or None
+
+    def lca(self, u: int, v: int) -> int:
+        """Lowest common ancestor of two nodes in the BFS tree, or -1 if either is unreachable."""
+        depth = self.depth
+        if depth[u] < 0 or depth[v] < 0:
+            return -1
+        up = self.ancestors()
+        if depth[u] < depth[v]:
+            u, v = v, u
+        diff = depth[u] - depth[v]
+        k = 0
+        while diff:
+            if diff & 1:
+                u = up[k][u]
+            diff >>= 1
+            k += 1
+        if u == v:
+            return u
+        for k in range(len(up) - 1, -1, -1):
+            if up[k][u] != up[k][v]:
+                u, v = up[k][u], up[k][v]
+        return self.parent[u]
+
+    def tree_distance(self, u: int, v: int) -> int:
+        """Steps between two nodes along the BFS tree; the maze distance in a perfect maze."""
+        ancestor = self.lca(u, v)
+        if ancestor < 0:
+            return -1
+        return self.depth[u] + self.depth[v] - 2 * self.depth[ancestor]
@@ -1,6 +1,7 @@
 import logging
 from collections import deque
 import json
+import sys
 
 # --- Constants ---
 SCORE_MAP = {'G': 50, 'T': -30, 'S': 0, 'E': 0, '.': 0, 'B':0, 'L':0}
@@ -9,24 +10,21 @@ MOVE_COST = 0 # As per user request, movement has no cost.
 # --- Logging Setup ---
 # logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def solve_with_dp(maze, main_path=None):
+def solve_with_dp(maze, main_path=None, graph=None, stats=None):
     """
     Solves the maze using a Tree-based Dynamic Programming approach.
     The maze is treated as a tree structure with a main path (S to E) and side branches.
     The algorithm finds the path with the maximum possible score.
-    It can accept a pre-calculated main_path to avoid redundant calculations.
+    It can accept a pre-calculated main_path and a graph from build_graph to avoid redundant calculations.
+    `stats`, if given, is passed on to find_main_path.
     """
-    height = len(maze)
-    width = len(maze[0])
-
     # 1. Pre-processing: Build graph and find main path
-    graph = _build_graph(maze, height, width)
+    if graph is None:
+        graph = build_graph(maze)
     
     if main_path is None:
         # logging.info("No main_path provided, calculating it using BFS...")
-        start_node_pos = _find_char(maze, 'S')
-        end_node_pos = _find_char(maze, 'E')
-        main_path = _find_shortest_path_bfs(graph, start_node_pos, end_node_pos)
+        main_path = find_main_path(maze, graph, stats)
         if not main_path:
             # logging.warning("No path found from S to E.")
             return [], 0
@@ -155,6 +153,22 @@ def _build_branch_excursion(u, parent, graph, path_decision_memo):
     return path
 
 
+def build_graph(maze):
+    """
+    Parses the maze into an adjacency dict of open cells, the representation shared by the
+    pathfinders, so callers that run several of them on one maze parse it once.
+    """
+    return _build_graph(maze, len(maze), len(maze[0]))
+
+
+def find_main_path(maze, graph, stats=None):
+    """
+    Returns the shortest S to E path as a list of (r, c) tuples, or None if E is unreachable.
+    The nodes the BFS dequeued are added to stats['bfs_nodes'] if `stats` is given.
+    """
+    return _find_shortest_path_bfs(graph, _find_char(maze, 'S'), _find_char(maze, 'E'), stats)
+
+
 def _build_graph(maze, height, width):
     """Builds a graph representation of the maze."""
     graph = {}
@@ -179,23 +193,29 @@ def _find_char(maze, char):
                 return (r, c)
     return None
 
-def _find_shortest_path_bfs(graph, start, end):
+def _find_shortest_path_bfs(graph, start, end, stats=None):
     """Finds the shortest path between two nodes in a graph using BFS."""
     if start not in graph or end not in graph:
         return None
     queue = deque([(start, [start])])
     visited = {start}
+    dequeued = 0
+    found = None
     while queue:
         current, path = queue.popleft()
+        dequeued += 1
         if current == end:
-            return path
+            found = path
+            break
         for neighbor in graph[current]:
             if neighbor not in visited:
                 visited.add(neighbor)
                 new_path = list(path)
                 new_path.append(neighbor)
                 queue.append((neighbor, new_path))
-    return None
+    if stats is not None:
+        stats['bfs_nodes'] = stats.get('bfs_nodes', 0) + dequeued
+    return found
 
 def json_loader(json_path):
     with open(json_path, 'r') as f:
@@ -203,7 +223,8 @@ def json_loader(json_path):
     return data["maze"]
 
 if __name__ == "__main__":
-    maze = json_loader("D:\\1-sjh-workspace\\maze-game\\test\\dp_test\\result_maze_15_15_2_formatted.json")
+    # python -m app.algorithms.pathfinder_dp path/to/maze.json
+    maze = json_loader(sys.argv[1])
     final_path, max_score = solve_with_dp(maze)
     print(f"Final Path: {final_path}")
     print(f"Maximum Score: {max_score}")
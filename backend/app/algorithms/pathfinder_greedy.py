@@ -2,6 +2,8 @@ import heapq
 import logging
 from typing import List, Tuple, Dict, Set
 
+from app.algorithms.maze_index import MazeIndex
+
 # --- Logging Setup ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -14,30 +16,46 @@ class MazeGreedyNavigator:
     Implements a greedy navigation algorithm with a 3x3 vision limit.
     The navigator chooses targets based on a cost-benefit ratio and uses A* for pathfinding.
     """
-    def __init__(self, maze: List[List[str]]):
+    def __init__(self, maze: List[List[str]], graph: Dict[Tuple[int, int], List[Tuple[int, int]]] | None = None,
+                 index: MazeIndex | None = None):
         """
         Initializes the maze navigator.
         
         Args:
             maze: The maze map, represented as a list of strings.
+            graph: Optional adjacency dict of open cells (see pathfinder_dp.build_graph);
+                   when given, A* takes its neighbors from it instead of rescanning the maze.
+            index: Optional MazeIndex of the maze; when given, S, E, treasures, traps and
+                   the graph are read from it instead of scanning the maze.
         """
         self.maze_str = maze
         self.rows = len(maze)
         self.cols = len(maze[0])
+        if graph is None and index is not None:
+            graph = index.graph()
+        self.graph = graph
         
         self.treasure_values: Dict[Tuple[int, int], int] = {}
         self.trap_penalties: Dict[Tuple[int, int], int] = {}
         
-        self.start_pos = self._find_char_position('S')
-        self.end_pos = self._find_char_position('E')
-        
-        self._process_maze()
+        if index is None:
+            self.start_pos = self._find_char_position('S')
+            self.end_pos = self._find_char_position('E')
+            self._process_maze()
+        else:
+            if index.start < 0 or index.end < 0:
+                raise ValueError(f"Character '{'S' if index.start < 0 else 'E'}' not found in the maze.")
+            self.start_pos = index.position(index.start)
+            self.end_pos = index.position(index.end)
+            self.treasure_values = {index.position(node): VALUE_MAP['G'] for node in index.gold}
+            self.trap_penalties = {index.position(node): abs(VALUE_MAP['T']) for node in index.traps}
 
         self.current_pos = self.start_pos
         self.collected_treasures: Set[Tuple[int, int]] = set()
         self.triggered_traps: Set[Tuple[int, int]] = set()
         
         self.path = [self.start_pos]
+        self.expansions = 0  # Nodes expanded by A*, over every search of this navigator
         self.total_score = VALUE_MAP.get(self.maze_str[self.start_pos[0]][self.start_pos[1]], 0)
 
     def _find_char_position(self, char: str) -> Tuple[int, int]:
@@ -112,15 +130,11 @@ class MazeGreedyNavigator:
             
             if current == target:
                 logging.info(f"  A* found target. Path: {path_so_far}")
+                self.expansions += len(closed_set)
                 return path_so_far
             
-            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                new_row, new_col = current[0] + dr, current[1] + dc
-                neighbor = (new_row, new_col)
-                
-                if (0 <= new_row < self.rows and 0 <= new_col < self.cols and
-                        self.maze_str[new_row][new_col] != '#' and neighbor not in closed_set):
-                    
+            for neighbor in self._neighbors(current):
+                if neighbor not in closed_set:
                     g_score = len(path_so_far)
                     h_score = self._manhattan_distance(neighbor, target)
                     f_score = g_score + h_score
@@ -128,8 +142,21 @@ class MazeGreedyNavigator:
                     heapq.heappush(open_set, (f_score, neighbor, path_so_far))
         
         logging.warning(f"A* could not find path from {self.current_pos} to {target}")
+        self.expansions += len(closed_set)
         return []  # Path not found
 
+    def _neighbors(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Returns the open cells next to a position."""
+        if self.graph is not None:
+            return self.graph[pos]
+        neighbors = []
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            new_row, new_col = pos[0] + dr, pos[1] + dc
+            if (0 <= new_row < self.rows and 0 <= new_col < self.cols and
+                    self.maze_str[new_row][new_col] != '#'):
+                neighbors.append((new_row, new_col))
+        return neighbors
+
     def _get_best_target_in_vision(self) -> Tuple[int, int] | None:
         """Finds the target with the best cost-benefit ratio in the vision area."""
         vision_area = self._get_vision_area()
@@ -213,19 +240,25 @@ class MazeGreedyNavigator:
 
         return self.path, self.total_score
 
-def solve_with_greedy(maze: List[List[str]]) -> Tuple[List[Tuple[int, int]], int]:
+def solve_with_greedy(maze: List[List[str]], graph: Dict[Tuple[int, int], List[Tuple[int, int]]] | None = None,
+                      index: MazeIndex | None = None, stats: Dict[str, int] | None = None) -> Tuple[List[Tuple[int, int]], int]:
     """
     Solves the maze using the 3x3 vision greedy navigator.
     
     Args:
         maze: The maze map.
+        graph: Optional pre-parsed adjacency dict of the maze, shared with other solvers.
+        index: Optional MazeIndex of the maze, built once at generation.
+        stats: Optional dict; the nodes A* expanded are added to stats['astar_expansions'].
         
     Returns:
         A tuple containing the final path and the total score.
     """
     try:
-        navigator = MazeGreedyNavigator(maze)
+        navigator = MazeGreedyNavigator(maze, graph, index)
         path, value = navigator.navigate()
+        if stats is not None:
+            stats['astar_expansions'] = stats.get('astar_expansions', 0) + navigator.expansions
         return path, value
     except Exception as e:
         logging.error(f"An error occurred during greedy solving: {e}")
@@ -1,70 +1,252 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
-import json
+from fastapi import APIRouter, HTTPException, Request, Header, BackgroundTasks, Query, Response
+from fastapi.responses import StreamingResponse, FileResponse
+from typing import List, Optional
 import asyncio
 import random
 import math
 from app.models.pydantic_models import (
-    MazeGenerationRequest, PathfindingRequest, PathfindingResponse,
-    PuzzleRequest, PuzzleResponse, BossBattleRequest, BossBattleResponse
+    MAX_MAZE_SIZE, STREAMED_MAZE_SIZE, MazeGenerationRequest, PathfindingRequest, PathfindingResponse,
+    PuzzleRequest, PuzzleResponse, BossBattleRequest, BossBattleResponse,
+    BossBattleStreamRequest, SolveAllRequest, SolveAllResponse, GameSessionRequest, GameMoveRequest
 )
-from app.algorithms.maze_generator import generate_maze as maze_gen_algo
-from app.algorithms.pathfinder_dp import solve_with_dp
-from app.algorithms.pathfinder_greedy import solve_with_greedy
 from app.services.api_helpers import (
+    prepare_and_solve_dp,
+    prepare_and_solve_greedy,
     prepare_and_solve_puzzle,
     prepare_and_solve_boss_battle,
+    stream_boss_battle,
+    pick_animation_frames,
 )
+from app.services.maze_store import get_maze
+from app.services.game_sessions import create_session, get_session
+from app.services.replay_log import log_event
+from app.services.maze_tiles import TILE_SIZE, MAX_VIEWPORT_TILES, tile_grid, tile_etag, get_tile, get_viewport
+from app.services.solver_pool import solve_all, gather_solve_all
+from app.services.path_encoding import encode_path
+from app.services.serializers import dumps, sse_event
+from app.services.generation_stream import GenerationStream
+from app.services.profiling import PROFILE_HEADER, profiled_call, list_profiles, get_profile, profile_path
+from app.services.verification import should_verify, verify_and_log
 
 router = APIRouter()
 
+# Longest playback of a generation in "animate" mode, in seconds; longer ones are coalesced.
+ANIMATION_SECONDS = 5.0
+# Seconds between checks for a disconnected client while "animate" mode buffers the generation.
+DISCONNECT_CHECK_SECONDS = 0.1
+
 @router.post("/maze/generate")
-async def generate_maze_endpoint(request: MazeGenerationRequest):
+async def generate_maze_endpoint(request: MazeGenerationRequest, http_request: Request):
     """
     Generates a new maze based on the provided size, streaming the generation process.
-    The final event in the stream includes dynamic boss data.
+    - "animate" plays it at `fps` for at most ANIMATION_SECONDS, coalescing frames to fit.
+      The first frame is sent at once; the rest are buffered until generation ends, as
+      coalescing needs the frame count, and then played back.
+    - "fast" streams every frame as it is generated, `frames_per_write` frames per write.
+    - "final" sends only the finished maze.
+    The final event in the stream includes dynamic boss data and a `maze_id` that the
+    solve-all endpoints accept in place of the maze data. With `tiled` set it leaves out the
+    grid, which the client then reads through the tile endpoints; mazes larger than
+    STREAMED_MAZE_SIZE are generated in "final" mode only.
+    Generation runs in a worker thread, off the event loop, and stops as soon as the client
+    disconnects.
     """
     async def event_stream():
-        maze_generator = maze_gen_algo(request.size, request.size)
-        for data_payload in maze_generator:
-            yield f"data: {json.dumps(data_payload)}\n\n"
-            await asyncio.sleep(0.02)
+        # Generation runs in a worker thread; closing `events` when the client goes away stops it
+        events = GenerationStream(request.size, encode_frames=request.mode != "final", include_maze=not request.tiled).events()
+        try:
+            if request.mode == "final":
+                async for event in events:
+                    yield event
+                return
+
+            if request.mode == "fast":
+                batch = []
+                async for event in events:
+                    batch.append(event)
+                    if len(batch) >= request.frames_per_write:
+                        if await http_request.is_disconnected():
+                            return
+                        yield b"".join(batch)
+                        batch = []
+                if batch:
+                    yield b"".join(batch)
+                return
+
+            loop = asyncio.get_running_loop()
+            frames = []
+            next_check = loop.time() + DISCONNECT_CHECK_SECONDS
+            async for event in events:
+                if not frames:
+                    yield event  # The client sees the generation start right away
+                frames.append(event)
+                if loop.time() >= next_check:
+                    if await http_request.is_disconnected():
+                        return
+                    next_check = loop.time() + DISCONNECT_CHECK_SECONDS
+
+            frame_time = 1 / request.fps
+            rest = frames[1:]
+            animation = pick_animation_frames(rest[:-1], max(1, int(request.fps * ANIMATION_SECONDS) - 2))
+            next_frame = loop.time() + frame_time
+            for event in animation + rest[-1:]:
+                # Writes count against the frame period, so slow sends do not stretch the animation
+                await asyncio.sleep(max(0.0, next_frame - loop.time()))
+                if await http_request.is_disconnected():
+                    return
+                yield event
+                next_frame += frame_time
+        finally:
+            await events.aclose()
 
     return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
-@router.post("/solve/dp", response_model=PathfindingResponse)
-def solve_dp_endpoint(request: PathfindingRequest):
+@router.get("/maze/limits")
+def maze_limits_endpoint():
+    """
+    The size limits of /maze/generate and the tile endpoints, so clients do not hard-code them:
+    the largest maze, the largest one streamed frame by frame, and the tile and viewport sizes.
+    """
+    return {"max_size": MAX_MAZE_SIZE, "streamed_size": STREAMED_MAZE_SIZE,
+            "tile_size": TILE_SIZE, "max_viewport_tiles": MAX_VIEWPORT_TILES}
+
+@router.get("/maze/{maze_id}/index")
+def maze_index_endpoint(maze_id: str):
+    """
+    Returns the MazeIndex of a generated maze: node ids, CSR adjacency, S/E/boss/lever
+    positions, the main path and the BFS tree with its subtree gold and trap counts.
+    """
+    stored = get_maze(maze_id)
+    if stored is None or stored.get('index') is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired maze id.")
+    return stored['index'].to_dict()
+
+
+def _stored_maze(maze_id: str):
+    stored = get_maze(maze_id)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired maze id.")
+    return stored['maze']
+
+@router.get("/maze/{maze_id}/tiles")
+def maze_tiles_endpoint(maze_id: str):
+    """Returns the dimensions of a generated maze and of its grid of TILE_SIZE x TILE_SIZE tiles."""
+    return tile_grid(_stored_maze(maze_id))
+
+@router.get("/maze/{maze_id}/tiles/{tile_x}/{tile_y}")
+def maze_tile_endpoint(maze_id: str, tile_x: int, tile_y: int, if_none_match: Optional[str] = Header(None)):
+    """
+    Returns one tile of a generated maze, its cells as one string per row. Tiles never change,
+    so the response carries an ETag and a request sending it back in If-None-Match gets a 304.
+    """
+    maze = _stored_maze(maze_id)
+    etag = tile_etag(maze_id, tile_x, tile_y)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=3600"}
+    if if_none_match is not None and etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    tile = get_tile(maze, tile_x, tile_y)
+    if tile is None:
+        raise HTTPException(status_code=404, detail="The tile is outside the maze.")
+    return Response(dumps(tile), media_type="application/json", headers=headers)
+
+@router.get("/maze/{maze_id}/viewport")
+def maze_viewport_endpoint(maze_id: str, x: int = Query(0, description="Leftmost column on screen."),
+                           y: int = Query(0, description="Top row on screen."),
+                           width: int = Query(TILE_SIZE, gt=0, description="Columns on screen."),
+                           height: int = Query(TILE_SIZE, gt=0, description="Rows on screen."),
+                           known: List[str] = Query([], description="ETags of tiles the client already holds.")):
+    """
+    Returns every tile the viewport overlaps, each with its ETag. Tiles listed in `known` come
+    without their rows, so a client scrolling around a large maze only downloads new tiles.
+    """
+    maze = _stored_maze(maze_id)
+    try:
+        viewport = get_viewport(maze_id, maze, x, y, width, height, known)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(dumps(viewport), media_type="application/json")
+
+
+@router.post("/game/sessions")
+def create_game_session_endpoint(request: GameSessionRequest):
+    """
+    Starts a manual game on a generated maze. The server keeps the position and score; the
+    response has the session id and the starting state.
+    """
+    stored = get_maze(request.maze_id)
+    if stored is None or stored.get('index') is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired maze id.")
+    session_id = create_session(stored)
+    log_event("session", {"session_id": session_id, "maze_id": request.maze_id})
+    return {"session_id": session_id, **get_session(session_id).state()}
+
+def _game_session(session_id: str):
+    session = get_session(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired game session.")
+    return session
+
+@router.get("/game/sessions/{session_id}")
+def game_session_endpoint(session_id: str):
+    """Returns the whole state of a game: position, score, steps, gold, traps, cleared cells and `won`."""
+    return _game_session(session_id).state()
+
+@router.post("/game/sessions/{session_id}/move")
+def game_move_endpoint(session_id: str, request: GameMoveRequest):
+    """
+    Takes one step and returns only what changed: `step` and `moved` always, then the new
+    `position`, the new `score` if it changed, the `cleared` cell whose item was used up, the
+    `puzzle` or `boss` result a lever or the boss triggered, and `won` on reaching E.
+    """
+    delta = _game_session(session_id).move(request.move)
+    log_event("move", {"session_id": session_id, "move": request.move, "delta": delta})
+    return delta
+
+
+@router.post("/solve/dp", response_model=PathfindingResponse, response_model_exclude_none=True)
+def solve_dp_endpoint(request: PathfindingRequest, background_tasks: BackgroundTasks,
+                      x_profile: Optional[str] = Header(None, alias=PROFILE_HEADER)):
     """
     Solves the maze using Dynamic Programming.
     It can accept a pre-calculated main_path to optimize performance.
+    Long DP plans are much smaller with path_encoding "moves" or "rle".
     """
     try:
         # Pass the main_path to the solver if it exists in the request
-        path, value = solve_with_dp(request.maze, request.main_path)
-        return {"path": path, "value": value}
+        path, value = profiled_call("dp", x_profile, request.model_dump, prepare_and_solve_dp, request.maze, request.main_path)
+        if should_verify():
+            background_tasks.add_task(verify_and_log, "dp", request.model_dump(), {"path": path, "value": value})
+        return {**encode_path(path, request.path_encoding), "value": value}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/solve/greedy", response_model=PathfindingResponse)
-def solve_greedy_endpoint(request: PathfindingRequest):
+@router.post("/solve/greedy", response_model=PathfindingResponse, response_model_exclude_none=True)
+def solve_greedy_endpoint(request: PathfindingRequest, background_tasks: BackgroundTasks,
+                          x_profile: Optional[str] = Header(None, alias=PROFILE_HEADER)):
     """
     Solves the maze using a Greedy algorithm.
     """
     try:
-        path, value = solve_with_greedy(request.maze)
-        return {"path": path, "value": value}
+        path, value = profiled_call("greedy", x_profile, request.model_dump, prepare_and_solve_greedy, request.maze)
+        if should_verify():
+            background_tasks.add_task(verify_and_log, "greedy", request.model_dump(), {"path": path, "value": value})
+        return {**encode_path(path, request.path_encoding), "value": value}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/solve/puzzle", response_model=PuzzleResponse)
-def solve_puzzle_endpoint(request: PuzzleRequest):
+def solve_puzzle_endpoint(request: PuzzleRequest, background_tasks: BackgroundTasks,
+                          x_profile: Optional[str] = Header(None, alias=PROFILE_HEADER)):
     """
     Solves a puzzle by calling the puzzle helper service.
     """
     try:
-        solution, tries = prepare_and_solve_puzzle(request.password_hash, request.constraints)
+        solution, tries = profiled_call("puzzle", x_profile, request.model_dump, prepare_and_solve_puzzle,
+                                        request.password_hash, request.constraints)
+        if should_verify():
+            background_tasks.add_task(verify_and_log, "puzzle", request.model_dump(), {"solution": solution, "tries": tries})
         # The solver now returns an empty list on failure, which is a valid response.
         return {"solution": solution, "tries": tries}
     except ValueError as e:
@@ -73,16 +255,126 @@ def solve_puzzle_endpoint(request: PuzzleRequest):
         print(f"Error in puzzle endpoint: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred in puzzle solving.")
 
-@router.post("/solve/boss", response_model=BossBattleResponse)
-def solve_boss_endpoint(request: BossBattleRequest):
+@router.post("/solve/boss", response_model=BossBattleResponse, response_model_exclude_none=True)
+def solve_boss_endpoint(request: BossBattleRequest, background_tasks: BackgroundTasks,
+                        x_profile: Optional[str] = Header(None, alias=PROFILE_HEADER)):
     """
     Finds the optimal skill sequence for a boss battle by calling the boss battle helper service.
     """
     try:
-        result = prepare_and_solve_boss_battle(request.boss_hps, request.skills)
+        result = profiled_call("boss", x_profile, request.model_dump, prepare_and_solve_boss_battle,
+                               request.boss_hps, request.skills, request.engine, request.any_order)
+        if should_verify():
+            background_tasks.add_task(verify_and_log, "boss", request.model_dump(), result)
         if result is None:
             raise HTTPException(status_code=404, detail="No solution found for the boss battle.")
         return result
     except Exception as e:
         print(f"Error in boss battle endpoint: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred in boss battle.")
+
+@router.post("/solve/boss/stream")
+def solve_boss_stream_endpoint(request: BossBattleStreamRequest):
+    """
+    Streams boss battle schedules as Server-Sent Events: the greedy schedule right away, then
+    every improvement found by Branch and Bound until it is proven optimal or the time budget
+    runs out. The final event has `done` set.
+    """
+    def event_stream():
+        # A plain generator is iterated in the threadpool, so the search never blocks the event loop.
+        try:
+            for update in stream_boss_battle(request.boss_hps, request.skills, request.time_budget):
+                yield sse_event(update)
+        except Exception as e:
+            print(f"Error in boss battle stream: {e}")
+            yield sse_event({'error': 'An unexpected error occurred in boss battle.', 'done': True})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+def _solve_all_inputs(request: SolveAllRequest) -> dict:
+    """
+    Resolves a solve-all request into solve_all arguments, filling the fields it leaves out
+    from the stored maze when it names a `maze_id`.
+    """
+    stored = {}
+    if request.maze_id is not None:
+        stored = get_maze(request.maze_id)
+        if stored is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired maze id.")
+    elif request.maze is None:
+        raise HTTPException(status_code=400, detail="Either maze or maze_id is required.")
+
+    skills = request.skills
+    if skills is None and stored.get('player_skills'):
+        skills = [{"name": f"Skill {i + 1}", "damage": damage, "cooldown": cooldown}
+                  for i, (damage, cooldown) in enumerate(stored['player_skills'])]
+    lockers = request.lockers
+    return {
+        "maze": request.maze if request.maze is not None else stored['maze'],
+        "main_path": request.main_path if request.main_path is not None else stored.get('unique_path') or None,
+        "lockers": [locker.model_dump() for locker in lockers] if lockers is not None else stored.get('lockers', []),
+        "boss_hps": request.boss_hps if request.boss_hps is not None else stored.get('bosses', []),
+        "skills": skills,
+        "path_encoding": request.path_encoding,
+        # The index describes the stored maze only
+        "index": stored.get('index') if request.maze is None else None,
+    }
+
+@router.post("/solve/all", response_model=SolveAllResponse, response_model_exclude_none=True)
+def solve_all_endpoint(request: SolveAllRequest):
+    """
+    Runs DP, greedy, every locker puzzle and the boss fight of one maze concurrently on the
+    solver pool and returns all results at once. A solver that fails is listed in `errors`
+    without failing the others.
+    """
+    inputs = _solve_all_inputs(request)
+    try:
+        return gather_solve_all(solve_all(**inputs))
+    except Exception as e:
+        print(f"Error in solve-all endpoint: {e}")
+        raise HTTPException(status_code=500, detail="An unexpected error occurred while solving the maze.")
+
+@router.post("/solve/all/stream")
+def solve_all_stream_endpoint(request: SolveAllRequest):
+    """
+    Same as /solve/all, but streams each solver's result as a Server-Sent Event as soon as it
+    finishes. The final event has `done` set.
+    """
+    inputs = _solve_all_inputs(request)
+
+    def event_stream():
+        try:
+            for update in solve_all(**inputs):
+                yield sse_event(update)
+            yield sse_event({'done': True})
+        except Exception as e:
+            print(f"Error in solve-all stream: {e}")
+            yield sse_event({'error': 'An unexpected error occurred while solving the maze.', 'done': True})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@router.get("/debug/profiles")
+def list_profiles_endpoint():
+    """
+    Lists the stored solver profiles, newest first. Send the X-Profile header with a solve
+    request, or set PROFILE_SAMPLE_RATE, to record them.
+    """
+    return list_profiles()
+
+@router.get("/debug/profiles/{profile_id}")
+def get_profile_endpoint(profile_id: str):
+    """Returns one profile: timing, the process-wide tracemalloc peak during the call, the request inputs and a cProfile summary."""
+    record = get_profile(profile_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return record
+
+@router.get("/debug/profiles/{profile_id}/pstats")
+def download_profile_endpoint(profile_id: str):
+    """Downloads the raw cProfile data of a profile, for pstats or snakeviz."""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
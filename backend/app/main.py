@@ -1,12 +1,22 @@
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api.v1 import endpoints as v1_endpoints
+from app.services.solver_pool import shutdown_solver_pool
+from app.services.metrics import MetricsMiddleware, render_metrics
 
 # Suppress Uvicorn access logs
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
-app = FastAPI(title="Maze Adventure Game API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Stop the worker processes started by the solve-all endpoints
+    shutdown_solver_pool()
+
+app = FastAPI(title="Maze Adventure Game API", lifespan=lifespan)
 
 app.include_router(v1_endpoints.router, prefix="/api/v1", tags=["v1"])
 
@@ -25,6 +35,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Maze Adventure Game API!"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint():
+    """
+    Prometheus metrics: request latency per route, solver run time and algorithm work counters.
+    Set METRICS_DIR to a directory shared by all uvicorn workers to get their combined values.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,20 +1,93 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any
+import base64
+import binascii
+import re
+from pydantic import BaseModel, Field, PlainValidator, model_validator
+from typing import List, Dict, Any, Literal, Union, Annotated
+
+from app.algorithms.boss_battle_order import MAX_ANY_ORDER_BOSSES
+
+# Largest maze whose generation can be streamed frame by frame ("animate" and "fast").
+STREAMED_MAZE_SIZE = 50
+# Largest maze that can be generated at all, in "final" mode; clients read such mazes by tiles.
+# Measured: a 1001x1001 maze takes about 3.3 s and 75 MB to generate and index, and both grow
+# with the number of cells, so larger sizes would hold a generation worker for too long.
+MAX_MAZE_SIZE = 1001
 
 class MazeGenerationRequest(BaseModel):
-    size: int = Field(..., gt=4, le=50, description="The size (width and height) of the maze.")
+    size: int = Field(..., gt=4, le=MAX_MAZE_SIZE, description=f"The size (width and height) of the maze; at most {STREAMED_MAZE_SIZE} "
+                      "unless mode is 'final'.")
+    mode: Literal["animate", "fast", "final"] = Field("animate", description="'animate' plays the generation at `fps`, coalescing frames; "
+                                                      "'fast' streams every frame without pacing; 'final' sends only the finished maze.")
+    fps: float = Field(20, gt=0, le=60, description="Frames per second in 'animate' mode.")
+    frames_per_write: int = Field(1, ge=1, le=100, description="Generation frames sent together in one stream write in 'fast' mode.")
+    tiled: bool = Field(False, description="Leave the grid out of the final event; the client reads it through the tile endpoints.")
+
+    @model_validator(mode="after")
+    def _check_streamed_size(self):
+        if self.mode != "final" and self.size > STREAMED_MAZE_SIZE:
+            raise ValueError(f"Mazes larger than {STREAMED_MAZE_SIZE} can only be generated in 'final' mode.")
+        return self
 
 class MazeSchema(BaseModel):
     maze: List[List[str]]
 
 from typing import Optional
 
+# Characters a maze cell may hold; ' ' is an open cell like '.'.
+MAZE_CELLS = "#. SEGTLB"
+_MAZE_ROWS = re.compile(f"[{re.escape(MAZE_CELLS)}]*")
+
+def _parse_maze_grid(value: Any) -> List[str]:
+    """
+    Validates a maze in bulk and returns it as one string per row, which the solvers index
+    like a list of lists. Accepts a list of row strings, a list of lists of single-character
+    cells, or a base64 string of the rows joined by newlines.
+    """
+    if isinstance(value, str):
+        try:
+            value = base64.b64decode(value, validate=True).decode('ascii').split('\n')
+        except (binascii.Error, UnicodeDecodeError):
+            raise ValueError("maze string must be base64 of the rows joined by newlines")
+    if not isinstance(value, list) or not value:
+        raise ValueError("maze must be a non-empty list of rows")
+
+    rows = []
+    for row in value:
+        if isinstance(row, list):
+            try:
+                joined = "".join(row)
+            except TypeError:
+                raise ValueError("maze cells must be single characters")
+            # Without empty cells, the joined length only matches if every cell is one character.
+            if len(joined) != len(row) or "" in row:
+                raise ValueError("maze cells must be single characters")
+            row = joined
+        elif not isinstance(row, str):
+            raise ValueError("maze rows must be strings or lists of cells")
+        rows.append(row)
+
+    width = len(rows[0])
+    if width == 0 or any(len(row) != width for row in rows):
+        raise ValueError("maze rows must be non-empty and of equal length")
+    if not _MAZE_ROWS.fullmatch("".join(rows)):
+        raise ValueError(f"maze cells must be one of {MAZE_CELLS!r}")
+    return rows
+
+MazeGrid = Annotated[List[str], PlainValidator(_parse_maze_grid, json_schema_input_type=Union[List[str], List[List[str]], str])]
+
+PathEncoding = Literal["coords", "moves", "rle"]
+PATH_ENCODING_DESCRIPTION = ("How to return paths: 'coords' as [r, c] pairs, 'moves' as a start cell plus a "
+                             "U/D/L/R string, 'rle' as 'moves' with runs written as count + letter.")
+
 class PathfindingRequest(BaseModel):
-    maze: List[List[str]]
+    maze: MazeGrid
     main_path: Optional[List[List[int]]] = None
+    path_encoding: PathEncoding = Field("coords", description=PATH_ENCODING_DESCRIPTION)
 
 class PathfindingResponse(BaseModel):
-    path: List[List[int]]
+    path: Optional[List[List[int]]] = None
+    start: Optional[List[int]] = None
+    moves: Optional[str] = None
     value: int
 
 class PuzzleRequest(BaseModel):
@@ -28,7 +101,51 @@ class PuzzleResponse(BaseModel):
 class BossBattleRequest(BaseModel):
     boss_hps: List[int]
     skills: List[Dict[str, Any]]
+    engine: Literal["branch_and_bound", "dp"] = Field("branch_and_bound", description="Exact solver to use; 'dp' caches results of repeated fights.")
+    any_order: bool = Field(False, description=f"Let the player fight the bosses in any order instead of list order; "
+                            f"at most {MAX_ANY_ORDER_BOSSES} bosses.")
+
+    @model_validator(mode="after")
+    def _check_any_order_bosses(self):
+        if self.any_order and len(self.boss_hps) > MAX_ANY_ORDER_BOSSES:
+            raise ValueError(f"Any-order fights support at most {MAX_ANY_ORDER_BOSSES} bosses.")
+        return self
+
+class BossBattleStreamRequest(BaseModel):
+    boss_hps: List[int]
+    skills: List[Dict[str, Any]]
+    time_budget: float = Field(5.0, gt=0, le=60, description="Wall-clock seconds to search before returning the best schedule found.")
 
 class BossBattleResponse(BaseModel):
     sequence: List[str]
+    skill_indices: Optional[List[int]] = None
     turns: int
+    order: Optional[List[int]] = None
+    optimal: Optional[bool] = None
+
+class LockerPuzzle(BaseModel):
+    id: Any
+    password_hash: str
+    constraints: List[Any]
+
+class SolveAllRequest(BaseModel):
+    maze_id: Optional[str] = Field(None, description="Id of a generated maze; its stored data fills every field left out.")
+    maze: Optional[MazeGrid] = None
+    main_path: Optional[List[List[int]]] = None
+    lockers: Optional[List[LockerPuzzle]] = None
+    boss_hps: Optional[List[int]] = None
+    skills: Optional[List[Dict[str, Any]]] = None
+    path_encoding: PathEncoding = Field("coords", description=PATH_ENCODING_DESCRIPTION)
+
+class SolveAllResponse(BaseModel):
+    dp: Optional[PathfindingResponse] = None
+    greedy: Optional[PathfindingResponse] = None
+    puzzles: Dict[str, PuzzleResponse]
+    boss: Optional[BossBattleResponse] = None
+    errors: Dict[str, str]
+
+class GameSessionRequest(BaseModel):
+    maze_id: str = Field(..., description="Id of a generated maze to play.")
+
+class GameMoveRequest(BaseModel):
+    move: Literal["U", "D", "L", "R"] = Field(..., description="Direction of the step: up, down, left or right.")
@@ -1,10 +1,34 @@
 import random
 import math
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
 
+from app.algorithms.pathfinder_dp import solve_with_dp
+from app.algorithms.pathfinder_greedy import solve_with_greedy
 from app.algorithms.puzzle_solver import solve_puzzle
-from app.algorithms.boss_battle import solve_boss_battle
+from app.algorithms.boss_battle import solve_boss_battle, solve_boss_battle_anytime
+from app.algorithms.boss_battle_dp import solve_boss_battle_dp
+from app.algorithms.boss_battle_order import solve_boss_battle_any_order
 from app.algorithms.maze_generator import PasswordLock
+from app.algorithms.maze_index import MazeIndex
+from app.services.metrics import record_work
+
+def prepare_and_solve_dp(maze: List[Any], main_path: Optional[List[Any]] = None,
+                         graph: Optional[Dict[Any, Any]] = None) -> tuple[List[Any], int]:
+    """Calls the DP pathfinder and records the work of its main-path search."""
+    stats = {}
+    try:
+        return solve_with_dp(maze, main_path, graph, stats)
+    finally:
+        record_work(stats)
+
+def prepare_and_solve_greedy(maze: List[Any], graph: Optional[Dict[Any, Any]] = None,
+                             index: Optional[MazeIndex] = None) -> tuple[List[Any], int]:
+    """Calls the greedy navigator and records the nodes its A* searches expanded."""
+    stats = {}
+    try:
+        return solve_with_greedy(maze, graph, index, stats)
+    finally:
+        record_work(stats)
 
 def prepare_and_solve_puzzle(password_hash: str, constraints: List[Any]) -> tuple[List[int], int]:
     """
@@ -13,6 +37,7 @@ def prepare_and_solve_puzzle(password_hash: str, constraints: List[Any]) -> tupl
     # The logic for generating passwords and constraints has been moved to maze_generator.
     # This helper now simply acts as a pass-through to the core solver.
     solution, tries = solve_puzzle(password_hash, constraints)
+    record_work({"puzzle_tries": tries})
 
     if not solution:
         # If the solver fails, return an empty solution and the number of tries.
@@ -20,23 +45,81 @@ def prepare_and_solve_puzzle(password_hash: str, constraints: List[Any]) -> tupl
 
     return solution, tries
 
-def prepare_and_solve_boss_battle(boss_hps: List[int], skills: List[Dict[str, Any]]) -> Dict[str, Any]:
+BOSS_BATTLE_ENGINES = {
+    "branch_and_bound": solve_boss_battle,
+    "dp": solve_boss_battle_dp,
+}
+
+# Seconds an any-order fight may search before the best schedule found is returned.
+ANY_ORDER_TIME_BUDGET = 2.0
+
+def prepare_and_solve_boss_battle(boss_hps: List[int], skills: List[Dict[str, Any]], engine: str = "branch_and_bound",
+                                  any_order: bool = False) -> Dict[str, Any]:
     """
     Adapts the request data for the boss battle algorithm, calls the solver,
     and adapts the response data for the frontend.
+    Both engines are exact; "dp" caches results, so repeated fights are answered from memory.
+    With `any_order` the bosses may be fought in any order; the response then also holds the
+    boss order and whether the schedule is proven optimal within ANY_ORDER_TIME_BUDGET.
+    `skill_indices` lists the skills of the sequence by their position in `skills`, as skill
+    names need not be unique.
     """
     # 1. Adapt the input data structure
     skills_list = [[s['damage'], s['cooldown']] for s in skills]
     skill_names = [s['name'] for s in skills]
 
-    # 2. Call the algorithm
-    min_time, path = solve_boss_battle(boss_hps, skills_list)
+    if any_order:
+        stats = {}
+        min_time, order, path = solve_boss_battle_any_order(boss_hps, skills_list, time_budget=ANY_ORDER_TIME_BUDGET, stats=stats)
+        record_work(stats)
+        if not path:
+            return None
+        skill_indices = [skill_idx for _, skill_idx in path]
+        return {"sequence": [skill_names[i] for i in skill_indices], "skill_indices": skill_indices,
+                "turns": math.ceil(min_time), "order": order, "optimal": stats['optimal']}
+
+    # 2. Call the algorithm; only Branch and Bound reports its search work
+    if engine == "branch_and_bound":
+        stats = {}
+        min_time, path = solve_boss_battle(boss_hps, skills_list, stats=stats)
+        record_work(stats)
+    else:
+        min_time, path = BOSS_BATTLE_ENGINES[engine](boss_hps, skills_list)
 
     if not path:
         return None
 
     # 3. Adapt the output data structure
-    sequence = [skill_names[skill_idx] for _, skill_idx in path]
+    skill_indices = [skill_idx for _, skill_idx in path]
+    sequence = [skill_names[i] for i in skill_indices]
     turns = math.ceil(min_time)
 
-    return {"sequence": sequence, "turns": turns}
+    return {"sequence": sequence, "skill_indices": skill_indices, "turns": turns}
+
+def stream_boss_battle(boss_hps: List[int], skills: List[Dict[str, Any]], time_budget: float) -> Iterator[Dict[str, Any]]:
+    """
+    Runs the anytime boss battle solver and yields one frontend-ready update per improved
+    schedule, followed by a final update with `done` set. `optimal` tells whether the last
+    schedule is proven optimal; otherwise `lower_bound` and `gap` say how far it can be off.
+    """
+    skills_list = [[s['damage'], s['cooldown']] for s in skills]
+    skill_names = [s['name'] for s in skills]
+
+    for progress in solve_boss_battle_anytime(boss_hps, skills_list, time_budget=time_budget):
+        yield {
+            "sequence": [skill_names[skill_idx] for _, skill_idx in progress['path']],
+            "turns": progress['turns'],
+            "lower_bound": progress['lower_bound'],
+            "gap": progress['gap'],
+            "optimal": progress['optimal'],
+            "done": progress['done'],
+        }
+
+def pick_animation_frames(frames: List[bytes], count: int) -> List[bytes]:
+    """Coalesces `frames` into at most `count` evenly spaced ones, keeping the first and the last."""
+    if len(frames) <= count:
+        return frames
+    if count == 1:
+        return frames[-1:]
+    step = (len(frames) - 1) / (count - 1)
+    return [frames[round(i * step)] for i in range(count)]
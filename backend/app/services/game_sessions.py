@@ -0,0 +1,140 @@
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.algorithms.pathfinder_dp import SCORE_MAP
+from app.services.api_helpers import prepare_and_solve_boss_battle, prepare_and_solve_puzzle
+
+# Number of game sessions kept; the least recently played is dropped first.
+GAME_SESSION_STORE_SIZE = 1024
+
+# Row and column steps of the moves, as path_encoding writes them.
+MOVES = {'U': (-1, 0), 'D': (1, 0), 'L': (0, -1), 'R': (0, 1)}
+
+def boss_fight(maze: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    The solved boss fight of a stored maze, as prepare_and_solve_boss_battle returns it, or None
+    without one. It is solved on first use and kept in the stored maze next to its bosses, so
+    every session on the maze shares it.
+    """
+    if 'boss_fight' not in maze:
+        skills = [{"name": f"Skill {i + 1}", "damage": damage, "cooldown": cooldown}
+                  for i, (damage, cooldown) in enumerate(maze.get('player_skills') or [])]
+        fight = prepare_and_solve_boss_battle(maze.get('bosses', []), skills) if skills else None
+        # Sessions started at once may both solve it; the first result is kept.
+        maze.setdefault('boss_fight', fight)
+    return maze['boss_fight']
+
+class GameSession:
+    """
+    One player exploring a generated maze, with the server keeping the score.
+
+    The maze, its MazeIndex, lockers and bosses are shared with the maze store and every other
+    session on the same maze; a session only keeps the player's node and the nodes whose item
+    was used up, so its size grows with the cells the player changed, not with the maze.
+    Stepping on gold or a trap scores it as the pathfinders do (SCORE_MAP), a lever solves its
+    locker's puzzle and costs its tries, the boss costs the turns of the fight, and E wins.
+    The fight is solved once per maze (see boss_fight), before the first session on it starts.
+    """
+    __slots__ = ('maze', 'index', 'node', 'score', 'steps', 'cleared', 'gold', 'traps', 'won', '_lockers', '_boss',
+                 '_lock')
+
+    def __init__(self, maze: Dict[str, Any]):
+        self.maze = maze
+        self.index = maze['index']
+        self.node = self.index.start
+        self.score = 0
+        self.steps = 0
+        self.cleared = set()
+        self.gold = self.traps = 0
+        self.won = False
+        self._lockers = None
+        self._boss = boss_fight(maze)
+        self._lock = threading.Lock()
+
+    def _locker_at(self, node: int) -> Optional[Dict[str, Any]]:
+        if self._lockers is None:
+            self._lockers = {self.index.node(*locker['position']): locker for locker in self.maze.get('lockers', [])}
+        return self._lockers.get(node)
+
+    def move(self, move: str) -> Dict[str, Any]:
+        """
+        Takes one step and returns what changed: the step count and, if the player moved, the
+        new position and score, the cell whose item was used up and the puzzle or boss fight it
+        triggered. A move into a wall, out of the maze or after winning leaves `moved` false.
+        """
+        dr, dc = MOVES[move]
+        with self._lock:
+            r, c = self.index.position(self.node)
+            target = self.index.node(r + dr, c + dc)
+            if target < 0 or self.won:
+                return {"step": self.steps, "moved": False}
+            self.node = target
+            self.steps += 1
+            delta = {"step": self.steps, "moved": True, "position": [r + dr, c + dc]}
+
+            item = self.index.items().get(target) if target not in self.cleared else None
+            if item is None:
+                return delta
+            gained = SCORE_MAP.get(item, 0)
+            if item == 'E':
+                self.won = True
+                delta["won"] = True
+            else:
+                self.cleared.add(target)
+                delta["cleared"] = [r + dr, c + dc]
+            if item == 'G':
+                self.gold += 1
+            elif item == 'T':
+                self.traps += 1
+            elif item == 'L':
+                locker = self._locker_at(target)
+                if locker is not None:
+                    solution, tries = prepare_and_solve_puzzle(locker['password_hash'], locker['constraints'])
+                    gained -= tries
+                    delta["puzzle"] = {"id": locker['id'], "solution": solution, "tries": tries}
+            elif item == 'B':
+                if self._boss is not None:
+                    gained -= self._boss["turns"]
+                    delta["boss"] = self._boss
+            if gained:
+                self.score += gained
+                delta["score"] = self.score
+            return delta
+
+    def state(self) -> Dict[str, Any]:
+        """The whole state of the session, for a client that (re)joins it."""
+        with self._lock:
+            return {
+                "position": list(self.index.position(self.node)),
+                "score": self.score,
+                "steps": self.steps,
+                "gold": self.gold,
+                "traps": self.traps,
+                "cleared": [list(self.index.position(node)) for node in sorted(self.cleared)],
+                "won": self.won,
+            }
+
+# Sessions by id, least recently played first.
+_sessions = OrderedDict()
+# Sessions are created and played from the threadpool, so access is locked.
+_lock = threading.Lock()
+
+def create_session(maze: Dict[str, Any]) -> str:
+    """Starts a session on a stored maze (a payload of maze_store, with its index) and returns its id."""
+    session = GameSession(maze)
+    session_id = uuid.uuid4().hex
+    with _lock:
+        _sessions[session_id] = session
+        while len(_sessions) > GAME_SESSION_STORE_SIZE:
+            _sessions.popitem(last=False)
+    return session_id
+
+def get_session(session_id: str) -> Optional[GameSession]:
+    """Returns the session with `session_id`, or None if it is unknown or was evicted."""
+    with _lock:
+        session = _sessions.get(session_id)
+        if session is not None:
+            _sessions.move_to_end(session_id)
+        return session
@@ -0,0 +1,107 @@
+import asyncio
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import AsyncIterator
+
+from app.algorithms.maze_generator import generate_maze
+from app.services.maze_store import save_maze
+from app.services import replay_log
+from app.services.metrics import record_work
+from app.services.serializers import MazeFrameEncoder
+
+# Mazes generated at once; further generations wait for a free worker.
+GENERATION_WORKERS = 4
+# Encoded frames a generation may run ahead of its client before it blocks.
+GENERATION_QUEUE_SIZE = 32
+
+_executor = ThreadPoolExecutor(max_workers=GENERATION_WORKERS, thread_name_prefix="maze-generation")
+
+# Marks the end of a generation in the queue.
+_DONE = object()
+
+class GenerationStream:
+    """
+    Runs generate_maze in a worker thread and hands its SSE events to the event loop through
+    a bounded queue, so recursive division, the unique-path check and element placement never
+    block the loop. A full queue pauses the worker until the client catches up, and stopping
+    the stream (the client disconnected) makes the worker quit at its next frame.
+
+    The final payload is kept in the maze store, with its MazeIndex, and is sent with its
+    `maze_id` instead of the index. With `encode_frames` off, only that final payload is
+    encoded and queued. With `include_maze` off, the final payload leaves out the grid too, for
+    clients that read it by tiles.
+    """
+    def __init__(self, size: int, encode_frames: bool = True, max_pending: int = GENERATION_QUEUE_SIZE,
+                 include_maze: bool = True):
+        self.size = size
+        self.encode_frames = encode_frames
+        self.include_maze = include_maze
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._loop = None
+        self._stop = threading.Event()
+        self._finished = threading.Event()
+
+    def _put(self, item) -> bool:
+        """Queues an item from the worker, waiting for room; returns False once the stream is stopped."""
+        put = self._queue.put(item)
+        try:
+            future = asyncio.run_coroutine_threadsafe(put, self._loop)
+        except RuntimeError:  # The event loop is gone
+            put.close()
+            return False
+        while not self._stop.is_set():
+            try:
+                future.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                continue
+        future.cancel()
+        return False
+
+    def _produce(self):
+        stats = {}
+        generator = generate_maze(self.size, self.size, stats=stats, cancelled=self._stop.is_set)
+        encoder = MazeFrameEncoder()
+        try:
+            for payload in generator:
+                if self._stop.is_set():
+                    return
+                if 'lockers' in payload:
+                    # The index stays on the server for requests that name the maze by id
+                    stored = payload
+                    left_out = ('index',) if self.include_maze else ('index', 'maze')
+                    payload = {key: value for key, value in payload.items() if key not in left_out}
+                    payload['maze_id'] = save_maze(stored)
+                    if replay_log.recording():
+                        replay_log.log_event("maze", {**payload, 'maze': ["".join(row) for row in stored['maze']]})
+                elif not self.encode_frames:
+                    continue
+                # Encode here: the generator keeps mutating the same grid
+                if not self._put(encoder.encode(payload)):
+                    return
+        except Exception as e:
+            self._put(e)
+        finally:
+            generator.close()
+            record_work(stats)
+            self._put(_DONE)
+            self._finished.set()
+
+    async def events(self) -> AsyncIterator[bytes]:
+        """Starts the generation and yields its events; closing this iterator stops the worker."""
+        self._loop = asyncio.get_running_loop()
+        self._loop.run_in_executor(_executor, self._produce)
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self._stop.set()
+            # Let a worker blocked on a full queue see the stop flag
+            while not self._queue.empty():
+                self._queue.get_nowait()
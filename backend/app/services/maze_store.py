@@ -0,0 +1,33 @@
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# Number of generated mazes kept for requests that refer to a maze by id.
+MAZE_STORE_SIZE = 64
+
+# Generated mazes by id, least recently used first.
+_mazes = OrderedDict()
+# Generation runs on the event loop and solvers in the threadpool, so access is locked.
+_lock = threading.Lock()
+
+def save_maze(data: Dict[str, Any]) -> str:
+    """
+    Keeps the final payload of a maze generation (maze, bosses, lockers, player_skills,
+    unique_path) and returns the id that later requests can send instead of the data.
+    Game sessions add the solved boss fight to it on first use (game_sessions.boss_fight).
+    """
+    maze_id = uuid.uuid4().hex
+    with _lock:
+        _mazes[maze_id] = data
+        while len(_mazes) > MAZE_STORE_SIZE:
+            _mazes.popitem(last=False)
+    return maze_id
+
+def get_maze(maze_id: str) -> Optional[Dict[str, Any]]:
+    """Returns the stored payload for `maze_id`, or None if it is unknown or was evicted."""
+    with _lock:
+        data = _mazes.get(maze_id)
+        if data is not None:
+            _mazes.move_to_end(maze_id)
+        return data
@@ -0,0 +1,70 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+# Cells per side of a tile; the tiles of the last row and column may be smaller.
+TILE_SIZE = 64
+# Most tiles one viewport request may cover.
+MAX_VIEWPORT_TILES = 64
+
+def tile_grid(maze: Sequence[Sequence[str]], tile_size: int = TILE_SIZE) -> Dict[str, int]:
+    """The dimensions of a maze and of its tile grid."""
+    height, width = len(maze), len(maze[0]) if maze else 0
+    return {
+        "width": width,
+        "height": height,
+        "tile_size": tile_size,
+        "tiles_x": -(-width // tile_size),
+        "tiles_y": -(-height // tile_size),
+    }
+
+def tile_etag(maze_id: str, tile_x: int, tile_y: int) -> str:
+    """
+    The ETag of a tile. A stored maze never changes, so its id and the tile coordinates
+    identify the content and a revalidation is answered without reading the grid.
+    """
+    return f'"{maze_id}.{tile_x}.{tile_y}"'
+
+def get_tile(maze: Sequence[Sequence[str]], tile_x: int, tile_y: int, tile_size: int = TILE_SIZE) -> Optional[Dict[str, Any]]:
+    """
+    Cuts tile (tile_x, tile_y) out of a maze: column tile_x * tile_size and row tile_y * tile_size
+    on. The cells come as one string per row, as the solver endpoints accept a maze. Returns
+    None for a tile outside the maze.
+    """
+    grid = tile_grid(maze, tile_size)
+    if not (0 <= tile_x < grid["tiles_x"] and 0 <= tile_y < grid["tiles_y"]):
+        return None
+    x, y = tile_x * tile_size, tile_y * tile_size
+    rows = ["".join(row[x:x + tile_size]) for row in maze[y:y + tile_size]]
+    return {"tile_x": tile_x, "tile_y": tile_y, "x": x, "y": y, "rows": rows}
+
+def viewport_tiles(maze: Sequence[Sequence[str]], x: int, y: int, width: int, height: int,
+                   tile_size: int = TILE_SIZE) -> List[List[int]]:
+    """
+    The [tile_x, tile_y] of every tile that overlaps the viewport of width x height cells whose
+    top left cell is column x, row y, row by row. Parts of the viewport outside the maze are
+    ignored. Raises ValueError if it covers more than MAX_VIEWPORT_TILES tiles.
+    """
+    grid = tile_grid(maze, tile_size)
+    x0, y0 = max(0, x) // tile_size, max(0, y) // tile_size
+    x1 = min(grid["tiles_x"], -(-(x + width) // tile_size))
+    y1 = min(grid["tiles_y"], -(-(y + height) // tile_size))
+    if x1 <= x0 or y1 <= y0:
+        return []
+    if (x1 - x0) * (y1 - y0) > MAX_VIEWPORT_TILES:
+        raise ValueError(f"The viewport covers {(x1 - x0) * (y1 - y0)} tiles, at most {MAX_VIEWPORT_TILES} are served at once.")
+    return [[tx, ty] for ty in range(y0, y1) for tx in range(x0, x1)]
+
+def get_viewport(maze_id: str, maze: Sequence[Sequence[str]], x: int, y: int, width: int, height: int,
+                 known: Iterable[str] = (), tile_size: int = TILE_SIZE) -> Dict[str, Any]:
+    """
+    Returns the tiles a viewport shows with their ETags, after the tile grid dimensions. Tiles
+    whose ETag is in `known`, the ones the client already holds, come without their rows.
+    """
+    known = set(known)
+    tiles = []
+    for tx, ty in viewport_tiles(maze, x, y, width, height, tile_size):
+        etag = tile_etag(maze_id, tx, ty)
+        if etag in known:
+            tiles.append({"tile_x": tx, "tile_y": ty, "etag": etag})
+        else:
+            tiles.append({**get_tile(maze, tx, ty, tile_size), "etag": etag})
+    return {**tile_grid(maze, tile_size), "tiles": tiles}
@@ -0,0 +1,285 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+# Directory where every process (uvicorn workers, solver pool workers) writes its metric
+# values, so /metrics can add them up. Without it metrics only cover the serving process.
+METRICS_DIR = os.environ.get("METRICS_DIR")
+# Seconds between writes of this process's values to METRICS_DIR by a background thread;
+# 0 writes them after every solver call instead, for processes that only run solvers.
+FLUSH_INTERVAL = 1.0
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> List[List[Any]]:
+        """Returns [[label values, value], ...], JSON-ready."""
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+class Counter(_Metric):
+    """A monotonically increasing count. Hot loops should count locally and inc() once per run."""
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Histogram(_Metric):
+    """Counts observations into fixed buckets and keeps their sum."""
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (the last one is +Inf) and the sum of observations
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+
+    def snapshot(self) -> List[List[Any]]:
+        with self._lock:
+            return [[list(key), [list(counts), total]] for key, (counts, total) in self._values.items()]
+
+class Registry:
+    """The metrics of this process, rendered in the Prometheus text format."""
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, List[List[Any]]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset(self):
+        """Zeroes every metric, e.g. in a forked worker that must not count its parent's values again."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self, snapshots: Sequence[Dict[str, List[List[Any]]]]) -> str:
+        """Adds up the values of several snapshots and renders them as Prometheus text."""
+        lines = []
+        for name, metric in self._metrics.items():
+            totals = {}
+            for snapshot in snapshots:
+                for key, value in snapshot.get(name, []):
+                    key = tuple(key)
+                    if metric.type == "histogram":
+                        total = totals.setdefault(key, [[0] * len(value[0]), 0.0])
+                        total[0] = [a + b for a, b in zip(total[0], value[0])]
+                        total[1] += value[1]
+                    else:
+                        totals[key] = totals.get(key, 0) + value
+
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for key, value in sorted(totals.items()):
+                labels = list(zip(metric.labelnames, key))
+                if metric.type != "histogram":
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                    continue
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram("maze_http_request_seconds", "Time to the response head, per route.", ("method", "route"))
+SOLVER_SECONDS = REGISTRY.histogram("maze_solver_seconds", "Run time of one solver call.", ("solver",))
+BFS_NODES = REGISTRY.counter("maze_bfs_nodes_total", "Nodes dequeued by the main-path BFS.")
+ASTAR_EXPANSIONS = REGISTRY.counter("maze_astar_expansions_total", "Nodes expanded by the greedy navigator's A*.")
+PUZZLE_TRIES = REGISTRY.counter("maze_puzzle_tries_total", "Candidate passwords tried by the puzzle solver.")
+BOSS_BATTLE_STATES = REGISTRY.counter("maze_boss_battle_states_total",
+                                      "Branch and Bound states by event: expanded, pushed, pruned_bound, pruned_dominated.", ("event",))
+GENERATION_RETRIES = REGISTRY.counter("maze_generation_retries_total", "Mazes rebuilt because they had no unique path.")
+VERIFICATIONS = REGISTRY.counter("maze_solver_verifications_total",
+                                 "Sampled solver results checked against the reference solvers, by outcome.", ("solver", "outcome"))
+
+# Counters for the work counts algorithms leave in their `stats` dict, by key.
+WORK_COUNTERS = {
+    "bfs_nodes": BFS_NODES,
+    "astar_expansions": ASTAR_EXPANSIONS,
+    "puzzle_tries": PUZZLE_TRIES,
+    "generation_retries": GENERATION_RETRIES,
+}
+BOSS_BATTLE_EVENTS = ("expanded", "pushed", "pruned_bound", "pruned_dominated")
+
+_flush_lock = threading.Lock()
+_flusher = None
+
+def record_work(stats: Dict[str, Any]):
+    """Adds the work counts an algorithm left in its `stats` dict to the matching counters."""
+    for key, count in stats.items():
+        if key in WORK_COUNTERS:
+            WORK_COUNTERS[key].inc(count)
+        elif key in BOSS_BATTLE_EVENTS:
+            BOSS_BATTLE_STATES.inc(count, event=key)
+
+def configure(directory: Optional[str], flush_interval: float = FLUSH_INTERVAL):
+    """Sets the directory this process writes its values to and how often."""
+    global METRICS_DIR, FLUSH_INTERVAL
+    METRICS_DIR, FLUSH_INTERVAL = directory, flush_interval
+    if directory is not None and flush_interval > 0:
+        _start_flusher()
+
+def _start_flusher():
+    global _flusher
+    with _flush_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_periodically, name="metrics-flush", daemon=True)
+            _flusher.start()
+
+def _flush_periodically():
+    # Stops once metrics are no longer shared or are written after every solver call instead
+    while METRICS_DIR is not None and FLUSH_INTERVAL > 0:
+        time.sleep(FLUSH_INTERVAL)
+        try:
+            flush()
+        except OSError as e:
+            print(f"Error writing metrics: {e}")
+
+def shared_directory() -> str:
+    """Returns METRICS_DIR, creating a private one first if none is configured."""
+    if METRICS_DIR is None:
+        configure(tempfile.mkdtemp(prefix="maze-metrics-"), FLUSH_INTERVAL)
+    return METRICS_DIR
+
+def flush():
+    """Writes this process's values to METRICS_DIR."""
+    directory = METRICS_DIR
+    if directory is None:
+        return
+    path = os.path.join(directory, f"metrics_{os.getpid()}.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(REGISTRY.snapshot(), f)
+    os.replace(path + ".tmp", path)
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # Alive, but owned by another user
+        return True
+    return True
+
+def render_metrics() -> str:
+    """
+    Renders the values of every process sharing METRICS_DIR, or of this process alone.
+    This process's own values are read from memory; the files of processes that are no
+    longer running are deleted, so their values stop counting.
+    """
+    snapshots = [REGISTRY.snapshot()]
+    if METRICS_DIR is None:
+        return REGISTRY.render(snapshots)
+    own_pid = os.getpid()
+    for filename in os.listdir(METRICS_DIR):
+        if not (filename.startswith("metrics_") and filename.endswith(".json")):
+            continue
+        try:
+            pid = int(filename[len("metrics_"):-len(".json")])
+        except ValueError:
+            continue
+        path = os.path.join(METRICS_DIR, filename)
+        if pid == own_pid:
+            continue
+        if not _pid_alive(pid):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):  # A process is rewriting its file
+            continue
+    return REGISTRY.render(snapshots)
+
+def timed_call(solver: str, fn, *args, **kwargs):
+    """
+    Calls fn(*args, **kwargs) and records its run time under `solver`. Processes that write
+    their values after every solver call (FLUSH_INTERVAL of 0) do so here.
+    """
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        SOLVER_SECONDS.observe(time.perf_counter() - start, solver=solver)
+        if FLUSH_INTERVAL == 0:
+            flush()
+
+class MetricsMiddleware:
+    """ASGI middleware that records the time to the response head of every HTTP request by route."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_and_record(message):
+            if message["type"] == "http.response.start":
+                # The router stores the matched route in the scope; its path template keeps the label set small
+                route = scope.get("route")
+                REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope["method"],
+                                        route=getattr(route, "path", "unmatched"))
+            await send(message)
+
+        await self.app(scope, receive, send_and_record)
+
+if METRICS_DIR is not None:
+    _start_flusher()
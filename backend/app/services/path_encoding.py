@@ -0,0 +1,66 @@
+import re
+from typing import List, Tuple, Dict, Any, Sequence
+
+# Path encodings a pathfinding response can use:
+# "coords" - a list of [r, c] pairs
+# "moves"  - the start [r, c] plus one U/D/L/R letter per step, e.g. "RRRDDL"
+# "rle"    - like "moves", with runs written as count + letter, e.g. "3R2DL"
+PATH_ENCODINGS = ("coords", "moves", "rle")
+
+_STEPS = {(-1, 0): 'U', (1, 0): 'D', (0, -1): 'L', (0, 1): 'R'}
+_DELTAS = {move: step for step, move in _STEPS.items()}
+_RUN = re.compile(r'(\d*)([UDLR])')
+
+def encode_moves(path: Sequence[Sequence[int]]) -> Tuple[List[int], str]:
+    """
+    Encodes a path of orthogonally adjacent cells as (start, moves).
+    Raises ValueError if two consecutive cells are not neighbors.
+    """
+    if not path:
+        return [], ""
+    moves = []
+    prev_r, prev_c = path[0]
+    for r, c in path[1:]:
+        move = _STEPS.get((r - prev_r, c - prev_c))
+        if move is None:
+            raise ValueError(f"Cells {(prev_r, prev_c)} and {(r, c)} are not adjacent.")
+        moves.append(move)
+        prev_r, prev_c = r, c
+    return [path[0][0], path[0][1]], "".join(moves)
+
+def compress_moves(moves: str) -> str:
+    """Run-length compresses a move string: "RRRDDL" becomes "3R2DL"."""
+    runs = []
+    i = 0
+    while i < len(moves):
+        j = i
+        while j < len(moves) and moves[j] == moves[i]:
+            j += 1
+        runs.append(f"{j - i}{moves[i]}" if j - i > 1 else moves[i])
+        i = j
+    return "".join(runs)
+
+def decode_moves(start: Sequence[int], moves: str) -> List[List[int]]:
+    """Expands (start, moves) back into [r, c] pairs; accepts both plain and run-length moves."""
+    if not start:
+        return []
+    r, c = start
+    path = [[r, c]]
+    for count, move in _RUN.findall(moves):
+        dr, dc = _DELTAS[move]
+        for _ in range(int(count or 1)):
+            r, c = r + dr, c + dc
+            path.append([r, c])
+    return path
+
+def encode_path(path: Sequence[Sequence[int]], encoding: str = "coords") -> Dict[str, Any]:
+    """
+    Returns the path fields of a pathfinding response in the requested encoding:
+    {"path": [[r, c], ...]} for "coords", or {"start": [r, c], "moves": "..."} otherwise.
+    """
+    if encoding == "coords":
+        return {"path": [[r, c] for r, c in path]}
+    start, moves = encode_moves(path)
+    if encoding == "rle":
+        moves = compress_moves(moves)
+    return {"start": start, "moves": moves}
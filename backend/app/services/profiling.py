@@ -0,0 +1,143 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.replay_log import recorded_call
+
+# Fraction of solver requests profiled without being asked; 0 turns sampling off.
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+# Where profiles are kept, and how many: the oldest are dropped first.
+PROFILE_DIR = os.environ.get("PROFILE_DIR") or os.path.join(tempfile.gettempdir(), "maze-profiles")
+PROFILE_RING_SIZE = int(os.environ.get("PROFILE_RING_SIZE", "50"))
+# Header that asks for a profile of one request.
+PROFILE_HEADER = "X-Profile"
+# Functions listed in a profile's summary.
+PROFILE_TOP_FUNCTIONS = 30
+
+_PROFILE_ID = re.compile(r"[0-9a-z-]+")
+_ring_lock = threading.Lock()
+# tracemalloc's tracing and peak are process-wide, so profiled calls run one at a time.
+_profile_lock = threading.Lock()
+
+def should_profile(header: Optional[str]) -> bool:
+    """True when the request sent the profile header or falls in the PROFILE_SAMPLE_RATE sample."""
+    if header:
+        return header.lower() not in ("0", "false", "no")
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+def profiled_call(solver: str, header: Optional[str], inputs: Callable[[], Any], fn, *args):
+    """
+    Calls fn(*args) like replay_log.recorded_call. When should_profile(header) holds, the call
+    also runs under cProfile and tracemalloc, and the profile is saved with inputs() attached.
+    `inputs` is only called for profiled or logged calls, so a plain call costs two checks.
+
+    Profiled calls wait for each other, as one call's reset or stop of tracemalloc would spoil
+    another's measurement. The peak is still that of the whole process while the call ran, so
+    unprofiled requests running at the same time add to it.
+    """
+    if not should_profile(header):
+        return recorded_call(solver, inputs, fn, *args)
+    with _profile_lock:
+        return _profile(solver, inputs, fn, *args)
+
+def _profile(solver: str, inputs: Callable[[], Any], fn, *args):
+    profiler = cProfile.Profile()
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    error = None
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        return recorded_call(solver, inputs, fn, *args)
+    except Exception as e:
+        error = repr(e)
+        raise
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        if started_tracing:
+            tracemalloc.stop()
+        try:
+            save_profile(solver, inputs(), profiler, elapsed, peak, error)
+        except Exception as e:
+            print(f"Failed to save {solver} profile: {e}")
+
+def save_profile(solver: str, inputs: Any, profiler: cProfile.Profile, elapsed: float,
+                 peak_bytes: int, error: Optional[str] = None) -> str:
+    """
+    Stores a profile in PROFILE_DIR as <id>.json (summary and inputs) and <id>.prof (pstats
+    data), drops the oldest beyond PROFILE_RING_SIZE and returns the id.
+    """
+    profile_id = f"{time.time_ns()}-{solver}-{uuid.uuid4().hex[:8]}"
+    summary = io.StringIO()
+    pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+    record = {
+        "id": profile_id,
+        "solver": solver,
+        "created": time.time(),
+        "seconds": elapsed,
+        "peak_bytes": peak_bytes,
+        "error": error,
+        "inputs": inputs,
+        "stats": summary.getvalue(),
+    }
+
+    with _ring_lock:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+        with open(os.path.join(PROFILE_DIR, f"{profile_id}.json"), "w") as f:
+            json.dump(record, f)
+        # Ids start with a nanosecond timestamp, so names sort oldest first
+        ids = _profile_ids()
+        for old_id in ids[:max(0, len(ids) - PROFILE_RING_SIZE)]:
+            for ext in (".json", ".prof"):
+                try:
+                    os.remove(os.path.join(PROFILE_DIR, old_id + ext))
+                except FileNotFoundError:
+                    pass
+    return profile_id
+
+def _profile_ids() -> List[str]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return sorted(name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+
+def list_profiles() -> List[Dict[str, Any]]:
+    """Lists stored profiles, newest first, without their inputs and stats."""
+    profiles = []
+    for profile_id in reversed(_profile_ids()):
+        record = get_profile(profile_id)
+        if record is not None:
+            profiles.append({key: record[key] for key in ("id", "solver", "created", "seconds", "peak_bytes", "error")})
+    return profiles
+
+def get_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    """Returns a stored profile with its inputs and stats summary, or None."""
+    path = profile_path(profile_id, ".json")
+    if path is None:
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):  # Dropped from the ring meanwhile
+        return None
+
+def profile_path(profile_id: str, ext: str = ".prof") -> Optional[str]:
+    """Returns the path of a stored profile file, or None for an unknown or malformed id."""
+    if not _PROFILE_ID.fullmatch(profile_id):
+        return None
+    path = os.path.join(PROFILE_DIR, profile_id + ext)
+    return path if os.path.exists(path) else None
@@ -0,0 +1,277 @@
+"""
+Append-only binary log of what the API did, for replaying games and re-running solves offline.
+
+A log file starts with MAGIC and holds one record per event:
+
+    length (u32) | crc32 of the body (u32) | unix time (f64) | kind (u8) | body
+
+Bodies are compact JSON, zlib-compressed when the high bit of `kind` is set. The fixed header
+lets a reader walk the records of a file and skip bodies it does not need, and every record
+is addressable by its byte offset. A torn record at the end of a file (the process died
+mid-write) fails its length or checksum and ends the file.
+
+Events are queued by log_event and written in batches by a background thread, so a request
+only pays for a list append. Each process writes its own files in REPLAY_LOG_DIR and starts a
+new one past REPLAY_LOG_MAX_BYTES, keeping the REPLAY_LOG_KEEP newest of its own files; files of
+other processes, which may still be open, are left alone.
+"""
+import atexit
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from app.services.metrics import timed_call
+from app.services.serializers import dumps
+
+try:
+    import orjson as _json
+except ImportError:  # orjson is optional, as in serializers
+    import json as _json
+
+# Directory of the log files; logging is off without it.
+REPLAY_LOG_DIR = os.environ.get("REPLAY_LOG_DIR")
+# Size at which a file is closed and the next one started, and how many files are kept (0 keeps all).
+REPLAY_LOG_MAX_BYTES = int(os.environ.get("REPLAY_LOG_MAX_BYTES", str(64 * 1024 * 1024)))
+REPLAY_LOG_KEEP = int(os.environ.get("REPLAY_LOG_KEEP", "20"))
+# Seconds queued events may wait, and the queue length that triggers a write sooner.
+FLUSH_INTERVAL = 0.5
+BATCH_SIZE = 256
+# Bodies at least this long are compressed.
+COMPRESS_MIN_BYTES = 512
+
+MAGIC = b"MAZEREPLAY1\n"
+_HEADER = struct.Struct("<IIdB")
+_COMPRESSED = 0x80
+
+# Event kinds and their record codes:
+# "maze"    - a generated maze: maze_id, maze rows, bosses, lockers, player_skills, unique_path
+# "session" - a game session started: session_id, maze_id
+# "move"    - a session move: session_id, move and the delta it returned
+# "solve"   - a solver call: solver, inputs, result (or error) and seconds
+KINDS = {"maze": 1, "session": 2, "move": 3, "solve": 4}
+_KIND_NAMES = {code: name for name, code in KINDS.items()}
+
+class ReplayRecord(NamedTuple):
+    path: str
+    offset: int
+    time: float
+    kind: str
+    data: Any
+
+def encode_record(kind: str, data: Any, timestamp: float) -> bytes:
+    """Encodes one event as a record: header, then the (maybe compressed) JSON body."""
+    code = KINDS[kind]
+    body = dumps(data)
+    if len(body) >= COMPRESS_MIN_BYTES:
+        body = zlib.compress(body, 1)
+        code |= _COMPRESSED
+    return _HEADER.pack(len(body), zlib.crc32(body), timestamp, code) + body
+
+class ReplayLog:
+    """Queues events and writes them to rotating files from a background thread."""
+    def __init__(self, directory: str, max_bytes: int = REPLAY_LOG_MAX_BYTES, keep: int = REPLAY_LOG_KEEP,
+                 flush_interval: float = FLUSH_INTERVAL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._wakeup = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._file = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="replay-log", daemon=True)
+        self._thread.start()
+
+    def log(self, kind: str, data: Any):
+        """Queues an event; `data` is encoded later, so it must not be changed afterwards."""
+        event = (time.time(), kind, data)
+        with self._wakeup:
+            self._pending.append(event)
+            if len(self._pending) >= BATCH_SIZE:
+                self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self._wakeup:
+                if not self._closed and len(self._pending) < BATCH_SIZE:
+                    self._wakeup.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def flush(self):
+        """Writes the queued events now."""
+        with self._wakeup:
+            events, self._pending = self._pending, []
+        if not events:
+            return
+        with self._write_lock:
+            batch = bytearray()
+            for timestamp, kind, data in events:
+                try:
+                    batch += encode_record(kind, data, timestamp)
+                except Exception as e:
+                    print(f"Failed to encode a {kind} replay event: {e}")
+            f = self._current_file()
+            f.write(batch)
+            f.flush()
+
+    def _current_file(self):
+        if self._file is not None and self._file.tell() >= self.max_bytes:
+            self._file.close()
+            self._file = None
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            # Names sort oldest first: start time, then the process writing it
+            name = f"replay-{time.time_ns():020d}-{os.getpid()}.log"
+            self._file = open(os.path.join(self.directory, name), "ab")
+            self._file.write(MAGIC)
+            self._drop_old_files()
+        return self._file
+
+    def _drop_old_files(self):
+        if self.keep <= 0:
+            return
+        # Only this process's files: other workers may still be writing theirs
+        paths = log_files(self.directory, pid=os.getpid())
+        for path in paths[:max(0, len(paths) - self.keep)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        """Writes what is queued, stops the writer thread and closes the file."""
+        with self._wakeup:
+            self._closed = True
+            self._wakeup.notify()
+        self._thread.join()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+_log: Optional[ReplayLog] = None
+
+def configure(directory: Optional[str], **options) -> Optional[ReplayLog]:
+    """Starts logging to `directory`, or stops logging with None; returns the new log."""
+    global REPLAY_LOG_DIR, _log
+    if _log is not None:
+        _log.close()
+    REPLAY_LOG_DIR = directory
+    _log = ReplayLog(directory, **options) if directory else None
+    return _log
+
+def recording() -> bool:
+    """True when events are logged; check it before building an event that costs anything."""
+    return _log is not None
+
+def log_event(kind: str, data: Any):
+    """Queues an event for the log, if logging is on."""
+    if _log is not None:
+        _log.log(kind, data)
+
+def recorded_call(solver: str, inputs, fn, *args):
+    """
+    Calls fn(*args) like metrics.timed_call and logs a "solve" event with inputs() (only called
+    when logging is on), the result or error and the run time.
+    """
+    if _log is None:
+        return timed_call(solver, fn, *args)
+    start = time.perf_counter()
+    try:
+        result = timed_call(solver, fn, *args)
+    except Exception as e:
+        _log.log("solve", {"solver": solver, "inputs": inputs(), "error": repr(e), "seconds": time.perf_counter() - start})
+        raise
+    _log.log("solve", {"solver": solver, "inputs": inputs(), "result": result, "seconds": time.perf_counter() - start})
+    return result
+
+def log_files(directory: str, pid: Optional[int] = None) -> List[str]:
+    """The log files of a directory, oldest first; only those written by process `pid` if given."""
+    if not os.path.isdir(directory):
+        return []
+    suffix = f"-{pid}.log" if pid is not None else ".log"
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.startswith("replay-") and name.endswith(suffix)]
+
+class ReplayReader:
+    """
+    Reads one log file record by record. Bodies are only read and decoded for the kinds asked
+    for, so scanning a large file for a few events costs little more than its headers.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        if self._file.read(len(MAGIC)) != MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a replay log.")
+        self._size = 0
+
+    def _header(self, offset: int):
+        """The header fields of the record at offset, or None past the last complete record."""
+        f = self._file
+        f.seek(offset)
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return None
+        length, crc, timestamp, code = _HEADER.unpack(header)
+        if (code & ~_COMPRESSED) not in _KIND_NAMES or offset + _HEADER.size + length > self._size:
+            return None
+        return length, crc, timestamp, code
+
+    def read_at(self, offset: int) -> Optional[ReplayRecord]:
+        """The record at a byte offset, as ReplayRecord.offset gives it; None for a torn record."""
+        self._size = os.fstat(self._file.fileno()).st_size
+        header = self._header(offset)
+        if header is None:
+            return None
+        length, crc, timestamp, code = header
+        body = self._file.read(length)
+        if zlib.crc32(body) != crc:
+            return None
+        data = _json.loads(zlib.decompress(body) if code & _COMPRESSED else body)
+        return ReplayRecord(self.path, offset, timestamp, _KIND_NAMES[code & ~_COMPRESSED], data)
+
+    def records(self, kinds: Optional[Iterable[str]] = None, offset: int = len(MAGIC)) -> Iterator[ReplayRecord]:
+        """Yields the records from `offset` on; records of other kinds are skipped unread."""
+        kinds = set(kinds) if kinds is not None else None
+        self._size = os.fstat(self._file.fileno()).st_size
+        while True:
+            header = self._header(offset)
+            if header is None:
+                return
+            if kinds is None or _KIND_NAMES[header[3] & ~_COMPRESSED] in kinds:
+                record = self.read_at(offset)
+                if record is None:
+                    return
+                yield record
+            offset += _HEADER.size + header[0]
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def read_log(paths: Sequence[str], kinds: Optional[Iterable[str]] = None) -> Iterator[ReplayRecord]:
+    """Yields the records of several files or directories of files, oldest file first."""
+    files = []
+    for path in paths:
+        files.extend(log_files(path) if os.path.isdir(path) else [path])
+    for path in files:
+        with ReplayReader(path) as reader:
+            yield from reader.records(kinds)
+
+atexit.register(lambda: _log is not None and _log.close())
+
+if REPLAY_LOG_DIR:
+    configure(REPLAY_LOG_DIR)
@@ -0,0 +1,66 @@
+import json
+from typing import Any, Dict, List
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder produces the same JSON, only slower
+    orjson = None
+
+def _orjson_dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+BACKENDS = {"json": _stdlib_dumps}
+if orjson is not None:
+    BACKENDS["orjson"] = _orjson_dumps
+
+# Name of the backend dumps() uses: orjson when installed, stdlib json otherwise.
+backend = "orjson" if orjson is not None else "json"
+_dumps = BACKENDS[backend]
+
+def use_backend(name: str):
+    """Switches every serializer in this module to the named backend, one of BACKENDS."""
+    global backend, _dumps
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}', expected one of {sorted(BACKENDS)}.")
+    backend, _dumps = name, BACKENDS[name]
+
+def dumps(obj: Any) -> bytes:
+    """Encodes obj as compact UTF-8 JSON with the current backend."""
+    return _dumps(obj)
+
+def sse_event(obj: Any) -> bytes:
+    """Encodes obj as one Server-Sent Event `data:` frame."""
+    return b"data: " + _dumps(obj) + b"\n\n"
+
+class MazeFrameEncoder:
+    """
+    Encodes the {'maze': grid} frames of a generation stream as SSE events.
+
+    Successive frames differ in a few rows at most, so each row's JSON is kept and only rows
+    whose cells changed since the previous frame are encoded again. Other payloads, such as
+    the final one carrying the bosses and lockers, are encoded in full.
+    The generator mutates one grid in place, so a frame must be encoded before the next one
+    is generated.
+    """
+    def __init__(self):
+        self._rows: List[str] = []
+        self._encoded: List[bytes] = []
+
+    def encode(self, payload: Dict[str, Any]) -> bytes:
+        if payload.keys() != {'maze'}:
+            return sse_event(payload)
+
+        grid = payload['maze']
+        if len(grid) != len(self._rows):
+            self._rows = [None] * len(grid)
+            self._encoded = [b""] * len(grid)
+        rows, encoded = self._rows, self._encoded
+        for r, row in enumerate(grid):
+            cells = "".join(row)
+            if cells != rows[r]:
+                rows[r] = cells
+                encoded[r] = _dumps(row)
+        return b'data: {"maze":[' + b",".join(encoded) + b']}\n\n'
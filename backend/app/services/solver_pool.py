@@ -0,0 +1,123 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterator, Optional
+
+from app.algorithms.pathfinder_dp import build_graph, find_main_path
+from app.algorithms.maze_index import MazeIndex
+from app.services.api_helpers import (
+    prepare_and_solve_dp, prepare_and_solve_greedy, prepare_and_solve_puzzle, prepare_and_solve_boss_battle,
+)
+from app.services.path_encoding import encode_path
+from app.services import metrics
+from app.services.metrics import timed_call, record_work
+
+# Worker processes shared by every request that fans solvers out; os.cpu_count() by default.
+SOLVER_POOL_WORKERS = None
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _init_worker(metrics_dir):
+    # Forked workers start with a copy of the parent's metrics; count only their own work,
+    # and write it after every solver call as a worker process never runs atexit hooks.
+    metrics.REGISTRY.reset()
+    metrics.configure(metrics_dir, flush_interval=0.0)
+
+def get_solver_pool() -> ProcessPoolExecutor:
+    """Returns the process pool the solvers run on, starting it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=SOLVER_POOL_WORKERS or os.cpu_count() or 1,
+                                        initializer=_init_worker, initargs=(metrics.shared_directory(),))
+        return _pool
+
+def shutdown_solver_pool():
+    """Stops the solver pool; the next get_solver_pool() starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+def solve_all(maze: List[List[str]], main_path: Optional[List[List[int]]] = None,
+              lockers: Optional[List[Dict[str, Any]]] = None, boss_hps: Optional[List[int]] = None,
+              skills: Optional[List[Dict[str, Any]]] = None,
+              path_encoding: str = "coords", index: Optional[MazeIndex] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Runs DP, greedy, every locker puzzle and the boss fight of one maze at once on the solver
+    pool and yields one update per solver in the order they finish:
+    {"solver": "dp" | "greedy" | "puzzle" | "boss", "result": ...}, with the locker "id" for
+    puzzles, or "error" in place of "result" if that solver failed.
+
+    The maze is parsed into a graph, and its main path found, once for both pathfinders; with
+    the `index` of a generated maze neither is computed again.
+    The boss fight only runs when both `boss_hps` and `skills` are given, and pathfinder
+    results use `path_encoding` (see encode_path).
+    """
+    graph = index.graph() if index is not None else build_graph(maze)
+    if main_path is None and index is not None:
+        main_path = index.main_path_cells()
+    elif main_path is None:
+        stats = {}
+        main_path = find_main_path(maze, graph, stats)
+        record_work(stats)
+
+    pool = get_solver_pool()
+    futures = {
+        pool.submit(timed_call, "dp", prepare_and_solve_dp, maze, main_path, graph): ("dp", None),
+        pool.submit(timed_call, "greedy", prepare_and_solve_greedy, maze, graph, index): ("greedy", None),
+    }
+    for locker in lockers or []:
+        future = pool.submit(timed_call, "puzzle", prepare_and_solve_puzzle, locker['password_hash'], locker['constraints'])
+        futures[future] = ("puzzle", locker['id'])
+    if boss_hps and skills:
+        futures[pool.submit(timed_call, "boss", prepare_and_solve_boss_battle, boss_hps, skills)] = ("boss", None)
+
+    try:
+        for future in as_completed(futures):
+            solver, locker_id = futures[future]
+            update = {"solver": solver}
+            if locker_id is not None:
+                update["id"] = locker_id
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Error in {solver} solver: {e}")
+                update["error"] = f"An unexpected error occurred in the {solver} solver."
+                yield update
+                continue
+
+            if solver in ("dp", "greedy"):
+                path, value = result
+                update["result"] = {**encode_path(path, path_encoding), "value": value}
+            elif solver == "puzzle":
+                solution, tries = result
+                update["result"] = {"solution": solution, "tries": tries}
+            elif result is None:
+                update["error"] = "No solution found for the boss battle."
+            else:
+                update["result"] = result
+            yield update
+    finally:
+        # A client that stops listening should not keep the pool busy.
+        for future in futures:
+            future.cancel()
+
+def gather_solve_all(updates: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Folds the updates of solve_all into one response: "dp", "greedy" and "boss" results,
+    "puzzles" keyed by locker id, and "errors" keyed by solver name (or "puzzle:<id>").
+    """
+    response = {"dp": None, "greedy": None, "puzzles": {}, "boss": None, "errors": {}}
+    for update in updates:
+        solver = update["solver"]
+        key = f"puzzle:{update['id']}" if solver == "puzzle" else solver
+        if "error" in update:
+            response["errors"][key] = update["error"]
+        elif solver == "puzzle":
+            response["puzzles"][str(update["id"])] = update["result"]
+        else:
+            response[solver] = update["result"]
+    return response
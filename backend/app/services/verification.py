@@ -0,0 +1,149 @@
+import json
+import logging
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+from app.algorithms.boss_battle import solve_boss_battle
+from app.algorithms.maze_generator import PasswordLock
+from app.algorithms.pathfinder_dp import SCORE_MAP, solve_with_dp
+from app.algorithms.pathfinder_greedy import solve_with_greedy
+from app.algorithms.puzzle_solver import solve_puzzle
+from app.services.metrics import VERIFICATIONS
+
+# Fraction of solver requests checked against the reference solvers; 0 turns it off.
+VERIFY_SAMPLE_RATE = float(os.environ.get("VERIFY_SAMPLE_RATE", "0"))
+
+logger = logging.getLogger(__name__)
+
+# The reference implementation of each solver, called with the request inputs. Faster engines
+# (another boss battle engine, a pathfinder fed a client's main path) are checked against these.
+REFERENCE_SOLVERS = {
+    "dp": lambda inputs: solve_with_dp(inputs["maze"]),
+    "greedy": lambda inputs: solve_with_greedy(inputs["maze"]),
+    "puzzle": lambda inputs: solve_puzzle(inputs["password_hash"], inputs["constraints"]),
+    "boss": lambda inputs: solve_boss_battle(inputs["boss_hps"], [[s["damage"], s["cooldown"]] for s in inputs["skills"]]),
+}
+
+def should_verify() -> bool:
+    """True for the VERIFY_SAMPLE_RATE fraction of requests whose results get verified."""
+    return VERIFY_SAMPLE_RATE > 0 and random.random() < VERIFY_SAMPLE_RATE
+
+def route_problems(maze: List[str], path: List[List[int]], value: int) -> List[str]:
+    """
+    Checks that a route walks from S to E through adjacent open cells and that `value` is the
+    score of the distinct cells it visits, as both pathfinders count it.
+    """
+    if not path:
+        return ["The route is empty."]
+    cells = [tuple(cell) for cell in path]
+    height, width = len(maze), len(maze[0])
+    for r, c in cells:
+        if not (0 <= r < height and 0 <= c < width) or maze[r][c] == '#':
+            return [f"The route enters the wall or leaves the maze at {[r, c]}."]
+    (sr, sc), (er, ec) = cells[0], cells[-1]
+    problems = []
+    if maze[sr][sc] != 'S' or maze[er][ec] != 'E':
+        problems.append("The route does not lead from S to E.")
+    for (r1, c1), (r2, c2) in zip(cells, cells[1:]):
+        if abs(r1 - r2) + abs(c1 - c2) != 1:
+            problems.append(f"The route jumps from {[r1, c1]} to {[r2, c2]}.")
+            break
+    score = sum(SCORE_MAP.get(maze[r][c], 0) for r, c in set(cells))
+    if score != value:
+        problems.append(f"The route scores {score}, not the reported {value}.")
+    return problems
+
+def boss_schedule_turns(boss_hps: List[int], skills: List[List[int]], skill_indices: List[int]) -> Optional[int]:
+    """
+    Replays skills in order, each as soon as it is off cooldown, and returns the turns taken to
+    defeat every boss, or None if the sequence does not defeat them all or continues after.
+    """
+    cooldowns = [0] * len(skills)
+    turns = boss = 0
+    boss_hp = boss_hps[0] if boss_hps else 0
+    for idx in skill_indices:
+        if boss == len(boss_hps):
+            return None
+        wait = cooldowns[idx]
+        turns += wait + 1
+        cooldowns = [max(0, cd - wait - 1) for cd in cooldowns]
+        cooldowns[idx] = skills[idx][1]
+        boss_hp -= skills[idx][0]
+        if boss_hp <= 0:
+            boss += 1
+            boss_hp = boss_hps[boss] if boss < len(boss_hps) else 0
+    return turns if boss == len(boss_hps) else None
+
+def _check_route(solver, inputs, result, reference):
+    problems = route_problems(inputs["maze"], result["path"], result["value"])
+    ref_path, ref_value = reference
+    if result["value"] != ref_value:
+        problems.append(f"Scores {result['value']}, the reference {solver} solver scores {ref_value}.")
+    elif solver == "greedy" and [list(cell) for cell in result["path"]] != [list(cell) for cell in ref_path]:
+        problems.append("The route differs from the reference greedy route.")
+    return problems
+
+def _check_puzzle(inputs, result, reference):
+    problems = []
+    solution = result["solution"]
+    if solution and not PasswordLock().verify_password("".join(map(str, solution)), inputs["password_hash"]):
+        problems.append(f"{solution} does not match the password hash.")
+    ref_solution, ref_tries = reference
+    if solution != ref_solution or result["tries"] != ref_tries:
+        problems.append(f"Found {solution} in {result['tries']} tries, the reference in {ref_tries} tries found {ref_solution}.")
+    return problems
+
+def _check_boss(inputs, result, reference):
+    ref_turns = reference[0]
+    if result is None:
+        return [] if not reference[1] else [f"No schedule found, the reference needs {ref_turns} turns."]
+    skills = [[s["damage"], s["cooldown"]] for s in inputs["skills"]]
+    names = [s["name"] for s in inputs["skills"]]
+    boss_hps = inputs["boss_hps"]
+    if result.get("order") is not None:
+        boss_hps = [boss_hps[i] for i in result["order"]]
+
+    # Skills are replayed by index, as the solvers pick them; names may repeat
+    skill_indices = result.get("skill_indices")
+    if skill_indices is None:
+        if len(set(names)) != len(names):
+            return ["The sequence names skills that share a name and has no skill indices."]
+        skill_indices = [names.index(name) for name in result["sequence"]]
+    if any(not 0 <= i < len(skills) for i in skill_indices):
+        return [f"The sequence uses unknown skill indices {skill_indices}."]
+    problems = []
+    if [names[i] for i in skill_indices] != list(result["sequence"]):
+        problems.append("The skill names of the sequence do not match its skill indices.")
+    turns = boss_schedule_turns(boss_hps, skills, skill_indices)
+    if turns is None or turns > result["turns"]:
+        problems.append(f"The sequence does not defeat every boss within the reported {result['turns']} turns.")
+    # Any order may beat the list order, but never lose to it
+    if result["turns"] > ref_turns or (not inputs.get("any_order") and result["turns"] != ref_turns):
+        problems.append(f"Takes {result['turns']} turns, the reference needs {ref_turns}.")
+    return problems
+
+def verify(solver: str, inputs: Dict[str, Any], result: Any) -> List[str]:
+    """
+    Runs the reference solver on inputs and returns the ways `result` disagrees with it or is
+    invalid; empty when it checks out. Results are shaped as the solver endpoints return them:
+    {"path", "value"} for "dp" and "greedy", {"solution", "tries"} for "puzzle", and the result
+    of prepare_and_solve_boss_battle for "boss".
+    """
+    reference = REFERENCE_SOLVERS[solver](inputs)
+    if solver in ("dp", "greedy"):
+        return _check_route(solver, inputs, result, reference)
+    if solver == "puzzle":
+        return _check_puzzle(inputs, result, reference)
+    return _check_boss(inputs, result, reference)
+
+def verify_and_log(solver: str, inputs: Dict[str, Any], result: Any) -> List[str]:
+    """Verifies a result, counts the outcome and logs a mismatch with its inputs attached."""
+    try:
+        problems = verify(solver, inputs, result)
+    except Exception as e:
+        problems = [f"Verification failed: {type(e).__name__}: {e}"]
+    VERIFICATIONS.inc(solver=solver, outcome="mismatch" if problems else "match")
+    if problems:
+        logger.warning("%s solver mismatch: %s", solver, json.dumps({"problems": problems, "inputs": inputs, "result": result}))
+    return problems
@@ -0,0 +1,65 @@
+"""
+Compares node expansions of the boss battle solver with the legacy average-DPS bound and
+exact-repeat pruning against the capacity bound with dominance pruning.
+
+Instances are drawn from the game's own generators (BossGroup and Maze._set_player_skills).
+
+Usage (from the backend directory):
+    python -m benchmarks.boss_battle_bounds --instances 20 --seed 0
+"""
+import argparse
+import random
+import time
+
+from app.algorithms.boss_battle import solve_boss_battle
+from app.algorithms.maze_generator import BossGroup, Maze
+
+CONFIGS = {
+    'legacy': {'bound': 'dps', 'dominance': False},
+    'tight': {'bound': 'schedule', 'dominance': True},
+}
+
+def random_fight(seed):
+    """Returns (bosses, skills) for a fight generated the same way as in a maze."""
+    random.seed(seed)
+    bosses = BossGroup().bosses
+    skills = Maze(7, 7).player_skills
+    return bosses, skills
+
+def run_config(bosses, skills, config):
+    stats = {}
+    start = time.perf_counter()
+    turns, _ = solve_boss_battle(bosses, skills, stats=stats, **config)
+    return turns, stats, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--instances', type=int, default=20, help='Number of random fights.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the first fight.')
+    args = parser.parse_args()
+
+    totals = {name: {'expanded': 0, 'seconds': 0.0} for name in CONFIGS}
+    print(f"{'seed':>6} {'bosses':>6} {'skills':>6} {'turns':>6} " +
+          ' '.join(f"{name + ' nodes':>13} {name + ' s':>9}" for name in CONFIGS))
+    for seed in range(args.seed, args.seed + args.instances):
+        bosses, skills = random_fight(seed)
+        row = []
+        results = set()
+        for name, config in CONFIGS.items():
+            turns, stats, seconds = run_config(bosses, skills, config)
+            results.add(turns)
+            totals[name]['expanded'] += stats['expanded']
+            totals[name]['seconds'] += seconds
+            row.append(f"{stats['expanded']:>13} {seconds:>9.3f}")
+        # The legacy bound is not admissible, so it may report a longer fight.
+        turns = min(results)
+        print(f"{seed:>6} {len(bosses):>6} {len(skills):>6} {turns:>6} " + ' '.join(row))
+
+    legacy, tight = totals['legacy'], totals['tight']
+    print()
+    print(f"Total expansions: legacy={legacy['expanded']} tight={tight['expanded']} "
+          f"({legacy['expanded'] / max(tight['expanded'], 1):.1f}x fewer)")
+    print(f"Total time: legacy={legacy['seconds']:.2f}s tight={tight['seconds']:.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+Builds and reads the benchmark corpus: seeded mazes (with their lockers and boss fight) and
+standalone boss fights, each stored with the reference outputs of the solvers.
+
+Records are built in a process pool, each from its own seed, so a corpus depends only on its
+parameters and not on the number of workers. A corpus is one file: zlib-compressed JSON records
+followed by an index of their offsets, so a reader maps the file and decodes only the records
+it asks for.
+
+Usage (from the backend directory):
+    python -m benchmarks.corpus build corpus.bin --sizes 15 31 63 --count 200 --fights 200
+    python -m benchmarks.corpus info corpus.bin
+"""
+import argparse
+import json
+import logging
+import math
+import mmap
+import os
+import random
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List
+
+from app.algorithms.boss_battle import solve_boss_battle
+from app.algorithms.maze_generator import generate_maze
+from app.algorithms.pathfinder_dp import solve_with_dp
+from app.algorithms.pathfinder_greedy import solve_with_greedy
+from app.algorithms.puzzle_solver import solve_puzzle
+from app.services.serializers import dumps
+
+MAGIC = b"MAZECORPUS1\n"
+# Trailer: offset and length of the compressed index.
+_TRAILER = struct.Struct("<QQ")
+
+DEFAULT_SIZES = (15, 21, 31, 45, 63)
+# (bosses, skills) of standalone fights, from small to the generator's maximum.
+FIGHT_SIZES = ((1, 1), (3, 3), (5, 5), (10, 5), (5, 10), (10, 10))
+
+def _reference(record: Dict[str, Any], name: str, fn, *args):
+    """Stores fn(*args) as the reference output `name`, or its error."""
+    try:
+        record["reference"][name] = fn(*args)
+    except Exception as e:
+        record["reference"][name] = None
+        record["errors"][name] = f"{type(e).__name__}: {e}"
+
+def _boss_turns(bosses, skills):
+    turns, _ = solve_boss_battle(bosses, skills)
+    return None if turns == math.inf else turns
+
+def _maze_record(size: int, seed: int) -> Dict[str, Any]:
+    random.seed(seed)
+    for payload in generate_maze(size, size):
+        pass
+    maze = ["".join(row) for row in payload["maze"]]
+    lockers = [{"id": locker["id"], "position": list(locker["position"]), "constraints": locker["constraints"],
+                "password_hash": locker["password_hash"]} for locker in payload["lockers"]]
+    record = {"kind": "maze", "size": size, "seed": seed, "maze": maze, "lockers": lockers,
+              "bosses": payload["bosses"], "skills": payload["player_skills"], "reference": {}, "errors": {}}
+    _reference(record, "dp", lambda: solve_with_dp(maze)[1])
+    _reference(record, "greedy", lambda: solve_with_greedy(maze)[1])
+    _reference(record, "puzzles", lambda: {str(locker["id"]): solve_puzzle(locker["password_hash"], locker["constraints"])[0]
+                                           for locker in lockers})
+    _reference(record, "boss_turns", _boss_turns, record["bosses"], record["skills"])
+    return record
+
+def _fight_record(fight: List[int], seed: int) -> Dict[str, Any]:
+    random.seed(seed)
+    bosses_count, skills_count = fight
+    bosses = [random.randint(1, 100) for _ in range(bosses_count)]
+    # Same shape as Maze._set_player_skills: the default skill plus random ones
+    skills = [[3, 0]] + [[random.randint(1, 50), random.randint(1, 5)] for _ in range(skills_count)]
+    record = {"kind": "fight", "fight": list(fight), "seed": seed, "bosses": bosses, "skills": skills,
+              "reference": {}, "errors": {}}
+    _reference(record, "boss_turns", _boss_turns, bosses, skills)
+    return record
+
+def _build_record(job):
+    """Builds one record in a pool worker; returns its index entry and compressed bytes."""
+    logging.disable(logging.INFO)  # The greedy navigator logs every step at INFO
+    kind, param, seed = job
+    record = _maze_record(param, seed) if kind == "maze" else _fight_record(param, seed)
+    entry = {"kind": kind, "seed": seed, ("size" if kind == "maze" else "fight"): param}
+    return entry, zlib.compress(dumps(record), 6)
+
+def corpus_jobs(sizes=DEFAULT_SIZES, count=100, fights=FIGHT_SIZES, fight_count=100, seed=0):
+    """Lists the (kind, parameter, seed) of every record; seeds are unique within a corpus."""
+    jobs = [("maze", size, None) for size in sizes for _ in range(count)]
+    jobs += [("fight", list(fight), None) for fight in fights for _ in range(fight_count)]
+    return [(kind, param, seed + i) for i, (kind, param, _) in enumerate(jobs)]
+
+def build_corpus(path: str, jobs, workers=None, progress=None) -> int:
+    """Builds the records of `jobs` on a process pool and writes them to `path`; returns their count."""
+    index = []
+    with open(path + ".tmp", "wb") as f, ProcessPoolExecutor(max_workers=workers) as pool:
+        f.write(MAGIC)
+        offset = len(MAGIC)
+        for entry, blob in pool.map(_build_record, jobs, chunksize=max(1, len(jobs) // (8 * (workers or os.cpu_count() or 1)))):
+            entry["offset"], entry["length"] = offset, len(blob)
+            index.append(entry)
+            f.write(blob)
+            offset += len(blob)
+            if progress is not None:
+                progress(len(index), len(jobs))
+        index_blob = zlib.compress(dumps(index), 6)
+        f.write(index_blob)
+        f.write(_TRAILER.pack(offset, len(index_blob)))
+    os.replace(path + ".tmp", path)
+    return len(index)
+
+class Corpus:
+    """
+    Reads a corpus file. `index` holds one entry per record (kind, seed, size or fight) and
+    records are decoded on access, e.g. corpus[3] or corpus.select(kind="maze", size=31).
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(MAGIC)] != MAGIC:
+            self._data.close()
+            raise ValueError(f"{path} is not a maze corpus.")
+        offset, length = _TRAILER.unpack(self._data[-_TRAILER.size:])
+        self.index: List[Dict[str, Any]] = json.loads(zlib.decompress(self._data[offset:offset + length]))
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        entry = self.index[i]
+        return json.loads(zlib.decompress(self._data[entry["offset"]:entry["offset"] + entry["length"]]))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[i] for i in range(len(self)))
+
+    def select(self, **params) -> Iterator[Dict[str, Any]]:
+        """Yields the records whose index entries match every param, e.g. kind="fight", fight=[10, 10]."""
+        for i, entry in enumerate(self.index):
+            if all(entry.get(key) == value for key, value in params.items()):
+                yield self[i]
+
+    def close(self):
+        self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _print_progress(done, total):
+    if done == total or done % 100 == 0:
+        print(f"{done}/{total} records", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Build a corpus file.")
+    build.add_argument("path", help="Corpus file to write.")
+    build.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Maze sizes.")
+    build.add_argument("--count", type=int, default=100, help="Mazes per size.")
+    build.add_argument("--fights", type=int, default=100, help="Standalone fights per (bosses, skills) size.")
+    build.add_argument("--seed", type=int, default=0, help="Seed of the first record.")
+    build.add_argument("--workers", type=int, help="Worker processes, os.cpu_count() by default.")
+    info = commands.add_parser("info", help="Summarize a corpus file.")
+    info.add_argument("path", help="Corpus file to read.")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        jobs = corpus_jobs(args.sizes, args.count, FIGHT_SIZES, args.fights, args.seed)
+        total = build_corpus(args.path, jobs, args.workers, _print_progress)
+        print(f"Wrote {total} records to {args.path} ({os.path.getsize(args.path) / 2**20:.1f} MiB)")
+        return
+
+    with Corpus(args.path) as corpus:
+        groups = {}
+        for entry in corpus.index:
+            key = (entry["kind"], str(entry.get("size", entry.get("fight"))))
+            groups[key] = groups.get(key, 0) + 1
+        print(f"{len(corpus)} records")
+        for (kind, param), count in sorted(groups.items()):
+            print(f"  {kind:<6} {param:<10} {count:>6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Simulates concurrent players against the API and reports how much load one worker sustains.
+
+Each player repeats the session the frontend drives: stream /maze/generate, then ask for the
+DP and greedy routes, solve the puzzle of every lever and fight the boss, pausing --think
+seconds (randomized) between steps. The report gives throughput, latency percentiles per
+endpoint, the time to the first frame of the generation stream and, when the app runs in this
+process, the lag of its event loop.
+
+By default the app is served by uvicorn in a thread of this process, so the lag of its event
+loop can be sampled. The load generator then shares the process (and the GIL) with the server;
+for capacity numbers, start uvicorn separately and pass --url. INFO logs, among them every
+step of the greedy navigator, are turned off in this process.
+
+Usage (from the backend directory):
+    python -m benchmarks.load --players 20 --duration 60
+    python -m benchmarks.load --players 50 --duration 60 --url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import socket
+import threading
+import time
+
+import httpx
+import uvicorn
+
+# Sizes players pick their mazes from.
+DEFAULT_SIZES = (15, 21, 31)
+# Seconds between event loop lag samples.
+LAG_INTERVAL = 0.01
+
+class LoadStats:
+    """Latencies by endpoint, generation time to first frame, errors and event loop lag."""
+    def __init__(self):
+        self.latencies = {}
+        self.first_frame = []
+        self.errors = {}
+        self.lag = []
+        self.sessions = 0
+
+    def record(self, endpoint, seconds):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+
+    def error(self, endpoint, reason):
+        key = f"{endpoint}: {reason}"
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+def percentiles(values, points=(50, 90, 99)):
+    """Returns the given percentiles of values (nearest rank), or Nones without values."""
+    if not values:
+        return [None] * len(points)
+    ordered = sorted(values)
+    return [ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))] for p in points]
+
+async def _generate(client, stats, size, mode):
+    """Streams a maze generation and returns its final payload."""
+    start = time.perf_counter()
+    buffer = b""
+    first = last = None
+    async with client.stream("POST", "/maze/generate", json={"size": size, "mode": mode, "fps": 10, "frames_per_write": 5}) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            if first is None:
+                first = time.perf_counter() - start
+            buffer += chunk
+            # Keep only the last complete event; it ends up being the final payload
+            *events, buffer = buffer.split(b"\n\n")
+            if events:
+                last = events[-1]
+    if last is None:
+        raise httpx.RemoteProtocolError("The generation stream sent no events.", request=response.request)
+    stats.record("/maze/generate", time.perf_counter() - start)
+    stats.first_frame.append(first)
+    return json.loads(last[len(b"data: "):])
+
+async def _post(client, stats, endpoint, payload):
+    start = time.perf_counter()
+    response = await client.post(endpoint, json=payload)
+    response.raise_for_status()
+    stats.record(endpoint, time.perf_counter() - start)
+    return response.json()
+
+async def play_session(client, stats, sizes, mode, think):
+    """One game: generate a maze, then run every solver on it the way the frontend does."""
+    async def pause():
+        if think > 0:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * think)
+
+    maze = await _generate(client, stats, random.choice(sizes), mode)
+    rows = ["".join(row) for row in maze["maze"]]
+    await pause()
+    await _post(client, stats, "/solve/dp", {"maze": rows, "main_path": maze["unique_path"], "path_encoding": "rle"})
+    await pause()
+    await _post(client, stats, "/solve/greedy", {"maze": rows, "path_encoding": "rle"})
+    for locker in maze["lockers"]:
+        await pause()
+        await _post(client, stats, "/solve/puzzle", {"password_hash": locker["password_hash"], "constraints": locker["constraints"]})
+    if maze["bosses"]:
+        await pause()
+        skills = [{"name": f"Skill {i + 1}", "damage": damage, "cooldown": cooldown}
+                  for i, (damage, cooldown) in enumerate(maze["player_skills"])]
+        await _post(client, stats, "/solve/boss", {"boss_hps": maze["bosses"], "skills": skills})
+    stats.sessions += 1
+
+async def _player(client, stats, deadline, sizes, mode, think):
+    while time.perf_counter() < deadline:
+        try:
+            await play_session(client, stats, sizes, mode, think)
+        except httpx.HTTPStatusError as e:
+            stats.error(e.request.url.path, e.response.status_code)
+        except httpx.HTTPError as e:
+            stats.error(e.request.url.path if e.request else "?", type(e).__name__)
+
+async def run_load(base_url, stats, players, duration, sizes, mode, think, timeout):
+    """Runs `players` concurrent players for `duration` seconds against base_url, recording into stats."""
+    limits = httpx.Limits(max_connections=players, max_keepalive_connections=players)
+    async with httpx.AsyncClient(base_url=base_url + "/api/v1", timeout=timeout, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(_player(client, stats, deadline, sizes, mode, think) for _ in range(players)))
+
+async def _sample_lag(samples, stopped):
+    """Records how late the event loop wakes up from a LAG_INTERVAL sleep."""
+    loop = asyncio.get_running_loop()
+    while not stopped.is_set():
+        start = loop.time()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(loop.time() - start - LAG_INTERVAL)
+
+class LocalServer:
+    """Serves app.main:app with uvicorn in a thread, sampling the lag of its event loop."""
+    def __init__(self, stats):
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.stats = stats
+        self._stopped = threading.Event()
+        config = uvicorn.Config("app.main:app", host="127.0.0.1", port=self.port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def _serve(self):
+        lag = asyncio.create_task(_sample_lag(self.stats.lag, self._stopped))
+        await self.server.serve()
+        self._stopped.set()
+        await lag
+
+    def __enter__(self):
+        self._thread.start()
+        while not self.server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("The local server failed to start.")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self._thread.join()
+
+def report(stats, duration, players):
+    requests = sum(len(values) for values in stats.latencies.values())
+    print(f"{players} players for {duration:.0f}s: {stats.sessions} sessions ({stats.sessions / duration:.2f}/s), "
+          f"{requests} requests ({requests / duration:.1f}/s)")
+    print(f"{'endpoint':<18} {'count':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+
+    def row(name, values):
+        cells = [f"{v * 1000:>9.1f}" if v is not None else f"{'-':>9}" for v in percentiles(values) + [max(values, default=None)]]
+        print(f"{name:<18} {len(values):>7} " + " ".join(cells))
+
+    for endpoint, values in sorted(stats.latencies.items()):
+        row(endpoint, values)
+    row("first frame", stats.first_frame)
+    if stats.lag:
+        row("event loop lag", stats.lag)
+    else:
+        print("event loop lag: not sampled (remote server)")
+    if stats.errors:
+        print("errors:")
+        for key, count in sorted(stats.errors.items()):
+            print(f"  {key}: {count}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--players', type=int, default=10, help='Concurrent players.')
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds to keep starting sessions.')
+    parser.add_argument('--think', type=float, default=1.0, help='Mean seconds a player pauses between requests.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='Maze sizes players pick from.')
+    parser.add_argument('--mode', choices=('animate', 'fast', 'final'), default='animate', help='Maze generation mode.')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Seconds before a request counts as failed.')
+    parser.add_argument('--url', help='Base URL of a running server; by default the app is served in this process.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the players\' choices.')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    logging.disable(logging.INFO)
+    stats = LoadStats()
+    load = (args.players, args.duration, args.sizes, args.mode, args.think, args.timeout)
+    start = time.perf_counter()
+    if args.url:
+        asyncio.run(run_load(args.url.rstrip("/"), stats, *load))
+    else:
+        with LocalServer(stats) as server:
+            asyncio.run(run_load(server.url, stats, *load))
+    report(stats, time.perf_counter() - start, args.players)
+
+if __name__ == '__main__':
+    main()
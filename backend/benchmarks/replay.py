@@ -0,0 +1,134 @@
+"""
+Reads the replay logs written with REPLAY_LOG_DIR set and re-runs what they recorded.
+
+- show: prints the events, optionally of some kinds or one game session only.
+- solves: re-runs every logged solver call with its inputs. It reports results that differ
+  from the logged ones and calls that now take much longer. With --verify, results are
+  also checked against the reference solvers.
+- games: replays every logged game session move by move on its logged maze. It reports
+  the moves whose delta differs from the logged one.
+
+Logs are read record by record, so only the events asked for are decoded.
+
+Usage (from the backend directory):
+    python -m benchmarks.replay show /var/log/maze-replay --kind solve
+    python -m benchmarks.replay solves /var/log/maze-replay --verify
+    python -m benchmarks.replay games /var/log/maze-replay --session 3f2a...
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+from app.algorithms.maze_index import MazeIndex
+from app.algorithms.pathfinder_dp import solve_with_dp
+from app.algorithms.pathfinder_greedy import solve_with_greedy
+from app.services.api_helpers import prepare_and_solve_boss_battle, prepare_and_solve_puzzle
+from app.services.game_sessions import GameSession
+from app.services.replay_log import KINDS, read_log
+from app.services.serializers import dumps
+from app.services.verification import verify
+
+# How each logged solver is called with the request inputs, as the endpoints call it.
+SOLVERS = {
+    "dp": lambda inputs: solve_with_dp(inputs["maze"], inputs.get("main_path")),
+    "greedy": lambda inputs: solve_with_greedy(inputs["maze"]),
+    "puzzle": lambda inputs: prepare_and_solve_puzzle(inputs["password_hash"], inputs["constraints"]),
+    "boss": lambda inputs: prepare_and_solve_boss_battle(inputs["boss_hps"], inputs["skills"],
+                                                         inputs.get("engine", "branch_and_bound"), inputs.get("any_order", False)),
+}
+
+def _as_logged(value):
+    """The value as it reads back from the log (tuples become lists)."""
+    return json.loads(dumps(value))
+
+def _shaped(solver, result):
+    """A solver's return value shaped like the endpoint responses verification checks."""
+    if solver in ("dp", "greedy"):
+        return {"path": result[0], "value": result[1]}
+    if solver == "puzzle":
+        return {"solution": result[0], "tries": result[1]}
+    return result
+
+def rerun_solve(data, check=False, slowdown=2.0):
+    """Re-runs one logged solve and returns the ways it now differs."""
+    solver, inputs = data["solver"], data["inputs"]
+    start = time.perf_counter()
+    try:
+        result = _as_logged(SOLVERS[solver](inputs))
+        error = None
+    except Exception as e:
+        result, error = None, repr(e)
+    seconds = time.perf_counter() - start
+
+    problems = []
+    if error != data.get("error"):
+        problems.append(f"Raised {error}, the logged call raised {data.get('error')}.")
+    elif error is None and result != data["result"]:
+        problems.append("The result differs from the logged one.")
+    if seconds > slowdown * data["seconds"] and seconds - data["seconds"] > 0.01:
+        problems.append(f"Took {seconds:.3f}s, the logged call {data['seconds']:.3f}s.")
+    if check and error is None:
+        problems.extend(verify(solver, inputs, _shaped(solver, result)))
+    return problems
+
+def replay_games(records, session=None):
+    """
+    Replays the moves of the logged sessions on their logged mazes. Yields (session_id, step,
+    problem) for every move whose delta differs from the logged one.
+    """
+    mazes, games = {}, {}
+    for record in records:
+        data = record.data
+        if record.kind == "maze":
+            mazes[data["maze_id"]] = data
+        elif record.kind == "session" and session in (None, data["session_id"]):
+            maze = mazes.get(data["maze_id"])
+            if maze is None:
+                yield data["session_id"], 0, f"Maze {data['maze_id']} is not in the log."
+                continue
+            games[data["session_id"]] = GameSession({**maze, "index": MazeIndex(maze["maze"])})
+        elif record.kind == "move" and data["session_id"] in games:
+            delta = _as_logged(games[data["session_id"]].move(data["move"]))
+            if delta != data["delta"]:
+                yield data["session_id"], data["delta"].get("step"), f"Replayed {delta}, logged {data['delta']}."
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=('show', 'solves', 'games'))
+    parser.add_argument('logs', nargs='+', help='Log files or directories of them.')
+    parser.add_argument('--kind', choices=sorted(KINDS), action='append', help='Events to show (all by default).')
+    parser.add_argument('--session', help='Only this game session.')
+    parser.add_argument('--verify', action='store_true', help='Also check re-run solves against the reference solvers.')
+    parser.add_argument('--slowdown', type=float, default=2.0, help='Report re-runs this many times slower than logged.')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # The greedy navigator logs every step at INFO
+
+    if args.command == 'show':
+        for record in read_log(args.logs, args.kind):
+            if args.session and record.data.get("session_id") != args.session:
+                continue
+            print(f"{record.path}@{record.offset} {record.time:.6f} {record.kind} {dumps(record.data).decode()}")
+        return
+
+    failed = total = 0
+    if args.command == 'solves':
+        for record in read_log(args.logs, ["solve"]):
+            total += 1
+            problems = rerun_solve(record.data, args.verify, args.slowdown)
+            if problems:
+                failed += 1
+                print(f"{record.path}@{record.offset} {record.data['solver']}:")
+                for problem in problems:
+                    print(f"  {problem}")
+        print(f"Re-ran {total} solve(s): {failed} differ.")
+    else:
+        for session_id, step, problem in replay_games(read_log(args.logs, ["maze", "session", "move"]), args.session):
+            failed += 1
+            print(f"session {session_id} step {step}: {problem}")
+        print(f"{failed} move(s) differ.")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
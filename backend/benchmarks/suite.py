@@ -0,0 +1,273 @@
+"""
+Times every algorithm on seeded inputs and compares the results with a stored baseline.
+
+Maze benchmarks (generate_maze, unique_path_checker, solve_with_dp, solve_with_greedy) sweep
+the maze size; puzzle and boss battle benchmarks sweep from generated to worst-case inputs.
+With --corpus, the pathfinders run on the first maze of each size in a corpus built by
+benchmarks.corpus instead of a freshly generated one.
+Each case runs in its own process under --timeout: it is timed --repeat times, run once more
+under tracemalloc for its peak memory, and reports the algorithm counters of app.services.metrics
+for one run: each call fills a `stats` dict like the API's solver calls do, and the suite records
+it with metrics.record_work. Once a benchmark times out or fails at a size, its larger sizes are skipped.
+
+The results are written as JSON. Against a baseline, a case regresses when its best time or any
+of its counters grows by more than --threshold, or when it no longer finishes. Counters do not
+depend on the machine, so they stay comparable where times are not.
+
+Usage (from the backend directory):
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --sizes 15 31 63 --save-baseline baseline.json
+    python -m benchmarks.suite --sizes 15 31 63 --baseline baseline.json --threshold 1.25
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from app.algorithms.boss_battle import solve_boss_battle
+from app.algorithms.maze_generator import Locker, Maze, PasswordLock, generate_maze
+from app.algorithms.pathfinder_dp import solve_with_dp
+from app.algorithms.pathfinder_greedy import solve_with_greedy
+from app.algorithms.puzzle_solver import solve_puzzle
+from app.services import metrics
+from benchmarks.corpus import Corpus
+
+MAZE_SIZES = (15, 31, 63, 127, 255, 501, 1001, 2001)
+# (bosses, skills) of the boss battle sweep; BossGroup and Maze._set_player_skills go up to 10 each.
+FIGHT_SIZES = ((1, 1), (3, 3), (5, 5), (10, 5), (5, 10), (10, 10))
+PUZZLE_LOCKERS = 10
+# Work counters reported for each case.
+COUNTERS = (metrics.BFS_NODES, metrics.ASTAR_EXPANSIONS, metrics.PUZZLE_TRIES,
+            metrics.BOSS_BATTLE_STATES, metrics.GENERATION_RETRIES)
+# Corpus file the pathfinder inputs are read from; set by --corpus.
+CORPUS = None
+
+def _final_maze(size, stats=None):
+    """The final payload of a seeded generate_maze run."""
+    for payload in generate_maze(size, size, stats=stats):
+        pass
+    return payload
+
+def _maze_input(size):
+    """The maze the pathfinders run on at this size: from CORPUS if set, generated otherwise."""
+    if CORPUS is None:
+        return _final_maze(size)['maze']
+    with Corpus(CORPUS) as corpus:
+        for record in corpus.select(kind='maze', size=size):
+            return record['maze']
+    raise ValueError(f"{CORPUS} has no maze of size {size}.")
+
+def _setup_generate_maze(size):
+    return lambda stats: _final_maze(size, stats)
+
+def _setup_unique_path_checker(size):
+    maze = Maze(size, size)
+    for _ in maze.generate_maze():
+        pass
+    return lambda stats: maze.unique_path_checker()
+
+def _setup_solve_with_dp(size):
+    maze = _maze_input(size)
+    return lambda stats: solve_with_dp(maze, stats=stats)
+
+def _setup_solve_with_greedy(size):
+    maze = _maze_input(size)
+    return lambda stats: solve_with_greedy(maze, stats=stats)
+
+def _setup_solve_puzzle(kind):
+    if kind == 'unconstrained':
+        # No clues and the last password: every candidate is tried
+        puzzles = [(PasswordLock().hash_password('999'), [])]
+    else:
+        lockers = [Locker(locker_id) for locker_id in range(1, PUZZLE_LOCKERS + 1)]
+        puzzles = [(locker.password_hash, locker.clue.get_clues()) for locker in lockers]
+    def call(stats):
+        for password_hash, constraints in puzzles:
+            _, tries = solve_puzzle(password_hash, constraints)
+            stats['puzzle_tries'] = stats.get('puzzle_tries', 0) + tries
+    return call
+
+def _setup_solve_boss_battle(fight):
+    bosses_count, skills_count = fight
+    bosses = [random.randint(1, 100) for _ in range(bosses_count)]
+    # Same shape as Maze._set_player_skills: the default skill plus random ones
+    skills = [[3, 0]] + [[random.randint(1, 50), random.randint(1, 5)] for _ in range(skills_count)]
+    return lambda stats: solve_boss_battle(bosses, skills, stats=stats)
+
+# Benchmark name -> (parameter name, values, setup). setup(value) builds the seeded input and
+# returns the call to time, which takes a `stats` dict for its work counts.
+BENCHMARKS = {
+    'generate_maze': ('size', MAZE_SIZES, _setup_generate_maze),
+    'unique_path_checker': ('size', MAZE_SIZES, _setup_unique_path_checker),
+    'solve_with_dp': ('size', MAZE_SIZES, _setup_solve_with_dp),
+    'solve_with_greedy': ('size', MAZE_SIZES, _setup_solve_with_greedy),
+    'solve_puzzle': ('lockers', ('generated', 'unconstrained'), _setup_solve_puzzle),
+    'solve_boss_battle': ('fight', FIGHT_SIZES, _setup_solve_boss_battle),
+}
+
+def case_name(benchmark, value):
+    if isinstance(value, tuple):
+        value = 'x'.join(map(str, value))
+    return f"{benchmark}[{value}]"
+
+def _counters():
+    """Flattens COUNTERS to {"name" or "name{label=value}": total}."""
+    counters = {}
+    for counter in COUNTERS:
+        for key, value in counter.snapshot():
+            labels = ','.join(f"{label}={v}" for label, v in zip(counter.labelnames, key))
+            counters[f"{counter.name}{{{labels}}}" if labels else counter.name] = value
+    return counters
+
+def _run_case(benchmark, value, seed, repeat, conn):
+    """Runs one case in a child process and sends its result back over conn."""
+    logging.disable(logging.INFO)  # The greedy navigator logs every step at INFO
+    try:
+        _, _, setup = BENCHMARKS[benchmark]
+        random.seed(seed)
+        call = setup(value)
+
+        seconds = []
+        for i in range(repeat):
+            metrics.REGISTRY.reset()
+            # Every run sees the same random state, so they do the same work
+            random.seed(seed)
+            stats = {}
+            start = time.perf_counter()
+            call(stats)
+            seconds.append(time.perf_counter() - start)
+            if i == 0:
+                metrics.record_work(stats)
+                counters = _counters()
+
+        random.seed(seed)
+        tracemalloc.start()
+        call({})
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        conn.send({'status': 'ok', 'seconds': seconds, 'min': min(seconds),
+                   'median': statistics.median(seconds), 'peak_bytes': peak_bytes, 'counters': counters})
+    except BaseException as e:
+        conn.send({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+def run_case(benchmark, value, seed, repeat, timeout):
+    """Runs one case in a fresh process, so a timeout can stop it and peaks do not add up."""
+    context = multiprocessing.get_context('fork' if sys.platform != 'win32' else 'spawn')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_run_case, args=(benchmark, value, seed, repeat, child_conn))
+    process.start()
+    child_conn.close()
+    if not parent_conn.poll(timeout):
+        result = {'status': 'timeout', 'error': f"Did not finish within {timeout}s."}
+    else:
+        try:
+            result = parent_conn.recv()
+        except EOFError:  # The process died without a result, e.g. on a stack overflow
+            process.join()
+            result = {'status': 'error', 'error': f"Exited with code {process.exitcode}."}
+    process.kill()
+    process.join()
+    return result
+
+def run_suite(benchmarks, seed=0, repeat=3, timeout=60.0, sizes=None):
+    """Runs the chosen benchmarks and returns the results keyed by case name."""
+    results = {}
+    for benchmark in benchmarks:
+        param, values, _ = BENCHMARKS[benchmark]
+        if param == 'size' and sizes:
+            values = sizes
+        stopped = None
+        for value in values:
+            name = case_name(benchmark, value)
+            if stopped:
+                result = {'status': 'skipped', 'error': f"Stopped after {stopped}."}
+            else:
+                result = run_case(benchmark, value, seed, repeat, timeout)
+                if result['status'] != 'ok':
+                    stopped = name
+            results[name] = {'benchmark': benchmark, param: value, **result}
+            _print_result(name, results[name])
+    return results
+
+def compare(results, baseline, threshold):
+    """Returns the regressions of results against baseline results as human-readable lines."""
+    regressions = []
+    for name, old in baseline.items():
+        new = results.get(name)
+        if new is None or old['status'] != 'ok':
+            continue
+        if new['status'] != 'ok':
+            regressions.append(f"{name}: {new['status']} ({new['error']}), was {old['min']:.4f}s")
+            continue
+        if new['min'] > old['min'] * threshold:
+            regressions.append(f"{name}: {new['min']:.4f}s, was {old['min']:.4f}s ({new['min'] / old['min']:.2f}x)")
+        for counter, count in new['counters'].items():
+            old_count = old['counters'].get(counter, 0)
+            if count > old_count * threshold:
+                regressions.append(f"{name}: {counter} {count}, was {old_count}")
+    return regressions
+
+def _print_result(name, result):
+    if result['status'] == 'ok':
+        counters = ' '.join(f"{counter}={count}" for counter, count in result['counters'].items() if count)
+        print(f"{name:<32} {result['min']:>10.4f}s {result['median']:>10.4f}s "
+              f"{result['peak_bytes'] / 2**20:>9.1f}MiB  {counters}", flush=True)
+    else:
+        print(f"{name:<32} {result['status']:>11}  {result['error']}", flush=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--benchmarks', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS),
+                        help='Benchmarks to run.')
+    parser.add_argument('--sizes', type=int, nargs='+', help=f'Maze sizes, default {" ".join(map(str, MAZE_SIZES))}.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of every input.')
+    parser.add_argument('--corpus', help='Corpus file to read the pathfinder mazes from.')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case.')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Seconds a case may take in total.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', help='Compare with the results in this JSON file.')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Ratio to the baseline time or counters that counts as a regression.')
+    parser.add_argument('--save-baseline', help='Write the results to this JSON file as the new baseline.')
+    args = parser.parse_args()
+    global CORPUS
+    CORPUS = args.corpus
+
+    print(f"{'case':<32} {'best':>11} {'median':>11} {'peak':>12}  counters")
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'results': run_suite(args.benchmarks, args.seed, args.repeat, args.timeout, args.sizes),
+    }
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('seed') != args.seed:
+            print(f"Warning: the baseline used seed {baseline.get('seed')}, counters will differ.")
+        regressions = compare(report['results'], baseline['results'], args.threshold)
+        print()
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold}x the baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions over {args.threshold}x the baseline.")
+
+if __name__ == '__main__':
+    main()
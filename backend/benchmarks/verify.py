@@ -0,0 +1,88 @@
+"""
+Verifies the serving engines against the reference solvers on every record of a corpus built
+by benchmarks.corpus, the offline counterpart of VERIFY_SAMPLE_RATE.
+
+Each maze is solved the way the API solves it: DP and greedy on a shared graph with the main
+path found once, puzzles through the puzzle helper and the boss fight with --boss-engine.
+app.services.verification then checks every result against the reference solver, and the scores
+are also compared with the reference outputs stored in the corpus, which catches changes to
+the reference solvers themselves.
+
+Usage (from the backend directory):
+    python -m benchmarks.verify corpus.bin --boss-engine dp
+"""
+import argparse
+import logging
+import sys
+
+from app.algorithms.pathfinder_dp import build_graph, find_main_path, solve_with_dp
+from app.algorithms.pathfinder_greedy import solve_with_greedy
+from app.services.api_helpers import BOSS_BATTLE_ENGINES, prepare_and_solve_boss_battle, prepare_and_solve_puzzle
+from app.services.verification import verify
+from benchmarks.corpus import Corpus
+
+def _skills(record):
+    return [{"name": f"Skill {i + 1}", "damage": damage, "cooldown": cooldown}
+            for i, (damage, cooldown) in enumerate(record["skills"])]
+
+def verify_record(record, boss_engine="branch_and_bound", any_order=False):
+    """Yields (solver, problems) for every solver result of one corpus record."""
+    reference = record["reference"]
+    if record["kind"] == "maze":
+        maze = record["maze"]
+        graph = build_graph(maze)
+        main_path = find_main_path(maze, graph)
+        for solver, solve in (("dp", lambda: solve_with_dp(maze, main_path, graph)),
+                              ("greedy", lambda: solve_with_greedy(maze, graph))):
+            path, value = solve()
+            problems = verify(solver, {"maze": maze}, {"path": path, "value": value})
+            if reference.get(solver) is not None and value != reference[solver]:
+                problems.append(f"Scores {value}, the corpus reference is {reference[solver]}.")
+            yield solver, problems
+        for locker in record["lockers"]:
+            inputs = {"password_hash": locker["password_hash"], "constraints": locker["constraints"]}
+            solution, tries = prepare_and_solve_puzzle(inputs["password_hash"], inputs["constraints"])
+            problems = verify("puzzle", inputs, {"solution": solution, "tries": tries})
+            expected = (reference.get("puzzles") or {}).get(str(locker["id"]))
+            if expected is not None and solution != expected:
+                problems.append(f"Found {solution}, the corpus reference is {expected}.")
+            yield "puzzle", problems
+
+    if not record["bosses"]:
+        return
+    inputs = {"boss_hps": record["bosses"], "skills": _skills(record), "any_order": any_order}
+    result = prepare_and_solve_boss_battle(inputs["boss_hps"], inputs["skills"], boss_engine, any_order)
+    problems = verify("boss", inputs, result)
+    expected = reference.get("boss_turns")
+    if not any_order and result is not None and expected is not None and result["turns"] != expected:
+        problems.append(f"Takes {result['turns']} turns, the corpus reference is {expected}.")
+    yield "boss", problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', help='Corpus file to verify.')
+    parser.add_argument('--boss-engine', choices=sorted(BOSS_BATTLE_ENGINES), default='branch_and_bound',
+                        help='Boss battle engine to verify.')
+    parser.add_argument('--any-order', action='store_true', help='Let the boss engine pick the boss order.')
+    parser.add_argument('--limit', type=int, help='Verify only the first records.')
+    args = parser.parse_args()
+    logging.disable(logging.INFO)  # The greedy navigator logs every step at INFO
+
+    checked, failed = {}, 0
+    with Corpus(args.corpus) as corpus:
+        for i in range(min(len(corpus), args.limit or len(corpus))):
+            record = corpus[i]
+            for solver, problems in verify_record(record, args.boss_engine, args.any_order):
+                checked[solver] = checked.get(solver, 0) + 1
+                if problems:
+                    failed += 1
+                    print(f"record {i} ({record['kind']}, seed {record['seed']}) {solver}:")
+                    for problem in problems:
+                        print(f"  {problem}")
+
+    print(f"Verified {sum(checked.values())} results ({', '.join(f'{n} {s}' for s, n in sorted(checked.items()))}): "
+          f"{failed} mismatch(es).")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
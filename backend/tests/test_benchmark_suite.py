@@ -0,0 +1,18 @@
+import pytest
+from benchmarks.suite import compare, run_case
+
+@pytest.mark.parametrize("benchmark, value, counter", [
+    ("solve_with_dp", 15, "maze_bfs_nodes_total"),
+    ("solve_with_greedy", 15, "maze_astar_expansions_total"),
+    ("solve_puzzle", "generated", "maze_puzzle_tries_total"),
+    ("solve_boss_battle", (3, 3), "maze_boss_battle_states_total{event=expanded}"),
+])
+def test_cases_report_their_work_counters(benchmark, value, counter):
+    """Each case records the work its call left in `stats`, so counter regressions show up."""
+    result = run_case(benchmark, value, seed=0, repeat=1, timeout=60)
+
+    assert result["status"] == "ok"
+    assert result["counters"][counter] > 0
+
+    baseline = {"case": {**result, "counters": {counter: result["counters"][counter] // 2}}}
+    assert any(counter in line for line in compare({"case": result}, baseline, threshold=1.25))
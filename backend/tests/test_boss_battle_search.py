@@ -0,0 +1,285 @@
+import heapq
+import itertools
+import random
+import pytest
+from app.algorithms.boss_battle import (
+    CooldownPacker, greedy_schedule, solve_boss_battle, solve_boss_battle_anytime
+)
+from app.algorithms.boss_battle_order import solve_boss_battle_any_order
+from app.algorithms.boss_battle_dp import (
+    canonicalize_skills, solve_boss_battle_dp, clear_cache, _solve_canonical
+)
+
+def simulate(bosses, skills, path):
+    """Replays a (time, skill_idx) schedule and returns the completion time, or None if invalid."""
+    cooldowns = [0] * len(skills)
+    time, boss_index, boss_hp = 0, 0, bosses[0]
+    for use_time, skill_idx in path:
+        if use_time < time:
+            return None
+        cooldowns = [max(0, cd - (use_time - time)) for cd in cooldowns]
+        time = use_time
+        if cooldowns[skill_idx] != 0:
+            return None
+        boss_hp -= skills[skill_idx][0]
+        cooldowns = [max(0, cd - 1) for cd in cooldowns]
+        cooldowns[skill_idx] = skills[skill_idx][1]
+        time += 1
+        if boss_hp <= 0:
+            boss_index += 1
+            if boss_index == len(bosses):
+                return time
+            boss_hp = bosses[boss_index]
+    return None
+
+def shortest_fight(bosses, skills):
+    """Reference optimum: Dijkstra over every reachable (boss, hp, cooldowns) state."""
+    start = (0, bosses[0], tuple([0] * len(skills)))
+    queue = [(0, start)]
+    best = {start: 0}
+    while queue:
+        time, (boss_index, boss_hp, cooldowns) = heapq.heappop(queue)
+        if boss_index == len(bosses):
+            return time
+        if best.get((boss_index, boss_hp, cooldowns), time) < time:
+            continue
+        ready = [i for i, cd in enumerate(cooldowns) if cd == 0]
+        moves = []
+        if not ready:
+            wait = min(cd for cd in cooldowns if cd > 0)
+            moves.append((wait, (boss_index, boss_hp, tuple(max(0, cd - wait) for cd in cooldowns))))
+        for i in ready:
+            new_cooldowns = [max(0, cd - 1) for cd in cooldowns]
+            new_cooldowns[i] = skills[i][1]
+            new_boss_index, new_hp = boss_index, boss_hp - skills[i][0]
+            if new_hp <= 0:
+                new_boss_index += 1
+                new_hp = bosses[new_boss_index] if new_boss_index < len(bosses) else 0
+            moves.append((1, (new_boss_index, new_hp, tuple(new_cooldowns))))
+        for cost, state in moves:
+            if time + cost < best.get(state, float('inf')):
+                best[state] = time + cost
+                heapq.heappush(queue, (time + cost, state))
+    return None
+
+def test_cooldown_packer_tick_matches_list_semantics():
+    """Packed ticks must decrement every cooldown (saturating at 0) and report ready skills."""
+    rng = random.Random(0)
+    for _ in range(500):
+        skills = [[1, rng.randint(0, 7)] for _ in range(rng.randint(1, 11))]
+        packer = CooldownPacker(skills)
+        cooldowns = [rng.randint(0, cd) for _, cd in skills]
+
+        ticked, ready = packer.tick(packer.pack(cooldowns))
+
+        assert packer.unpack(ticked) == [max(0, cd - 1) for cd in cooldowns]
+        assert packer.ready_indices(ready) == [i for i, cd in enumerate(cooldowns) if cd == 0]
+        assert packer.unpack(packer.advance(packer.pack(cooldowns), 3)) == [max(0, cd - 3) for cd in cooldowns]
+
+def test_solve_boss_battle_returns_replayable_schedule():
+    """The reconstructed path must be a legal schedule that finishes at the reported time."""
+    rng = random.Random(3)
+    for _ in range(40):
+        bosses = [rng.randint(1, 60) for _ in range(rng.randint(1, 4))]
+        skills = [[3, 0]] + [[rng.randint(1, 50), rng.randint(1, 5)] for _ in range(rng.randint(1, 6))]
+
+        min_time, path = solve_boss_battle(bosses, skills)
+
+        assert simulate(bosses, skills, path) == min_time
+
+def test_solve_boss_battle_waits_for_cooldowns():
+    """With no zero-cooldown skill the solver has to wait, and the wait shows up in the use times."""
+    min_time, path = solve_boss_battle([30], [[10, 2]])
+    assert min_time == 7
+    assert path == [(0, 0), (3, 0), (6, 0)]
+
+def test_solve_boss_battle_is_optimal():
+    """The capacity bound is admissible, so the result must match an exhaustive search."""
+    rng = random.Random(11)
+    for _ in range(60):
+        bosses = [rng.randint(1, 60) for _ in range(rng.randint(1, 4))]
+        skills = [[rng.randint(1, 50), rng.randint(0, 5)] for _ in range(rng.randint(1, 6))]
+
+        min_time, path = solve_boss_battle(bosses, skills)
+
+        assert min_time == shortest_fight(bosses, skills)
+        assert simulate(bosses, skills, path) == min_time
+
+def test_solve_boss_battle_is_optimal_when_it_must_wait():
+    """Without a zero-cooldown skill, fewer cooldowns alone must not count as dominance."""
+    assert solve_boss_battle([14, 22, 18, 26], [[2, 2], [11, 1]])[0] == 16
+    rng = random.Random(23)
+    for _ in range(200):
+        bosses = [rng.randint(1, 30) for _ in range(rng.randint(1, 4))]
+        skills = [[rng.randint(1, 15), rng.randint(1, 4)] for _ in range(rng.randint(1, 4))]
+
+        assert solve_boss_battle(bosses, skills)[0] == shortest_fight(bosses, skills)
+
+def test_dominance_pruning_keeps_the_optimum():
+    """Pruning dominated states must never lose a schedule an exhaustive search finds."""
+    assert solve_boss_battle([17, 1, 22, 21], [[5, 4], [8, 3], [8, 2]], dominance=True)[0] == 13
+    rng = random.Random(31)
+    for _ in range(300):
+        bosses = [rng.randint(1, 25) for _ in range(rng.randint(1, 4))]
+        skills = [[rng.randint(1, 9), rng.randint(0, 4)] for _ in range(rng.randint(1, 4))]
+
+        min_time, path = solve_boss_battle(bosses, skills, dominance=True)
+
+        assert min_time == shortest_fight(bosses, skills)
+        assert simulate(bosses, skills, path) == min_time
+
+def test_solve_boss_battle_enforces_turn_limit():
+    """Fights that cannot finish within turn_limit are reported as unsolvable."""
+    min_time, path = solve_boss_battle([100], [[1, 0]], turn_limit=20)
+    assert min_time == float('inf')
+    assert path == []
+
+    min_time, path = solve_boss_battle([100], [[1, 0]], turn_limit=100)
+    assert min_time == 100
+
+def test_dominance_pruning_reduces_expansions():
+    """Dominance pruning and the capacity bound expand fewer nodes than the legacy search."""
+    bosses = [40, 55, 30, 70]
+    skills = [[3, 0], [20, 2], [35, 4], [12, 1], [8, 1]]
+    legacy, tight = {}, {}
+
+    legacy_time, _ = solve_boss_battle(bosses, skills, bound='dps', dominance=False, stats=legacy)
+    tight_time, _ = solve_boss_battle(bosses, skills, stats=tight)
+
+    assert tight_time <= legacy_time
+    assert tight['expanded'] < legacy['expanded']
+
+def test_greedy_schedule_is_a_valid_incumbent():
+    """The greedy schedule is legal and never beats the optimum."""
+    rng = random.Random(5)
+    for _ in range(30):
+        bosses = [rng.randint(1, 80) for _ in range(rng.randint(1, 5))]
+        skills = [[rng.randint(1, 50), rng.randint(0, 5)] for _ in range(rng.randint(1, 6))]
+
+        greedy_time, greedy_path = greedy_schedule(bosses, skills)
+
+        assert simulate(bosses, skills, greedy_path) == greedy_time
+        assert greedy_time >= solve_boss_battle(bosses, skills)[0]
+
+def test_anytime_reports_improvements_and_proves_optimum():
+    """The first update is the greedy schedule; the last one is the proven optimum."""
+    bosses = [40, 55, 30, 70]
+    skills = [[3, 0], [20, 2], [35, 4], [12, 1], [8, 1]]
+
+    updates = list(solve_boss_battle_anytime(bosses, skills, time_budget=10))
+
+    assert updates[0]['turns'] == greedy_schedule(bosses, skills)[0]
+    turns = [u['turns'] for u in updates]
+    assert turns == sorted(turns, reverse=True)
+    assert all(u['lower_bound'] <= u['turns'] for u in updates)
+
+    final = updates[-1]
+    assert final['done'] and final['optimal'] and final['gap'] == 0
+    assert final['turns'] == solve_boss_battle(bosses, skills)[0]
+    assert simulate(bosses, skills, final['path']) == final['turns']
+
+def test_anytime_stops_at_time_budget():
+    """With no time to search, the greedy schedule is returned without an optimality proof."""
+    rng = random.Random(2)
+    bosses = [rng.randint(1, 100) for _ in range(10)]
+    skills = [[3, 0]] + [[rng.randint(1, 50), rng.randint(1, 5)] for _ in range(10)]
+
+    final = list(solve_boss_battle_anytime(bosses, skills, time_budget=1e-9))[-1]
+
+    assert final['done'] and not final['optimal']
+    assert final['gap'] == final['turns'] - final['lower_bound'] > 0
+    assert simulate(bosses, skills, final['path']) == final['turns']
+
+def test_canonicalize_skills_groups_copies_and_drops_dominated():
+    """Identical skills form one group; skills a zero-cooldown skill outclasses are dropped."""
+    skills = [[3, 0], [20, 2], [2, 1], [20, 2], [0, 0], [3, 4], [35, 4], [1, 0]]
+
+    canonical, members = canonicalize_skills(skills)
+
+    assert canonical == ((35, 4, 1), (20, 2, 2), (3, 0, 1))
+    assert members == [[6], [1, 3], [0]]
+
+def test_dp_engine_is_optimal_with_duplicate_skills():
+    """The DP engine matches an exhaustive search, also when skills repeat."""
+    clear_cache()
+    rng = random.Random(17)
+    for _ in range(60):
+        bosses = [rng.randint(1, 60) for _ in range(rng.randint(1, 4))]
+        skills = [[rng.randint(1, 30), rng.randint(0, 4)] for _ in range(rng.randint(1, 4))]
+        skills += [list(rng.choice(skills)) for _ in range(rng.randint(0, 2))]
+
+        min_time, path = solve_boss_battle_dp(bosses, skills)
+
+        assert min_time == shortest_fight(bosses, skills)
+        assert simulate(bosses, skills, path) == min_time
+
+@pytest.mark.parametrize("bosses, skills, turns", [
+    ([21, 23, 24, 8], [[8, 3], [0, 4], [3, 3], [2, 1]], 22),
+    ([16, 13], [[4, 2], [2, 4], [4, 1], [0, 4]], 9),
+])
+def test_dp_engine_uses_zero_damage_skills_to_wait(bosses, skills, turns):
+    """A skill without damage is the only way to wait for a longer cooldown, so it must stay."""
+    clear_cache()
+    min_time, path = solve_boss_battle_dp(bosses, skills)
+
+    assert min_time == turns == solve_boss_battle(bosses, skills)[0]
+    assert simulate(bosses, skills, path) == min_time
+
+def test_dp_engine_is_optimal_with_zero_damage_skills():
+    """Runs of turns without damage may repeat cooldowns; the DP must still find the optimum."""
+    clear_cache()
+    rng = random.Random(29)
+    for _ in range(150):
+        bosses = [rng.randint(1, 25) for _ in range(rng.randint(1, 4))]
+        skills = [[rng.randint(1, 9), rng.randint(0, 4)]]
+        skills += [[rng.choice([0, rng.randint(1, 9)]), rng.randint(0, 4)] for _ in range(rng.randint(1, 4))]
+
+        min_time, path = solve_boss_battle_dp(bosses, skills)
+
+        assert min_time == shortest_fight(bosses, skills)
+        assert simulate(bosses, skills, path) == min_time
+
+def test_dp_engine_answers_near_repeats_from_cache():
+    """Reordered, duplicated or dominated skills map to the same cached result."""
+    clear_cache()
+    bosses = [40, 55, 30, 70]
+    skills = [[3, 0], [20, 2], [35, 4], [12, 1], [8, 1]]
+    variant = [[35, 4], [2, 3], [8, 1], [20, 2], [3, 0], [12, 1]]
+
+    min_time, _ = solve_boss_battle_dp(bosses, skills)
+    variant_time, variant_path = solve_boss_battle_dp(bosses, variant)
+
+    assert _solve_canonical.cache_info().hits == 1
+    assert variant_time == min_time == solve_boss_battle(bosses, skills)[0]
+    assert simulate(bosses, variant, variant_path) == variant_time
+
+def test_any_order_matches_best_permutation():
+    """The any-order solver finds the best fight over every boss order, including equal bosses."""
+    rng = random.Random(19)
+    for _ in range(40):
+        bosses = [rng.randint(1, 60) for _ in range(rng.randint(1, 4))]
+        if rng.random() < 0.3:
+            bosses.append(bosses[0])
+        skills = [[rng.randint(1, 40), rng.randint(0, 4)] for _ in range(rng.randint(1, 4))]
+        best = min(solve_boss_battle([bosses[i] for i in order], skills)[0]
+                   for order in itertools.permutations(range(len(bosses))))
+        stats = {}
+
+        min_time, order, path = solve_boss_battle_any_order(bosses, skills, stats=stats)
+
+        assert min_time == best
+        assert stats['optimal']
+        assert sorted(order) == list(range(len(bosses)))
+        assert simulate([bosses[i] for i in order], skills, path) == min_time
+
+def test_any_order_stops_at_time_budget():
+    """Out of time, the best schedule found is returned with a lower bound instead of a proof."""
+    bosses = [35, 85, 68, 86, 45, 19, 49, 2]
+    skills = [[3, 0], [31, 3], [42, 4], [45, 5], [15, 5], [1, 5], [10, 4]]
+    stats = {}
+
+    min_time, order, path = solve_boss_battle_any_order(bosses, skills, time_budget=0.1, stats=stats)
+
+    assert not stats['optimal']
+    assert stats['lower_bound'] <= min_time <= solve_boss_battle(bosses, skills)[0]
+    assert simulate([bosses[i] for i in order], skills, path) == min_time
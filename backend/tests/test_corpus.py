@@ -0,0 +1,35 @@
+import pytest
+from app.algorithms.pathfinder_dp import solve_with_dp
+from benchmarks.corpus import Corpus, build_corpus, corpus_jobs
+
+def test_corpus_round_trip_and_reference_outputs(tmp_path):
+    """A built corpus reads back its records, and their reference outputs match the solvers."""
+    path = str(tmp_path / "corpus.bin")
+    jobs = corpus_jobs(sizes=(15,), count=3, fights=((3, 3),), fight_count=2, seed=7)
+    assert build_corpus(path, jobs, workers=2) == 5
+
+    with Corpus(path) as corpus:
+        assert [entry["seed"] for entry in corpus.index] == [7, 8, 9, 10, 11]
+        mazes = list(corpus.select(kind="maze", size=15))
+        assert len(mazes) == 3
+        for record in mazes:
+            assert record["errors"] == {}
+            assert solve_with_dp(record["maze"])[1] == record["reference"]["dp"]
+            assert set(record["reference"]["puzzles"]) == {str(locker["id"]) for locker in record["lockers"]}
+        fights = list(corpus.select(kind="fight"))
+        assert [record["fight"] for record in fights] == [[3, 3], [3, 3]]
+        assert all(record["reference"]["boss_turns"] > 0 for record in fights)
+
+def test_corpus_does_not_depend_on_the_worker_count(tmp_path):
+    """Records are seeded individually, so the pool size does not change the file."""
+    jobs = corpus_jobs(sizes=(15,), count=4, fights=((1, 1),), fight_count=2)
+    build_corpus(str(tmp_path / "one.bin"), jobs, workers=1)
+    build_corpus(str(tmp_path / "two.bin"), jobs, workers=2)
+    assert (tmp_path / "one.bin").read_bytes() == (tmp_path / "two.bin").read_bytes()
+
+def test_rejects_other_files(tmp_path):
+    """Opening a file that is not a corpus fails clearly."""
+    path = tmp_path / "maze.json"
+    path.write_text('{"maze": []}' + " " * 32)
+    with pytest.raises(ValueError):
+        Corpus(str(path))
@@ -20,7 +20,8 @@ def test_generated_maze_optimal_path():
     Tests the DP algorithm on a realistic maze generated by the project's
     own maze generator to ensure it calculates the absolute maximum reward.
     """
-    # This maze was generated by `generate_test_maze.py`
+    # A 15x15 maze from the project's generator; save it as {"maze": [...]} and run
+    # `python -m app.algorithms.pathfinder_dp maze.json` to see the DP result for it.
     generated_maze = [
         "###############",
         "#S....#...#L#.#",
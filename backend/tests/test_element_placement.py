@@ -0,0 +1,46 @@
+import random
+from app.algorithms.maze_generator import Maze, generate_maze, TrapsOffMainPath, MinSpacing, RegionDensity
+
+def final_payload(size, seed, policies=()):
+    random.seed(seed)
+    for payload in generate_maze(size, size, policies):
+        pass
+    return payload
+
+def cells_of(maze, kind):
+    return [(r, c) for r, row in enumerate(maze) for c, cell in enumerate(row) if cell == kind]
+
+def test_placement_counts_and_lockers():
+    """Gold and traps take 10% and 5% of the open cells, and every lever gets its own locker."""
+    payload = final_payload(21, 4)
+    maze = payload['maze']
+    open_cells = sum(cell in '.GTLB' for row in maze for cell in row)
+    assert len(cells_of(maze, 'G')) == int(open_cells * 0.1)
+    assert len(cells_of(maze, 'T')) == int(open_cells * 0.05)
+    assert cells_of(maze, 'B') == [tuple(payload['unique_path'][-2])]
+    levers = cells_of(maze, 'L')
+    assert len(levers) == 3
+    assert sorted(tuple(locker['position']) for locker in payload['lockers']) == levers
+    assert sorted(locker['id'] for locker in payload['lockers']) == [1, 2, 3]
+
+def test_placement_is_reproducible():
+    """The same seed places the same items."""
+    assert final_payload(15, 9)['maze'] == final_payload(15, 9)['maze']
+
+def test_traps_off_main_path():
+    """TrapsOffMainPath keeps every trap off the unique path."""
+    for seed in range(5):
+        payload = final_payload(15, seed, [TrapsOffMainPath()])
+        path = {tuple(cell) for cell in payload['unique_path']}
+        assert not path & set(cells_of(payload['maze'], 'T'))
+
+def test_min_spacing_and_region_density():
+    """Spaced items keep their distance, and no region holds more than its share."""
+    payload = final_payload(21, 2, [MinSpacing(3, kinds='G'), RegionDensity(5, 2, kinds='T')])
+    gold = cells_of(payload['maze'], 'G')
+    assert gold
+    assert all(abs(r1 - r2) + abs(c1 - c2) >= 3 for i, (r1, c1) in enumerate(gold) for r2, c2 in gold[i + 1:])
+    regions = {}
+    for r, c in cells_of(payload['maze'], 'T'):
+        regions[r // 5, c // 5] = regions.get((r // 5, c // 5), 0) + 1
+    assert max(regions.values()) <= 2
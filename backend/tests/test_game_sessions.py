@@ -0,0 +1,92 @@
+import json
+import random
+from fastapi.testclient import TestClient
+from app.main import app
+from app.algorithms.maze_index import MazeIndex
+from app.algorithms.pathfinder_dp import SCORE_MAP
+from app.services import game_sessions
+from app.services.game_sessions import MOVES, GameSession
+from app.services.maze_store import save_maze
+
+client = TestClient(app)
+
+MAZE = [
+    "#####",
+    "#SGT#",
+    "#.#.#",
+    "#..E#",
+    "#####",
+]
+
+def stored_maze(maze=MAZE, **fields):
+    return {"maze": [list(row) for row in maze], "index": MazeIndex(maze), **fields}
+
+def test_moves_score_items_once():
+    """Gold and traps score on the first visit only; walls block without changing anything."""
+    session = GameSession(stored_maze())
+    assert session.move('U') == {"step": 0, "moved": False}
+    assert session.move('R') == {"step": 1, "moved": True, "position": [1, 2], "cleared": [1, 2], "score": SCORE_MAP['G']}
+    assert session.move('R') == {"step": 2, "moved": True, "position": [1, 3], "cleared": [1, 3],
+                                 "score": SCORE_MAP['G'] + SCORE_MAP['T']}
+    assert session.move('L') == {"step": 3, "moved": True, "position": [1, 2]}
+    state = session.state()
+    assert (state["gold"], state["traps"], state["cleared"]) == (1, 1, [[1, 2], [1, 3]])
+
+def test_reaching_the_exit_ends_the_game():
+    """Stepping on E wins, and later moves are refused."""
+    session = GameSession(stored_maze())
+    for move in "DDRR":
+        delta = session.move(move)
+    assert delta["won"] is True
+    assert session.move('U')["moved"] is False
+
+def test_levers_and_bosses_charge_their_solutions():
+    """A lever costs the tries of its puzzle and the boss the turns of the fight."""
+    random.seed(3)
+    response = client.post("/api/v1/maze/generate", json={"size": 11, "mode": "final"})
+    payload = json.loads(response.content.split(b"\n\n")[0][len(b"data: "):])
+    session_id = client.post("/api/v1/game/sessions", json={"maze_id": payload["maze_id"]}).json()["session_id"]
+    lever = tuple(payload["lockers"][0]["position"])
+
+    # Walk from S to the lever along the BFS tree
+    index = MazeIndex(["".join(row) for row in payload["maze"]])
+    node, path = index.node(*lever), []
+    while node != index.start:
+        path.append(index.position(node))
+        node = index.parent[node]
+    steps = {step: move for move, step in MOVES.items()}
+    position, deltas = index.position(index.start), []
+    for cell in reversed(path):
+        move = steps[(cell[0] - position[0], cell[1] - position[1])]
+        deltas.append(client.post(f"/api/v1/game/sessions/{session_id}/move", json={"move": move}).json())
+        assert deltas[-1]["moved"]
+        position = cell
+
+    assert deltas[-1]["puzzle"]["id"] == payload["lockers"][0]["id"]
+    state = client.get(f"/api/v1/game/sessions/{session_id}").json()
+    assert state["position"] == list(lever)
+    costs = sum(d.get("puzzle", {}).get("tries", 0) + d.get("boss", {}).get("turns", 0) for d in deltas)
+    assert state["score"] == SCORE_MAP['G'] * state["gold"] + SCORE_MAP['T'] * state["traps"] - costs
+
+def test_the_boss_fight_is_solved_once_per_maze(monkeypatch):
+    """Sessions share the maze's solved fight, so stepping on the boss does not search again."""
+    calls = []
+    def solve(boss_hps, skills):
+        calls.append(boss_hps)
+        return {"sequence": ["Skill 1"] * 3, "skill_indices": [0] * 3, "turns": 3}
+    monkeypatch.setattr(game_sessions, "prepare_and_solve_boss_battle", solve)
+    maze = stored_maze(["#####", "#SB.#", "#..E#", "#####"], bosses=[9], player_skills=[[3, 0]])
+
+    sessions = [GameSession(maze), GameSession(maze)]
+    deltas = [session.move('R') for session in sessions]
+
+    assert calls == [[9]]
+    assert [delta["boss"]["turns"] for delta in deltas] == [3, 3]
+    assert [delta["score"] for delta in deltas] == [-3, -3]
+
+def test_unknown_sessions_and_mazes():
+    """Unknown ids are 404s, and moves are validated."""
+    assert client.post("/api/v1/game/sessions", json={"maze_id": "unknown"}).status_code == 404
+    assert client.post("/api/v1/game/sessions/unknown/move", json={"move": "U"}).status_code == 404
+    session_id = client.post("/api/v1/game/sessions", json={"maze_id": save_maze(stored_maze())}).json()["session_id"]
+    assert client.post(f"/api/v1/game/sessions/{session_id}/move", json={"move": "X"}).status_code == 422
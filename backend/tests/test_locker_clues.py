@@ -0,0 +1,60 @@
+import random
+import pytest
+from app.algorithms.maze_generator import Locker, count_candidates, count_tries
+from app.algorithms.puzzle_solver import solve_puzzle
+
+PRIMES = {2, 3, 5, 7}
+
+def brute_force_candidates(constraints):
+    """Enumerates every 3-digit password consistent with the constraints."""
+    candidates = []
+    for value in range(1000):
+        digits = [value // 100, value // 10 % 10, value % 10]
+        ok = True
+        for c in constraints:
+            if c == [-1, -1]:
+                ok = all(d in PRIMES for d in digits) and len(set(digits)) == 3
+            elif c == [-2, -2]:
+                ok = len(set(digits)) == 3
+            elif len(c) == 2:
+                ok = digits[c[0] - 1] % 2 == c[1]
+            elif len(c) == 3:
+                ok = all(m == -1 or m == d for m, d in zip(c, digits))
+            if not ok:
+                break
+        if ok:
+            candidates.append(digits)
+    return candidates
+
+def test_count_candidates_matches_enumeration():
+    """The bitset count must equal a brute-force enumeration of the password space."""
+    cases = [
+        [],
+        [[1, 0]],
+        [[-1, -1]],
+        [[-2, -2], [3, 1]],
+        [[-1, 5, -1], [1, 1], [-2, -2]],
+        [[2, 0], [-1, -1]],
+    ]
+    for constraints in cases:
+        assert count_candidates(constraints) == len(brute_force_candidates(constraints)), constraints
+
+def test_locker_candidates_and_tries_match_solver():
+    """Generated lockers report the exact candidate count and the solver's tries."""
+    random.seed(7)
+    for i in range(50):
+        locker = Locker(i)
+        clues = locker.clue.get_clues()
+        assert locker.candidates == len(brute_force_candidates(clues))
+        assert locker.password in brute_force_candidates(clues)
+
+        solution, tries = solve_puzzle(locker.password_hash, clues)
+        assert solution == locker.password
+        assert tries == locker.tries == count_tries(clues, locker.password)
+
+def test_locker_respects_candidate_range():
+    """Resampling keeps lockers inside the requested difficulty window when it is reachable."""
+    random.seed(11)
+    for i in range(50):
+        locker = Locker(i, candidate_range=(10, 150))
+        assert 10 <= locker.candidates <= 150, f"Locker {i} left {locker.candidates} candidates"
@@ -0,0 +1,74 @@
+import asyncio
+import json
+import random
+from app.api.v1.endpoints import ANIMATION_SECONDS, generate_maze_endpoint
+from app.models.pydantic_models import MazeGenerationRequest
+from app.services.api_helpers import pick_animation_frames
+from app.services.generation_stream import GenerationStream
+from app.services.maze_store import get_maze
+
+async def collect(stream, limit=None):
+    events = []
+    async for event in stream.events():
+        events.append(event)
+        if limit is not None and len(events) == limit:
+            break
+    return events
+
+def test_generation_stream_ends_with_the_stored_final_maze():
+    """Every frame arrives through the queue, and the last one is the stored final maze."""
+    random.seed(2)
+    events = asyncio.run(collect(GenerationStream(15, max_pending=2)))
+    assert len(events) > 2
+    final = json.loads(events[-1][6:])
+    assert final['lockers'] is not None
+    assert get_maze(final['maze_id'])['maze'] == final['maze']
+
+def test_final_only_generation_stream_sends_just_the_final_maze():
+    """With frame encoding off, the only event is the finished maze."""
+    random.seed(2)
+    events = asyncio.run(collect(GenerationStream(15, encode_frames=False)))
+    assert len(events) == 1
+    assert 'maze_id' in json.loads(events[0][6:])
+
+def test_closing_generation_stream_stops_the_worker():
+    """A client that stops reading releases the worker instead of leaving it blocked on the queue."""
+    async def read_one_and_close():
+        stream = GenerationStream(50, max_pending=1)
+        await collect(stream, limit=1)
+        return stream
+
+    stream = asyncio.run(read_one_and_close())
+    assert stream._finished.wait(timeout=5)
+
+def test_pick_animation_frames_coalesces_evenly():
+    """Frames are thinned to the budget, keeping the first and the last."""
+    frames = [bytes([i]) for i in range(10)]
+    assert pick_animation_frames(frames, 20) == frames
+    assert pick_animation_frames(frames, 4) == [frames[0], frames[3], frames[6], frames[9]]
+    assert pick_animation_frames(frames, 1) == [frames[9]]
+
+class ConnectedRequest:
+    """Stands in for the Starlette request of a client that keeps reading."""
+    async def is_disconnected(self):
+        return False
+
+class DisconnectedRequest:
+    """Stands in for the Starlette request of a client that has gone away."""
+    async def is_disconnected(self):
+        return True
+
+def test_animate_mode_sends_the_first_frame_and_stops_for_a_gone_client():
+    """The first frame goes out before buffering, and buffering ends once the client leaves."""
+    async def read(http_request, size):
+        response = await generate_maze_endpoint(MazeGenerationRequest(size=size, mode="animate", fps=60), http_request)
+        return [json.loads(event[6:]) async for event in response.body_iterator]
+
+    random.seed(4)
+    played = asyncio.run(read(ConnectedRequest(), 15))
+    assert 'maze_id' not in played[0] and 'maze_id' in played[-1]
+    assert len(played) <= 60 * ANIMATION_SECONDS
+
+    random.seed(4)
+    left = asyncio.run(read(DisconnectedRequest(), 50))
+    assert len(left) == 1 and 'maze_id' not in left[0]
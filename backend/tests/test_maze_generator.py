@@ -1,5 +1,5 @@
 import pytest
-from app.algorithms.maze_generator import generate_maze
+from app.algorithms.maze_generator import generate_maze, Maze
 
 def find_char(maze, char):
     for r, row in enumerate(maze):
@@ -86,3 +86,34 @@ def test_maze_has_loops_after_breaking_walls():
             break
             
     assert has_loop, "The maze generated should have loops after breaking walls."
+
+def test_unique_path_checker_rejects_loops_and_can_be_cancelled():
+    """A wall knocked out next to the main path opens a detour; a cancelled check gives up."""
+    maze_obj = Maze(9, 9)
+    maze_obj.maze = [list(row) for row in [
+        "#S#######",
+        "#.......#",
+        "#######.#",
+        "#.......#",
+        "#.#######",
+        "#.......#",
+        "#######.#",
+        "#.......#",
+        "#######E#",
+    ]]
+    assert maze_obj.unique_path_checker()
+    assert maze_obj.unique_path[0] == (0, 1) and maze_obj.unique_path[-1] == (8, 7)
+
+    maze_obj.maze[2][1] = '.'
+    maze_obj.maze[2][3] = '.'
+    assert not maze_obj.unique_path_checker()
+    assert maze_obj.unique_path == []
+
+    maze_obj.maze[2][1] = maze_obj.maze[2][3] = '#'
+    assert maze_obj.unique_path_checker()
+
+    large = Maze(201, 201)
+    for _ in large.generate_maze():
+        pass
+    assert not large.unique_path_checker(cancelled=lambda: True)
+    assert large.unique_path_checker()
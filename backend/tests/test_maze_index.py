@@ -0,0 +1,83 @@
+import json
+import pickle
+import random
+from app.algorithms.maze_generator import generate_maze
+from app.algorithms.maze_index import MazeIndex
+from app.algorithms.pathfinder_dp import build_graph, find_main_path, solve_with_dp
+from app.algorithms.pathfinder_greedy import solve_with_greedy
+
+MAZE = [
+    "#######",
+    "S..G#L#",
+    "#.#.#.#",
+    "#T#...E",
+    "###B###",
+]
+
+def test_index_matches_the_pathfinders_view_of_the_maze():
+    """Node positions, adjacency and the main path agree with build_graph and find_main_path."""
+    index = MazeIndex(MAZE)
+    graph = build_graph(MAZE)
+    assert index.graph() == graph
+    assert index.main_path_cells() == find_main_path(MAZE, graph)
+    assert index.position(index.start) == (1, 0) and index.position(index.end) == (3, 6)
+    assert [index.position(n) for n in index.bosses] == [(4, 3)]
+    assert [index.position(n) for n in index.levers] == [(1, 5)]
+    assert index.node(0, 0) == -1 and index.node(9, 9) == -1
+    assert index.position(index.node(1, 3)) == (1, 3)
+
+def test_subtree_counts_and_lowest_common_ancestors():
+    """The BFS tree from S carries gold and trap counts per subtree and answers LCA queries."""
+    index = MazeIndex(MAZE)
+    assert index.subtree_gold[index.start] == 1 and index.subtree_traps[index.start] == 1
+    # The trap hangs off (1, 1), the gold lies on the way to E
+    branch = index.node(1, 1)
+    assert index.subtree_traps[branch] == 1 and index.subtree_gold[branch] == 1
+    assert index.subtree_gold[index.node(2, 1)] == 0
+
+    trap, lever, boss = index.node(3, 1), index.node(1, 5), index.node(4, 3)
+    assert index.lca(trap, lever) == branch
+    assert index.lca(lever, boss) == index.node(3, 3)
+    assert index.tree_distance(trap, lever) == 10
+    assert index.tree_distance(lever, lever) == 0
+
+def test_index_round_trips_through_json():
+    """to_dict is plain JSON data and from_dict restores an equivalent index."""
+    index = MazeIndex(MAZE)
+    restored = MazeIndex.from_dict(json.loads(json.dumps(index.to_dict())))
+    assert restored.to_dict() == index.to_dict()
+    assert restored.graph() == index.graph()
+    assert restored.lca(restored.node(3, 1), restored.node(1, 5)) == index.node(1, 1)
+
+def test_ancestor_table_is_built_lazily_and_not_serialized():
+    """Only lca() builds the binary lifting table, and to_dict() never carries it."""
+    index = MazeIndex(MAZE)
+    assert getattr(index, '_up', None) is None
+    index.lca(index.node(3, 1), index.node(1, 5))
+    assert index._up is not None
+    assert not any(key.startswith('_') or key == 'up' for key in index.to_dict())
+
+def test_index_keeps_no_graph_and_pickles_without_lookup_tables():
+    """The stored index stays compact: graph() is not cached and pickling drops built tables."""
+    index = MazeIndex(MAZE)
+    assert index.graph() == index.graph()
+    assert set(vars(index)) == set(vars(MazeIndex(MAZE)))
+    index.lca(index.node(3, 1), index.node(1, 5))
+    index.items()
+
+    restored = pickle.loads(pickle.dumps(index))
+    assert not hasattr(restored, '_up') and not hasattr(restored, '_items')
+    assert restored.lca(restored.node(3, 1), restored.node(1, 5)) == index.node(1, 1)
+    assert restored.items() == index.items() and restored.graph() == index.graph()
+
+def test_solvers_give_the_same_results_from_the_index():
+    """The generated index lets the pathfinders skip parsing without changing their answers."""
+    random.seed(5)
+    for payload in generate_maze(21, 21):
+        pass
+    maze = ["".join(row) for row in payload['maze']]
+    index = payload['index']
+    assert isinstance(index, MazeIndex)
+    assert index.main_path_cells() == [tuple(cell) for cell in payload['unique_path']]
+    assert solve_with_dp(maze, index.main_path_cells(), index.graph()) == solve_with_dp(maze)
+    assert solve_with_greedy(maze, index=index) == solve_with_greedy(maze)
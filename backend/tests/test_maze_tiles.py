@@ -0,0 +1,81 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.maze_store import save_maze
+from app.services.maze_tiles import MAX_VIEWPORT_TILES, get_tile, get_viewport, tile_etag, viewport_tiles
+
+client = TestClient(app)
+
+def make_maze(height, width):
+    """A grid whose cells tell their position apart: row and column parity pick the character."""
+    return [["#.GT"[(r % 2) * 2 + c % 2] for c in range(width)] for r in range(height)]
+
+def test_tiles_cover_the_maze_exactly():
+    """Stitching the tiles of a maze back together gives the maze, edge tiles included."""
+    maze = make_maze(10, 7)
+    rows = [""] * 10
+    for ty in range(3):
+        for tx in range(2):
+            tile = get_tile(maze, tx, ty, tile_size=4)
+            assert (tile["x"], tile["y"]) == (tx * 4, ty * 4)
+            for i, row in enumerate(tile["rows"]):
+                rows[tile["y"] + i] += row
+    assert rows == ["".join(row) for row in maze]
+    assert get_tile(maze, 2, 0, tile_size=4) is None
+    assert get_tile(maze, 0, -1, tile_size=4) is None
+
+def test_viewport_picks_overlapping_tiles():
+    """Only tiles overlapping the viewport are served, clipped to the maze; known tiles come without rows."""
+    maze = make_maze(10, 10)
+    assert viewport_tiles(maze, 3, 5, 2, 4, tile_size=4) == [[0, 1], [1, 1], [0, 2], [1, 2]]
+    assert viewport_tiles(maze, -5, -5, 6, 6, tile_size=4) == [[0, 0]]
+    assert viewport_tiles(maze, 20, 0, 5, 5, tile_size=4) == []
+    with pytest.raises(ValueError):
+        viewport_tiles(make_maze(1000, 1000), 0, 0, 1000, 1000, tile_size=MAX_VIEWPORT_TILES // 8)
+
+    viewport = get_viewport("m", maze, 0, 0, 5, 1, known=[tile_etag("m", 0, 0)], tile_size=4)
+    assert (viewport["tiles_x"], viewport["tiles_y"]) == (3, 3)
+    assert viewport["tiles"][0] == {"tile_x": 0, "tile_y": 0, "etag": tile_etag("m", 0, 0)}
+    assert viewport["tiles"][1]["rows"] == get_tile(maze, 1, 0, tile_size=4)["rows"]
+
+def test_tile_endpoints_revalidate_with_etags():
+    """A tile comes with an ETag; sending it back answers 304 without a body."""
+    maze_id = save_maze({"maze": make_maze(100, 70)})
+    grid = client.get(f"/api/v1/maze/{maze_id}/tiles").json()
+    assert grid == {"width": 70, "height": 100, "tile_size": 64, "tiles_x": 2, "tiles_y": 2}
+
+    response = client.get(f"/api/v1/maze/{maze_id}/tiles/1/1")
+    assert response.status_code == 200
+    assert response.json()["rows"][0] == "".join(make_maze(100, 70)[64][64:])
+    etag = response.headers["etag"]
+    cached = client.get(f"/api/v1/maze/{maze_id}/tiles/1/1", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+
+    assert client.get(f"/api/v1/maze/{maze_id}/tiles/2/0").status_code == 404
+    assert client.get("/api/v1/maze/unknown/tiles/0/0").status_code == 404
+
+    viewport = client.get(f"/api/v1/maze/{maze_id}/viewport",
+                          params={"x": 60, "y": 0, "width": 10, "height": 10, "known": [etag, tile_etag(maze_id, 0, 0)]}).json()
+    assert [("rows" in tile) for tile in viewport["tiles"]] == [False, True]
+
+def test_large_mazes_are_generated_in_final_mode_only():
+    """Sizes past the streaming limit are refused unless the generation sends the final maze only."""
+    response = client.post("/api/v1/maze/generate", json={"size": 51, "mode": "animate"})
+    assert response.status_code == 422
+
+    response = client.post("/api/v1/maze/generate", json={"size": 71, "mode": "final", "tiled": True})
+    assert response.status_code == 200
+    final = json.loads(response.content.split(b"\n\n")[0][len(b"data: "):])
+    assert "maze" not in final
+    grid = client.get(f"/api/v1/maze/{final['maze_id']}/tiles").json()
+    assert (grid["width"], grid["tiles_x"]) == (71, 2)
+
+def test_limits_match_what_generation_accepts():
+    """The advertised limits are the ones /maze/generate enforces."""
+    limits = client.get("/api/v1/maze/limits").json()
+    assert limits["tile_size"] == 64 and limits["max_viewport_tiles"] == MAX_VIEWPORT_TILES
+    too_large = {"size": limits["max_size"] + 1, "mode": "final"}
+    assert client.post("/api/v1/maze/generate", json=too_large).status_code == 422
+    too_large_to_stream = {"size": limits["streamed_size"] + 1, "mode": "fast"}
+    assert client.post("/api/v1/maze/generate", json=too_large_to_stream).status_code == 422
@@ -0,0 +1,40 @@
+import base64
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+from app.main import app
+from app.algorithms.boss_battle_order import MAX_ANY_ORDER_BOSSES
+from app.models.pydantic_models import PathfindingRequest, SolveAllRequest
+
+client = TestClient(app)
+
+ROWS = ["#S.#", "#.G#", "#TE#"]
+
+def test_maze_formats_parse_to_row_strings():
+    """Row strings, lists of cells and base64 rows all become the same row strings."""
+    packed = base64.b64encode("\n".join(ROWS).encode()).decode()
+    for maze in (ROWS, [list(row) for row in ROWS], packed):
+        assert PathfindingRequest(maze=maze).maze == ROWS
+    assert SolveAllRequest(maze=packed).maze == ROWS
+    assert SolveAllRequest().maze is None
+
+@pytest.mark.parametrize("maze", [
+    [],
+    ["#S#", "#E"],
+    ["#S?", "#E#"],
+    [["#", "S"], ["#", "EE"]],
+    [["#", "S", ""], ["#", "E", "#"]],
+    [["#", 1]],
+    "not base64!",
+])
+def test_malformed_mazes_are_rejected(maze):
+    """Ragged grids, unknown cells and broken encodings fail validation."""
+    with pytest.raises(ValidationError):
+        PathfindingRequest(maze=maze)
+
+def test_any_order_fights_over_the_boss_limit_are_rejected():
+    """Too many bosses for an any-order fight is a validation error, not a server error."""
+    skills = [{"name": "Strike", "damage": 5, "cooldown": 0}]
+    request = {"boss_hps": [10] * (MAX_ANY_ORDER_BOSSES + 1), "skills": skills, "any_order": True}
+    assert client.post("/api/v1/solve/boss", json=request).status_code == 422
+    assert client.post("/api/v1/solve/boss", json={**request, "any_order": False}).status_code == 200
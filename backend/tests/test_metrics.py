@@ -0,0 +1,79 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from app.algorithms.maze_generator import Locker
+from app.algorithms.boss_battle import solve_boss_battle
+from app.services import metrics
+from app.services.api_helpers import prepare_and_solve_puzzle, prepare_and_solve_boss_battle
+from app.services.metrics import Registry, PUZZLE_TRIES, BOSS_BATTLE_STATES
+
+def value(metric, *labels):
+    return dict((tuple(key), v) for key, v in metric.snapshot()).get(labels, 0)
+
+def test_render_prometheus_text():
+    """Counters and histograms render with HELP/TYPE lines, cumulative buckets, sum and count."""
+    registry = Registry()
+    hits = registry.counter("hits_total", "Hits.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    hits.inc(route='/a"b')
+    hits.inc(2, route='/a"b')
+    for seconds in (0.05, 0.5, 5.0):
+        latency.observe(seconds)
+
+    text = registry.render([registry.snapshot()])
+    assert "# TYPE hits_total counter" in text
+    assert 'hits_total{route="/a\\"b"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "latency_seconds_sum 5.55" in text
+    assert "latency_seconds_count 3" in text
+
+def test_render_adds_up_process_snapshots(tmp_path, monkeypatch):
+    """Values flushed by other live processes into METRICS_DIR are added to this process's own."""
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    other = {name: [] for name in metrics.REGISTRY.snapshot()}
+    other["maze_generation_retries_total"] = [[[], 5]]
+    (tmp_path / f"metrics_{os.getppid()}.json").write_text(json.dumps(other))
+
+    before = value(metrics.GENERATION_RETRIES)
+    metrics.GENERATION_RETRIES.inc()
+    text = metrics.render_metrics()
+    assert f"maze_generation_retries_total {before + 6}" in text
+    # Rendering reads this process's values from memory instead of writing them out
+    assert not os.path.exists(tmp_path / f"metrics_{os.getpid()}.json")
+
+def test_render_drops_files_of_dead_processes(tmp_path, monkeypatch):
+    """A file left behind by a process that has exited stops counting and is deleted."""
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    other = {"maze_generation_retries_total": [[[], 1000]]}
+    stale = tmp_path / f"metrics_{dead.pid}.json"
+    stale.write_text(json.dumps(other))
+
+    text = metrics.render_metrics()
+    assert f"maze_generation_retries_total {value(metrics.GENERATION_RETRIES)}\n" in text
+    assert not stale.exists()
+
+def test_flush_writes_this_process_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_DIR", str(tmp_path))
+    metrics.flush()
+    with open(tmp_path / f"metrics_{os.getpid()}.json") as f:
+        assert set(json.load(f)) == set(metrics.REGISTRY.snapshot())
+
+def test_solvers_count_their_work():
+    """The puzzle helper adds its tries and Branch and Bound its state counts."""
+    locker = Locker(1)
+    before = value(PUZZLE_TRIES)
+    _, tries = prepare_and_solve_puzzle(locker.password_hash, locker.clue.get_clues())
+    assert value(PUZZLE_TRIES) - before == tries
+
+    stats = {}
+    solve_boss_battle([30, 20], [[7, 0], [15, 2]], stats=stats)
+    expanded = value(BOSS_BATTLE_STATES, "expanded")
+    prepare_and_solve_boss_battle([30, 20], [{"name": "a", "damage": 7, "cooldown": 0},
+                                             {"name": "b", "damage": 15, "cooldown": 2}])
+    assert value(BOSS_BATTLE_STATES, "expanded") - expanded == stats["expanded"] > 0
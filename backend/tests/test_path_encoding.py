@@ -0,0 +1,36 @@
+import pytest
+from app.algorithms.pathfinder_dp import solve_with_dp
+from app.services.path_encoding import encode_moves, compress_moves, decode_moves, encode_path
+
+def test_encode_moves_round_trips():
+    """A path encodes to its start plus one letter per step and decodes back unchanged."""
+    path = [(1, 1), (1, 2), (1, 3), (2, 3), (1, 3), (0, 3), (0, 2)]
+    start, moves = encode_moves(path)
+    assert start == [1, 1]
+    assert moves == "RRDUUL"
+    assert decode_moves(start, moves) == [list(p) for p in path]
+
+def test_run_length_moves_round_trip():
+    """Runs are written as count + letter and expand back to the same path."""
+    assert compress_moves("RRRDDLUUUUUUUUUUUU") == "3R2DL12U"
+    start, moves = encode_moves([(0, 0), (0, 1), (0, 2), (0, 3), (1, 3)])
+    assert decode_moves(start, compress_moves(moves)) == decode_moves(start, moves)
+
+def test_encode_path_matches_dp_plan():
+    """The DP plan, excursions included, survives every encoding."""
+    maze = [
+        "S.E",
+        "# #",
+        "#G#",
+    ]
+    path, _ = solve_with_dp(maze)
+    assert encode_path(path) == {"path": [list(p) for p in path]}
+    assert encode_path(path, "rle") == {"start": [0, 0], "moves": "R2D2UR"}
+    encoded = encode_path(path, "moves")
+    assert decode_moves(encoded["start"], encoded["moves"]) == [list(p) for p in path]
+    assert encode_path([], "rle") == {"start": [], "moves": ""}
+
+def test_encode_moves_rejects_jumps():
+    """Cells that are not orthogonal neighbors cannot be written as moves."""
+    with pytest.raises(ValueError):
+        encode_moves([(0, 0), (1, 1)])
@@ -0,0 +1,59 @@
+import pstats
+import threading
+import time
+import pytest
+from app.algorithms.pathfinder_dp import solve_with_dp
+from app.services import profiling
+from app.services.profiling import profiled_call, list_profiles, get_profile, profile_path
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_RING_SIZE", 2)
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 0.0)
+    return tmp_path
+
+def test_unprofiled_calls_store_nothing(profile_dir):
+    """Without the header or sampling, the solver just runs."""
+    def fail():
+        raise AssertionError("inputs are only needed for a profile")
+    assert profiled_call("dp", None, fail, solve_with_dp, ["S.E"]) == solve_with_dp(["S.E"])
+    assert profiled_call("dp", "0", fail, solve_with_dp, ["S.E"]) == solve_with_dp(["S.E"])
+    assert list_profiles() == []
+
+def test_profiles_keep_inputs_and_stats_in_a_bounded_ring(profile_dir):
+    """Profiled calls are stored with their inputs and pstats data; only the newest survive."""
+    mazes = [["S.E"], ["S..E"], ["S...E"]]
+    for maze in mazes:
+        assert profiled_call("dp", "1", lambda: {"maze": maze}, solve_with_dp, maze) == solve_with_dp(maze)
+
+    profiles = list_profiles()
+    assert len(profiles) == 2
+    newest = get_profile(profiles[0]["id"])
+    assert newest["inputs"] == {"maze": ["S...E"]}
+    assert newest["solver"] == "dp" and newest["peak_bytes"] > 0
+    assert "solve_with_dp" in newest["stats"]
+    assert pstats.Stats(profile_path(newest["id"])).total_calls > 0
+
+def test_profile_ids_cannot_escape_the_profile_dir(profile_dir):
+    """Malformed ids are rejected before touching the filesystem."""
+    assert profile_path("../../etc/passwd") is None
+    assert get_profile("..") is None
+
+def test_concurrent_profiled_calls_measure_their_own_peak(profile_dir, monkeypatch):
+    """One profiled call stopping tracemalloc must not zero the peak of another still running."""
+    monkeypatch.setattr(profiling, "PROFILE_RING_SIZE", 10)
+    def allocate(size):
+        block = bytearray(size)
+        time.sleep(0.05)
+        return len(block)
+
+    threads = [threading.Thread(target=profiled_call, args=("dp", "1", lambda: {}, allocate, 2**20))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    peaks = [profile["peak_bytes"] for profile in list_profiles()]
+    assert len(peaks) == 3 and min(peaks) >= 2**20
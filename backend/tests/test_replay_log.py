@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import replay_log
+from app.services.replay_log import ReplayLog, ReplayReader, log_files, read_log
+from benchmarks.replay import replay_games, rerun_solve
+
+client = TestClient(app)
+
+@pytest.fixture
+def log_dir(tmp_path):
+    replay_log.configure(str(tmp_path))
+    yield str(tmp_path)
+    replay_log.configure(None)
+
+def test_records_round_trip_and_rotate(tmp_path):
+    """Batched events read back in order across rotated files, and old files are dropped."""
+    log = ReplayLog(str(tmp_path), max_bytes=2000, keep=3, flush_interval=60)
+    for i in range(50):
+        log.log("move", {"session_id": "s", "move": "UDLR"[i % 4], "delta": {"step": i}})
+        if i % 10 == 9:
+            log.flush()
+    log.log("solve", {"solver": "dp", "inputs": {"maze": ["#" * 1000]}, "result": [[], 0], "seconds": 0.1})
+    log.close()
+
+    files = log_files(str(tmp_path))
+    assert 1 < len(files) <= 3
+    records = list(read_log([str(tmp_path)]))
+    steps = [r.data["delta"]["step"] for r in records if r.kind == "move"]
+    assert steps == list(range(50 - len(steps), 50))
+    assert records[-1].data["inputs"]["maze"] == ["#" * 1000]
+
+    with ReplayReader(files[-1]) as reader:
+        solves = list(reader.records(["solve"]))
+        assert len(solves) == 1
+        assert reader.read_at(solves[0].offset) == solves[0]
+
+def test_writers_only_drop_their_own_files(tmp_path):
+    """Rotation in one process keeps the files another process is writing in the same directory."""
+    def rotate(log, times):
+        for step in range(times):
+            log.log("move", {"session_id": "s", "move": "U", "delta": {"step": step, "padding": "x" * 200}})
+            log.flush()
+
+    log = ReplayLog(str(tmp_path), max_bytes=200, keep=2, flush_interval=60)
+    rotate(log, 1)
+    # A second worker rotates through several files while the first one's file is open
+    other = ("from app.services.replay_log import ReplayLog\n"
+             f"log = ReplayLog({str(tmp_path)!r}, max_bytes=200, keep=2, flush_interval=60)\n"
+             "for step in range(5):\n"
+             "    log.log('move', {'session_id': 't', 'move': 'D', 'delta': {'step': step, 'padding': 'x' * 200}})\n"
+             "    log.flush()\n"
+             "log.close()\n")
+    subprocess.run([sys.executable, "-c", other], check=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert len(log_files(str(tmp_path), pid=os.getpid())) == 1
+    rotate(log, 3)
+    log.close()
+
+    files = log_files(str(tmp_path))
+    assert len(files) == 4
+    assert len(log_files(str(tmp_path), pid=os.getpid())) == 2
+    sessions = [r.data["session_id"] for r in read_log(files)]
+    assert sessions.count("s") == 2 and sessions.count("t") == 2
+
+def test_a_torn_record_ends_the_file(tmp_path):
+    """A record cut short by a crash is ignored along with everything after it."""
+    log = ReplayLog(str(tmp_path), flush_interval=60)
+    for step in range(3):
+        log.log("move", {"session_id": "s", "move": "U", "delta": {"step": step}})
+    log.close()
+    path = log_files(str(tmp_path))[0]
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 3)
+    assert [r.data["delta"]["step"] for r in read_log([path])] == [0, 1]
+
+def test_logged_games_and_solves_replay(log_dir):
+    """A logged game replays to the same deltas, and logged solves re-run to the same results."""
+    response = client.post("/api/v1/maze/generate", json={"size": 11, "mode": "final"})
+    payload = json.loads(response.content.split(b"\n\n")[0][len(b"data: "):])
+    session_id = client.post("/api/v1/game/sessions", json={"maze_id": payload["maze_id"]}).json()["session_id"]
+    for move in "UDLRRDDRRUULL":
+        client.post(f"/api/v1/game/sessions/{session_id}/move", json={"move": move})
+    rows = ["".join(row) for row in payload["maze"]]
+    client.post("/api/v1/solve/dp", json={"maze": rows})
+    locker = payload["lockers"][0]
+    client.post("/api/v1/solve/puzzle", json={"password_hash": locker["password_hash"], "constraints": locker["constraints"]})
+    replay_log.configure(None)  # Writes the queued events
+
+    records = list(read_log([log_dir]))
+    assert [r.kind for r in records].count("move") == 13
+    assert list(replay_games(records)) == []
+    solves = [r.data for r in records if r.kind == "solve"]
+    assert [s["solver"] for s in solves] == ["dp", "puzzle"]
+    for solve in solves:
+        assert rerun_solve(solve, check=True, slowdown=float("inf")) == []
+
+    tampered = [r._replace(data={**r.data, "delta": {**r.data["delta"], "step": -1}}) if r.kind == "move" else r
+                for r in records]
+    assert len(list(replay_games(tampered))) == 13
@@ -0,0 +1,39 @@
+import json
+import random
+import pytest
+from app.algorithms.maze_generator import generate_maze
+from app.services import serializers
+from app.services.serializers import MazeFrameEncoder, sse_event, use_backend
+
+@pytest.fixture(params=sorted(serializers.BACKENDS))
+def json_backend(request):
+    previous = serializers.backend
+    use_backend(request.param)
+    yield request.param
+    use_backend(previous)
+
+def test_sse_event_frames_json(json_backend):
+    """Every backend writes the same compact JSON inside a data: frame."""
+    payload = {"solver": "dp", "result": {"path": [[0, 1], (1, 1)], "value": -30}, "done": False}
+    event = sse_event(payload)
+    assert event.startswith(b"data: ") and event.endswith(b"\n\n")
+    assert json.loads(event[6:]) == json.loads(json.dumps(payload))
+
+def test_maze_frame_encoder_matches_full_encoding(json_backend):
+    """Reusing unchanged rows yields the same frames as encoding each one from scratch."""
+    random.seed(11)
+    encoder = MazeFrameEncoder()
+    frames = 0
+    for payload in generate_maze(15, 15):
+        # The MazeIndex stays on the server, as in GenerationStream
+        payload = {key: value for key, value in payload.items() if key != 'index'}
+        event = encoder.encode(payload)
+        assert event.startswith(b"data: ") and event.endswith(b"\n\n")
+        assert json.loads(event[6:]) == json.loads(json.dumps(payload))
+        frames += 1
+    assert frames > 2
+
+def test_use_backend_rejects_unknown_names():
+    """Only registered backends can be selected."""
+    with pytest.raises(ValueError):
+        use_backend("pickle")
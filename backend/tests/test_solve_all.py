@@ -0,0 +1,50 @@
+import random
+import pytest
+from app.algorithms.maze_generator import Locker
+from app.algorithms.pathfinder_dp import solve_with_dp
+from app.algorithms.pathfinder_greedy import solve_with_greedy
+from app.services.api_helpers import prepare_and_solve_puzzle, prepare_and_solve_boss_battle
+from app.services.solver_pool import solve_all, gather_solve_all
+
+MAZE = [
+    "#######",
+    "#S..G.#",
+    "#.###.#",
+    "#.#T..#",
+    "#.#.###",
+    "#G..LE#",
+    "#######",
+]
+
+def test_solve_all_matches_individual_solvers():
+    """Every solver run through the pool returns what its own endpoint helper returns."""
+    random.seed(3)
+    lockers = []
+    for locker_id in (1, 2):
+        locker = Locker(locker_id)
+        lockers.append({"id": locker_id, "password_hash": locker.password_hash, "constraints": locker.clue.get_clues()})
+    skills = [{"name": "Slash", "damage": 4, "cooldown": 0}, {"name": "Blast", "damage": 9, "cooldown": 2}]
+
+    updates = list(solve_all(MAZE, lockers=lockers, boss_hps=[20, 15], skills=skills))
+    assert sorted(u["solver"] for u in updates) == ["boss", "dp", "greedy", "puzzle", "puzzle"]
+
+    response = gather_solve_all(updates)
+    assert response["errors"] == {}
+    dp_path, dp_value = solve_with_dp(MAZE)
+    assert response["dp"] == {"path": [list(p) for p in dp_path], "value": dp_value}
+    greedy_path, greedy_value = solve_with_greedy(MAZE)
+    assert response["greedy"] == {"path": [list(p) for p in greedy_path], "value": greedy_value}
+    for locker in lockers:
+        solution, tries = prepare_and_solve_puzzle(locker["password_hash"], locker["constraints"])
+        assert response["puzzles"][str(locker["id"])] == {"solution": solution, "tries": tries}
+    assert response["boss"] == prepare_and_solve_boss_battle([20, 15], skills)
+
+def test_solve_all_reports_failing_solvers_without_failing_others():
+    """A solver that raises or finds nothing shows up in errors while the rest still resolve."""
+    lockers = [{"id": 7, "password_hash": "unused", "constraints": None}]
+    skills = [{"name": "Tickle", "damage": 0, "cooldown": 0}]
+    response = gather_solve_all(solve_all(MAZE, lockers=lockers, boss_hps=[10], skills=skills))
+    assert set(response["errors"]) == {"puzzle:7", "boss"}
+    assert response["puzzles"] == {} and response["boss"] is None
+    assert response["dp"]["value"] == solve_with_dp(MAZE)[1]
+    assert response["greedy"]["value"] == solve_with_greedy(MAZE)[1]
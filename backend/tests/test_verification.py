@@ -0,0 +1,91 @@
+import logging
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.algorithms.pathfinder_dp import solve_with_dp
+from app.algorithms.pathfinder_greedy import solve_with_greedy
+from app.algorithms.maze_generator import Locker
+from app.services import verification
+from app.services.api_helpers import prepare_and_solve_boss_battle
+from app.services.metrics import VERIFICATIONS
+from app.services.verification import verify, verify_and_log, boss_schedule_turns
+
+MAZE = [
+    "#######",
+    "S..G#.#",
+    "#.#.#.#",
+    "#T#...E",
+    "#######",
+]
+SKILLS = [{"name": "Jab", "damage": 3, "cooldown": 0}, {"name": "Smash", "damage": 10, "cooldown": 2}]
+
+def test_solver_results_verify_cleanly():
+    """Results of the serving engines agree with the reference solvers."""
+    for solver, solve in (("dp", solve_with_dp), ("greedy", solve_with_greedy)):
+        path, value = solve(MAZE)
+        assert verify(solver, {"maze": MAZE}, {"path": path, "value": value}) == []
+
+    locker = Locker(1)
+    inputs = {"password_hash": locker.password_hash, "constraints": locker.clue.get_clues()}
+    assert verify("puzzle", inputs, {"solution": locker.password, "tries": locker.tries}) == []
+
+    for engine in ("branch_and_bound", "dp"):
+        result = prepare_and_solve_boss_battle([25, 14], SKILLS, engine)
+        assert verify("boss", {"boss_hps": [25, 14], "skills": SKILLS}, result) == []
+
+def test_wrong_results_are_reported():
+    """Invalid routes, suboptimal scores, wrong passwords and slow schedules are all caught."""
+    path, value = solve_with_dp(MAZE)
+    assert verify("dp", {"maze": MAZE}, {"path": path, "value": value - 50})
+    assert any("jumps" in p for p in verify("dp", {"maze": MAZE}, {"path": path[:1] + path[2:], "value": value}))
+    # A valid route through the trap is scored right but is not optimal
+    detour = [(1, 0), (1, 1), (2, 1), (3, 1), (2, 1), (1, 1), (1, 2), (1, 3), (2, 3), (3, 3), (3, 4), (3, 5), (3, 6)]
+    assert verify("dp", {"maze": MAZE}, {"path": detour, "value": 20}) == ["Scores 20, the reference dp solver scores 50."]
+
+    locker = Locker(1)
+    inputs = {"password_hash": locker.password_hash, "constraints": locker.clue.get_clues()}
+    wrong = [(locker.password[0] + 1) % 10] + locker.password[1:]
+    assert any("hash" in p for p in verify("puzzle", inputs, {"solution": wrong, "tries": locker.tries}))
+
+    result = prepare_and_solve_boss_battle([25, 14], SKILLS)
+    slow = {**result, "sequence": ["Jab"] + result["sequence"], "skill_indices": [0] + result["skill_indices"],
+            "turns": result["turns"] + 1}
+    assert verify("boss", {"boss_hps": [25, 14], "skills": SKILLS}, slow)
+
+def test_boss_skills_with_the_same_name_are_told_apart():
+    """Schedules are replayed by skill index, so same-named skills keep their own damage and cooldown."""
+    skills = [{"name": "Strike", "damage": 3, "cooldown": 0}, {"name": "Strike", "damage": 10, "cooldown": 2}]
+    result = prepare_and_solve_boss_battle([25, 14], skills)
+    assert verify("boss", {"boss_hps": [25, 14], "skills": skills}, result) == []
+
+    # The same names with the weak skill's index do not defeat the bosses in time
+    weak = {**result, "skill_indices": [0] * len(result["skill_indices"])}
+    assert verify("boss", {"boss_hps": [25, 14], "skills": skills}, weak)
+
+def test_boss_schedule_turns_waits_for_cooldowns():
+    """Skills are replayed as soon as they are ready; leftover or missing hits are invalid."""
+    skills = [[3, 0], [10, 2]]
+    assert boss_schedule_turns([10], skills, [1]) == 1
+    assert boss_schedule_turns([20], skills, [1, 1]) == 4
+    assert boss_schedule_turns([20], skills, [1, 0, 0, 1]) == 4
+    assert boss_schedule_turns([20], skills, [1]) is None
+    assert boss_schedule_turns([10], skills, [1, 0]) is None
+
+def test_mismatches_are_logged_with_inputs(caplog):
+    """A mismatch is counted and logged together with the request inputs."""
+    before = dict((tuple(k), v) for k, v in VERIFICATIONS.snapshot()).get(("dp", "mismatch"), 0)
+    path, value = solve_with_dp(MAZE)
+    with caplog.at_level(logging.WARNING, logger="app.services.verification"):
+        problems = verify_and_log("dp", {"maze": MAZE}, {"path": path, "value": value + 1})
+    assert problems
+    assert '"S..G#.#"' in caplog.text
+    assert dict((tuple(k), v) for k, v in VERIFICATIONS.snapshot())[("dp", "mismatch")] == before + 1
+
+def test_sampled_requests_are_verified(monkeypatch):
+    """With VERIFY_SAMPLE_RATE at 1, every solver request is verified after its response."""
+    monkeypatch.setattr(verification, "VERIFY_SAMPLE_RATE", 1.0)
+    before = dict((tuple(k), v) for k, v in VERIFICATIONS.snapshot()).get(("greedy", "match"), 0)
+    client = TestClient(app)
+    response = client.post("/api/v1/solve/greedy", json={"maze": MAZE})
+    assert response.status_code == 200
+    assert dict((tuple(k), v) for k, v in VERIFICATIONS.snapshot())[("greedy", "match")] == before + 1
@@ -7,62 +7,90 @@ const apiClient = axios.create({
   },
 });
 
-export default {
-  async generateMaze(size, onData, onComplete, onError) {
-    try {
-      const response = await fetch('http://127.0.0.1:8000/api/v1/maze/generate', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-          'Accept': 'text/event-stream'
-        },
-        body: JSON.stringify({ size })
-      });
+// Sends a maze as one string per row, which the API validates in bulk instead of cell by cell.
+const mazeRows = (maze) => maze.map(row => (Array.isArray(row) ? row.join('') : row));
 
-      if (!response.ok) {
-        throw new Error(`HTTP error! status: ${response.status}`);
-      }
+// Reads a Server-Sent Events response and hands every parsed `data:` payload to onData.
+async function readEventStream(path, body, onData) {
+  const response = await fetch(`http://127.0.0.1:8000/api/v1${path}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      'Accept': 'text/event-stream'
+    },
+    body: JSON.stringify(body)
+  });
 
-      const reader = response.body.getReader();
-      const decoder = new TextDecoder();
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
 
-      let buffer = '';
-      while (true) {
-        const { value, done } = await reader.read();
-        if (done) {
-          if (onComplete) onComplete();
-          break;
-        }
-        
-        buffer += decoder.decode(value, { stream: true });
-        const lines = buffer.split('\n\n');
-        buffer = lines.pop(); // Keep the last, possibly incomplete, line
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+
+  let buffer = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
 
-        for (const line of lines) {
-          if (line.startsWith('data: ')) {
-            const jsonStr = line.substring(6);
-            if (jsonStr) {
-              try {
-                const data = JSON.parse(jsonStr);
-                // Pass the whole data object to the callback, not just the maze
-                if (onData) onData(data);
-              } catch (e) {
-                console.error("Failed to parse maze chunk", e);
-              }
-            }
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n\n');
+    buffer = lines.pop(); // Keep the last, possibly incomplete, line
+
+    for (const line of lines) {
+      if (line.startsWith('data: ')) {
+        const jsonStr = line.substring(6);
+        if (jsonStr) {
+          try {
+            // Pass the whole data object to the callback
+            if (onData) onData(JSON.parse(jsonStr));
+          } catch (e) {
+            console.error("Failed to parse stream chunk", e);
           }
         }
       }
+    }
+  }
+}
+
+export default {
+  async generateMaze(size, onData, onComplete, onError, mode = 'animate', tiled = false) {
+    try {
+      // The store shows one queued frame every 100ms, so animations are sent at 10 fps;
+      // 'fast' takes several frames per network write and 'final' only the finished maze.
+      // With `tiled` the final event has no grid; it is read with getMazeTiles and getViewport.
+      await readEventStream('/maze/generate', { size, mode, fps: 10, frames_per_write: 5, tiled }, onData);
+      if (onComplete) onComplete();
     } catch (err) {
       if (onError) onError(err);
       console.error('Failed to generate maze:', err);
     }
   },
+  getMazeLimits() {
+    return apiClient.get('/maze/limits');
+  },
+  getMazeTiles(mazeId) {
+    return apiClient.get(`/maze/${mazeId}/tiles`);
+  },
+  getViewport(mazeId, x, y, width, height, known = []) {
+    // `known` holds the ETags of tiles already cached, sent as repeated known=... parameters
+    return apiClient.get(`/maze/${mazeId}/viewport`, {
+      params: { x, y, width, height, known },
+      paramsSerializer: { indexes: null },
+    });
+  },
+  createGameSession(mazeId) {
+    return apiClient.post('/game/sessions', { maze_id: mazeId });
+  },
+  moveInGameSession(sessionId, move) {
+    // move is one of U, D, L, R; the response holds only what changed
+    return apiClient.post(`/game/sessions/${sessionId}/move`, { move });
+  },
   solveDp(payload) {
-    return apiClient.post('/solve/dp', payload);
+    return apiClient.post('/solve/dp', { ...payload, maze: mazeRows(payload.maze) });
   },
-  solveGreedy(maze) {
-    return apiClient.post('/solve/greedy', { maze });
+  solveGreedy(maze, pathEncoding = 'rle') {
+    return apiClient.post('/solve/greedy', { maze: mazeRows(maze), path_encoding: pathEncoding });
   },
   solvePuzzle(puzzleData) {
     return apiClient.post('/solve/puzzle', {
@@ -74,4 +102,12 @@ export default {
     // Use boss_hps to match the updated Pydantic model
     return apiClient.post('/solve/boss', { boss_hps: bossHps, skills });
   },
+  solveBossBattleStream(bossHps, skills, onData, timeBudget = 5) {
+    // Every event is a complete schedule; the last one has `done` set
+    return readEventStream('/solve/boss/stream', { boss_hps: bossHps, skills, time_budget: timeBudget }, onData);
+  },
+  solveAllStream(payload, onData) {
+    // One event per solver as it finishes (dp, greedy, each puzzle, boss); the last one has `done` set
+    return readEventStream('/solve/all/stream', { ...payload, maze: mazeRows(payload.maze) }, onData);
+  },
 };
@@ -1,9 +1,54 @@
+import { markRaw } from 'vue';
 import { defineStore } from 'pinia';
 import ApiService from '../services/ApiService';
 
+// Cells loaded on each side of the player in a tiled maze; the window of 2 * 96 + 1 cells
+// overlaps at most 5 x 5 of the server's 64-cell tiles, well under its 64-tile limit.
+const VIEWPORT_RADIUS = 96;
+
+const S = 'S'.charCodeAt(0);
+const UNLOADED = 0; // Cell code of tiles not downloaded yet
+const SESSION_MOVES = { up: 'U', down: 'D', left: 'L', right: 'R' };
+// Session moves are sent one at a time, in the order the keys were pressed
+let pendingMove = Promise.resolve();
+const rowDecoder = new TextDecoder();
+const rowEncoder = new TextEncoder();
+
+// The maze grid, one character code per cell in a Uint8Array, row by row. It is not made
+// reactive: changes bump `gridRevision` instead, and the flat indices of the changed cells
+// are queued in `dirty` for the renderer, which empties it. `dirty` is null while the whole
+// grid needs drawing.
+const makeGrid = (height, width) => markRaw({ height, width, cells: new Uint8Array(height * width), dirty: null });
+
+// Copies rows (strings or arrays of characters) into the grid, queueing changed cells when `track` is set.
+const writeRows = (grid, rows, top = 0, left = 0, track = false) => {
+  const { cells, width } = grid;
+  for (let r = 0; r < rows.length; r++) {
+    const row = rows[r];
+    const offset = (top + r) * width + left;
+    if (!track && typeof row === 'string') {
+      rowEncoder.encodeInto(row, cells.subarray(offset, offset + row.length));
+      continue;
+    }
+    for (let c = 0; c < row.length; c++) {
+      const code = row[c].charCodeAt(0);
+      if (cells[offset + c] !== code) {
+        cells[offset + c] = code;
+        if (track) grid.dirty.push(offset + c);
+      }
+    }
+  }
+};
+
 export const useGameStore = defineStore('game', {
   state: () => ({
-    mazeData: null,
+    grid: null,
+    gridRevision: 0,
+    limits: null, // The server's maze size limits: { max_size, streamed_size, tile_size }
+    mazeId: null, // Id of the generated maze on the server, for the solve-all endpoints
+    gridEdited: false, // Whether play changed the grid since it matched the maze stored under mazeId
+    tiles: null, // For tiled mazes, the tile cache: { size, tilesX, tilesY, etags: Map of "tx,ty" -> ETag }
+    sessionId: null, // Server-side game session of a generated maze, which keeps the score
     uniquePath: null, // To store the unique path from the generator
     dpPath: null,
     dpValue: 0,
@@ -22,12 +67,125 @@ export const useGameStore = defineStore('game', {
     leverPuzzles: {},
     isGameActive: false,
   }),
+  getters: {
+    // The grid as one string per row, as the solver endpoints take it
+    mazeData: (state) => {
+      void state.gridRevision; // The cells are not reactive; the revision is
+      if (!state.grid) return null;
+      const { cells, height, width } = state.grid;
+      const rows = new Array(height);
+      for (let r = 0; r < height; r++) rows[r] = rowDecoder.decode(cells.subarray(r * width, (r + 1) * width));
+      return rows;
+    },
+    // False while some tiles of a tiled maze have not been downloaded
+    gridComplete: (state) => {
+      void state.gridRevision;
+      return !state.tiles || state.tiles.etags.size === state.tiles.tilesX * state.tiles.tilesY;
+    },
+  },
   actions: {
-    async generateMaze(size) {
+    cellAt(r, c) {
+      return String.fromCharCode(this.grid.cells[r * this.grid.width + c]);
+    },
+    setCell(r, c, cell) {
+      const index = r * this.grid.width + c;
+      this.grid.cells[index] = cell.charCodeAt(0);
+      if (this.grid.dirty) this.grid.dirty.push(index);
+      this.gridEdited = true;
+      this.gridRevision++;
+    },
+    // Replaces the grid; the renderer draws it in full
+    setGrid(maze) {
+      this.grid = makeGrid(maze.length, maze[0].length);
+      writeRows(this.grid, maze);
+      this.gridRevision++;
+    },
+    // Applies a generation frame, queueing only the cells it changed
+    applyFrame(maze) {
+      if (!this.grid || this.grid.height !== maze.length || this.grid.width !== maze[0].length) {
+        this.setGrid(maze);
+        return;
+      }
+      writeRows(this.grid, maze, 0, 0, this.grid.dirty !== null);
+      this.gridRevision++;
+    },
+    // Fetches the server's maze size limits once; the size inputs and generateMaze use them
+    async loadLimits() {
+      if (!this.limits) this.limits = (await ApiService.getMazeLimits()).data;
+      return this.limits;
+    },
+    // Starts a maze generated with `tiled` set: an empty grid of its size and an empty tile
+    // cache, then the tiles around (r, c)
+    async openMazeTiles(mazeId, r, c) {
+      const { data: info } = await ApiService.getMazeTiles(mazeId);
+      this.grid = makeGrid(info.height, info.width);
+      this.tiles = markRaw({ size: info.tile_size, tilesX: info.tiles_x, tilesY: info.tiles_y, etags: new Map(), loading: false });
+      this.gridRevision++;
+      await this.loadTilesAround(r, c);
+    },
+    // Makes sure the tiles within VIEWPORT_RADIUS cells of (r, c) are loaded. Nothing is
+    // requested while they all are; otherwise one viewport request sends the ETags of the
+    // cached ones, which come back without their rows.
+    async loadTilesAround(r, c) {
+      const tiles = this.tiles;
+      if (!tiles || !this.mazeId || tiles.loading) return;
+      const { size, etags } = tiles;
+      const x0 = Math.max(0, c - VIEWPORT_RADIUS), y0 = Math.max(0, r - VIEWPORT_RADIUS);
+      const x1 = Math.min(this.grid.width, c + VIEWPORT_RADIUS + 1), y1 = Math.min(this.grid.height, r + VIEWPORT_RADIUS + 1);
+      const known = [];
+      let missing = false;
+      for (let ty = Math.floor(y0 / size); ty * size < y1; ty++) {
+        for (let tx = Math.floor(x0 / size); tx * size < x1; tx++) {
+          const etag = etags.get(`${tx},${ty}`);
+          if (etag) known.push(etag);
+          else missing = true;
+        }
+      }
+      if (!missing) return;
+
+      const mazeId = this.mazeId;
+      tiles.loading = true;
+      try {
+        const { data } = await ApiService.getViewport(mazeId, x0, y0, x1 - x0, y1 - y0, known);
+        if (this.mazeId !== mazeId) return; // A new maze was started meanwhile
+        for (const tile of data.tiles) {
+          if (!tile.rows) continue;
+          writeRows(this.grid, tile.rows, tile.y, tile.x, this.grid.dirty !== null);
+          etags.set(`${tile.tile_x},${tile.tile_y}`, tile.etag);
+        }
+        this.gridRevision++;
+      } finally {
+        tiles.loading = false;
+      }
+    },
+    // Loads the tiles around the player, reporting a failure without interrupting play
+    followPlayer() {
+      if (!this.tiles || !this.playerPosition) return;
+      const { r, c } = this.playerPosition;
+      this.loadTilesAround(r, c).catch((err) => {
+        this.error = 'Failed to load the maze around the player.';
+        console.error(err);
+      });
+    },
+    // mode: 'animate' to watch the maze being built, 'final' to skip straight to the result.
+    // Mazes larger than the server's streamed_size always come as a final event plus tiles.
+    async generateMaze(size, mode = 'animate') {
+      let tiled;
+      try {
+        tiled = size > (await this.loadLimits()).streamed_size;
+      } catch (err) {
+        this.error = 'Failed to reach the server.';
+        console.error(err);
+        return;
+      }
       this.isGameActive = true;
       this.isLoading = true;
       this.error = null;
-      this.mazeData = []; // Start with an empty maze for animation
+      this.grid = null; // Start with an empty maze for animation
+      this.mazeId = null;
+      this.gridEdited = false;
+      this.tiles = null;
+      this.sessionId = null;
       this.dpPath = null;
       this.greedyPath = null;
       this.uniquePath = null;
@@ -53,7 +211,7 @@ export const useGameStore = defineStore('game', {
         const data = mazeQueue.shift();
         
         if (data.maze) {
-          this.mazeData = data.maze;
+          this.applyFrame(data.maze);
         }
         if (data.bosses && data.bosses.length > 0) {
           this.bossHps = data.bosses;
@@ -66,6 +224,7 @@ export const useGameStore = defineStore('game', {
               id: locker.id,
               constraints: locker.constraints,
               password_hash: locker.password_hash,
+              candidates: locker.candidates,
             };
           });
           this.leverPuzzles = puzzles;
@@ -80,6 +239,9 @@ export const useGameStore = defineStore('game', {
         if (data.unique_path) {
           this.uniquePath = data.unique_path;
         }
+        if (data.maze_id) {
+          this.mazeId = data.maze_id;
+        }
         
         setTimeout(processQueue, 100); // Process next item after 100ms
       };
@@ -92,22 +254,32 @@ export const useGameStore = defineStore('game', {
       };
 
       const onComplete = () => {
-        const finalizer = () => {
+        const finalizer = async () => {
           if (isProcessingQueue) {
             // Wait until the queue is empty
             setTimeout(finalizer, 100);
             return;
           }
-          if (this.mazeData && this.mazeData.length > 0) {
-              for (let r = 0; r < this.mazeData.length; r++) {
-                  for (let c = 0; c < this.mazeData[r].length; c++) {
-                      const cell = this.mazeData[r][c];
-                      if (cell === 'S') {
-                          this.playerPosition = { r, c };
-                          this.playerPath.push([r, c]);
-                      }
-                  }
-              }
+          try {
+            // The final event of a tiled maze has no grid; its tiles load around the start
+            if (tiled && this.mazeId && this.uniquePath) await this.openMazeTiles(this.mazeId, ...this.uniquePath[0]);
+          } catch (err) {
+            onError(err);
+            return;
+          }
+          const start = this.grid ? this.grid.cells.indexOf(S) : -1;
+          if (start >= 0) {
+            const r = Math.floor(start / this.grid.width), c = start % this.grid.width;
+            this.playerPosition = { r, c };
+            this.playerPath.push([r, c]);
+          }
+          if (this.mazeId) {
+            try {
+              this.sessionId = (await ApiService.createGameSession(this.mazeId)).data.session_id;
+            } catch (err) {
+              // Manual play falls back to keeping the score in the browser
+              console.error('Failed to start a game session:', err);
+            }
           }
           this.isLoading = false;
         };
@@ -121,19 +293,20 @@ export const useGameStore = defineStore('game', {
       };
 
       // ApiService.generateMaze is now non-blocking and uses callbacks
-      ApiService.generateMaze(size, onData, onComplete, onError);
+      ApiService.generateMaze(size, onData, onComplete, onError, tiled ? 'final' : mode, tiled);
     },
     async solveDp() {
-      if (!this.mazeData) return;
+      if (!this.grid || !this.gridComplete) return;
       this.isLoading = true;
       this.error = null;
       try {
         const payload = {
           maze: this.mazeData,
           main_path: this.uniquePath, // Pass the unique path to the API
+          path_encoding: 'rle', // MazeGrid animates { start, moves } paths directly
         };
         const response = await ApiService.solveDp(payload);
-        this.dpPath = response.data.path;
+        this.dpPath = { start: response.data.start, moves: response.data.moves };
         this.dpValue = response.data.value;
       } catch (err) {
         this.error = 'Failed to solve with Dynamic Programming.';
@@ -143,12 +316,12 @@ export const useGameStore = defineStore('game', {
       }
     },
     async solveGreedy() {
-      if (!this.mazeData) return;
+      if (!this.grid || !this.gridComplete) return;
       this.isLoading = true;
       this.error = null;
       try {
         const response = await ApiService.solveGreedy(this.mazeData);
-        this.greedyPath = response.data.path;
+        this.greedyPath = { start: response.data.start, moves: response.data.moves };
         this.greedyValue = response.data.value;
       } catch (err) {
         this.error = 'Failed to solve with Greedy Algorithm.';
@@ -157,9 +330,92 @@ export const useGameStore = defineStore('game', {
         this.isLoading = false;
       }
     },
+    async solveAll() {
+      if (!this.grid) return;
+      this.isLoading = true;
+      this.error = null;
+      try {
+        // A generated maze is known to the server by id. The grid is only uploaded once play
+        // has changed it, since the server then solves it without the stored maze index, and
+        // never while tiles of it are missing.
+        const payload = this.mazeId
+          ? {
+              maze_id: this.mazeId,
+              ...(this.gridEdited && this.gridComplete && { maze: this.mazeData }),
+              path_encoding: 'rle',
+            }
+          : {
+              maze: this.mazeData,
+              main_path: this.uniquePath,
+              lockers: Object.values(this.leverPuzzles).map(({ id, password_hash, constraints }) => ({ id, password_hash, constraints })),
+              boss_hps: this.bossHps,
+              skills: this.playerSkills,
+              path_encoding: 'rle',
+            };
+        const failed = [];
+        await ApiService.solveAllStream(payload, (data) => {
+          if (data.error) {
+            failed.push(data.solver || 'solve-all');
+            return;
+          }
+          if (data.solver === 'dp') {
+            this.dpPath = { start: data.result.start, moves: data.result.moves };
+            this.dpValue = data.result.value;
+          } else if (data.solver === 'greedy') {
+            this.greedyPath = { start: data.result.start, moves: data.result.moves };
+            this.greedyValue = data.result.value;
+          } else if (data.solver === 'puzzle') {
+            const puzzle = Object.values(this.leverPuzzles).find(p => p.id === data.id);
+            if (puzzle) {
+              puzzle.solution = data.result.solution;
+              puzzle.tries = data.result.tries;
+            }
+          } else if (data.solver === 'boss') {
+            this.bossBattleResult = data.result;
+          }
+        });
+        if (failed.length > 0) this.error = `Failed to solve: ${failed.join(', ')}.`;
+      } catch (err) {
+        this.error = 'Failed to run all solvers.';
+        console.error(err);
+      } finally {
+        this.isLoading = false;
+      }
+    },
+    // Applies the state delta of a server-side move
+    applyMoveDelta(delta) {
+      if (!delta.moved) return;
+      const [r, c] = delta.position;
+      this.playerPosition = { r, c };
+      this.playerPath.push([r, c]);
+      this.followPlayer();
+      if (delta.score !== undefined) this.playerScore = delta.score;
+      if (delta.cleared) this.setCell(delta.cleared[0], delta.cleared[1], '.');
+      if (delta.puzzle) {
+        const puzzleData = this.leverPuzzles[`${r},${c}`];
+        this.activePuzzle = { ...puzzleData, solution: delta.puzzle.solution, tries: delta.puzzle.tries };
+      }
+      if (delta.boss) this.bossBattleResult = delta.boss;
+      if (delta.won) this.gameWon = true;
+    },
     movePlayer(direction) {
       if (!this.playerPosition || this.gameWon) return;
 
+      if (this.sessionId) {
+        // The server validates the step and keeps the score; only the delta comes back
+        const sessionId = this.sessionId;
+        pendingMove = pendingMove
+          .then(() => ApiService.moveInGameSession(sessionId, SESSION_MOVES[direction]))
+          .then((response) => {
+            if (this.sessionId === sessionId) this.applyMoveDelta(response.data);
+          })
+          .catch((err) => {
+            this.error = 'Failed to move.';
+            console.error(err);
+          });
+        return;
+      }
+
       const { r, c } = this.playerPosition;
       let newR = r, newC = c;
 
@@ -169,22 +425,24 @@ export const useGameStore = defineStore('game', {
       else if (direction === 'right') newC++;
 
       if (
-        newR >= 0 && newR < this.mazeData.length &&
-        newC >= 0 && newC < this.mazeData[0].length &&
-        this.mazeData[newR][newC] !== '#'
+        newR >= 0 && newR < this.grid.height &&
+        newC >= 0 && newC < this.grid.width &&
+        this.cellAt(newR, newC) !== '#' &&
+        this.grid.cells[newR * this.grid.width + newC] !== UNLOADED
       ) {
         this.playerPosition = { r: newR, c: newC };
         this.playerPath.push([newR, newC]);
+        this.followPlayer();
         
-        const cell = this.mazeData[newR][newC];
+        const cell = this.cellAt(newR, newC);
         if (cell === 'G') {
           this.playerScore += 50;
-          this.mazeData[newR][newC] = '.'; // Consume gold
+          this.setCell(newR, newC, '.'); // Consume gold
         } else if (cell === 'T') {
           this.playerScore -= 30;
-          this.mazeData[newR][newC] = '.'; // Consume trap
+          this.setCell(newR, newC, '.'); // Consume trap
         } else if (cell === 'L') {
-          this.mazeData[newR][newC] = '.'; // Consume lever
+          this.setCell(newR, newC, '.'); // Consume lever
           const puzzleData = this.leverPuzzles[`${newR},${newC}`];
           if (puzzleData && puzzleData.constraints && puzzleData.password_hash) {
             this.activePuzzle = { ...puzzleData, solution: null, tries: null };
@@ -192,7 +450,7 @@ export const useGameStore = defineStore('game', {
             this.solvePuzzle();
           }
         } else if (cell === 'B') {
-          this.mazeData[newR][newC] = '.'; // Consume boss
+          this.setCell(newR, newC, '.'); // Consume boss
           this.solveBossBattle();
         } else if (cell === 'E') {
           this.gameWon = true;
@@ -226,9 +484,15 @@ export const useGameStore = defineStore('game', {
             this.error = "Player skills not available for boss battle!";
             return;
         }
-        const response = await ApiService.solveBossBattle(this.bossHps, this.playerSkills);
-        this.bossBattleResult = response.data;
-        this.playerScore -= response.data.turns;
+        // Show the quick schedule right away and refine it as better ones stream in
+        let finalResult = null;
+        await ApiService.solveBossBattleStream(this.bossHps, this.playerSkills, (data) => {
+          if (data.error) return;
+          this.bossBattleResult = data;
+          if (data.done) finalResult = data;
+        });
+        if (!finalResult) throw new Error('Boss battle stream ended without a result.');
+        this.playerScore -= finalResult.turns;
       } catch (err) {
         this.error = 'Failed to solve boss battle.';
         console.error(err);
@@ -251,6 +515,10 @@ export const useGameStore = defineStore('game', {
           }
 
           // Reset state
+          this.mazeId = null;
+          this.gridEdited = false;
+          this.tiles = null;
+          this.sessionId = null;
           this.dpPath = null;
           this.greedyPath = null;
           this.uniquePath = null;
@@ -261,7 +529,7 @@ export const useGameStore = defineStore('game', {
           this.bossBattleResult = null;
 
           // Load data from JSON
-          this.mazeData = data.maze;
+          this.setGrid(data.maze);
           this.bossHps = data.B;
           this.playerSkills = data.PlayerSkills.map((skill, index) => ({
             name: `Skill ${index + 1}`,